@@ -0,0 +1,166 @@
+"""Асинхронный режим бота: опрос и отправка не блокируют цикл событий.
+
+HTTP-запросы идут через `aiohttp`, если он установлен, иначе —
+синхронный `homework.request_api` в пуле потоков. python-telegram-bot 13.x
+не имеет асинхронного API, поэтому вызовы бота выполняются в потоке.
+Запуск: `ASYNC_MODE=1 python homework.py`.
+"""
+import asyncio
+import logging
+import threading
+from http import HTTPStatus
+
+import homework
+import metrics
+import practicum
+import profiling
+import ratelimit
+from checkpoint import open_store
+from exceptions import ApiError, HttpError
+from history import open_history_store
+from shutdown import SIGNALS
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+def create_session(limit=100):
+    """Создаёт сессию aiohttp или возвращает None без него."""
+    if aiohttp is None:
+        return None
+    connect, read = homework.API_TIMEOUT
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit),
+        timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+    )
+
+
+class Reply:
+    """Прочитанный ответ aiohttp для `ResponseCache` и `decode_response`."""
+
+    __slots__ = ('status_code', 'content', 'headers')
+
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+
+async def get_api_answer(timestamp, session=None, headers=None):
+    """Асинхронный аналог `homework.get_api_answer`."""
+    headers = homework.HEADERS if headers is None else headers
+    if session is None:
+        return await asyncio.to_thread(
+            homework.request_api, timestamp, headers
+        )
+    params = {'from_date': timestamp}
+    cache = practicum.shared_cache()
+    token = headers.get('Authorization')
+    if cache is not None:
+        headers = {**headers, **cache.conditional_headers(token)}
+    accepted = homework.CACHEABLE if cache is not None else (HTTPStatus.OK,)
+    limiter = ratelimit.shared_limiter()
+    if limiter is not None:
+        await asyncio.sleep(await asyncio.to_thread(limiter.reserve))
+    try:
+        with metrics.API_LATENCY.time(), profiling.span('api'):
+            async with session.get(homework.ENDPOINT, headers=headers,
+                                   params=params) as response:
+                metrics.API_RESPONSES.labels(response.status).inc()
+                if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+                    raise await asyncio.to_thread(
+                        homework.throttled,
+                        response.headers.get('Retry-After'),
+                    )
+                if response.status not in accepted:
+                    raise HttpError('Код ответа != 200.', response.status)
+                reply = Reply(
+                    response.status, await response.read(), response.headers
+                )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as request_error:
+        raise ApiError('Ошибка подключения к API') from request_error
+    if cache is not None:
+        return cache.fetch(token, reply, homework.decode_response)
+    return homework.decode_response(reply)
+
+
+async def send_message(bot, message, chat_id=None):
+    """Асинхронный аналог `homework.send_message`."""
+    chat_id = homework.TELEGRAM_CHAT_ID if chat_id is None else chat_id
+    return await asyncio.to_thread(
+        homework.deliver_message, bot, chat_id, message
+    )
+
+
+def watch_signals(stopping):
+    """SIGTERM и SIGINT ставят `stopping`; возвращает снятие обработчиков."""
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    for signum in SIGNALS:
+        loop.add_signal_handler(signum, stopping.set)
+
+    def restore():
+        for signum in SIGNALS:
+            loop.remove_signal_handler(signum)
+    return restore
+
+
+async def pause(stopping, delay):
+    """Пауза между опросами; сигнал остановки её прерывает."""
+    try:
+        await asyncio.wait_for(stopping.wait(), delay)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def main():
+    """Асинхронный аналог `homework.main`.
+
+    Сигнал остановки прерывает паузу между опросами; начатые отправки
+    завершаются, контрольная точка закрывается. Очередь
+    `TELEGRAM_OUTBOX` и вебхук включаются так же, как в синхронном
+    цикле; их блокирующие вызовы и лимитер запросов (в SQLite — запись
+    в файл) работают в потоках, а не в цикле событий.
+    """
+    homework.check_tokens()
+    bot = homework.telegram.Bot(token=homework.TELEGRAM_TOKEN)
+    tracker = homework.StatusTracker.from_store(
+        open_store(homework.CHECKPOINT_PATH),
+        history=open_history_store(homework.HISTORY_PATH),
+    )
+    bot = await asyncio.to_thread(homework.start_services, bot, tracker)
+    session = create_session()
+    breaker = homework.make_breaker()
+    stopping = asyncio.Event()
+    restore = watch_signals(stopping)
+    try:
+        while not stopping.is_set():
+            try:
+                response = await breaker.acall(
+                    get_api_answer, tracker.timestamp, session
+                )
+                messages = tracker.on_response(response)
+            except Exception as error:
+                messages = tracker.on_error(error)
+            sent = [await send_message(bot, message) for message in messages]
+            if all(sent) and await asyncio.to_thread(
+                homework.confirmed, bot
+            ):
+                await asyncio.to_thread(tracker.delivered)
+            profiling.report()
+            await pause(stopping, tracker.next_delay())
+    finally:
+        restore()
+        if session is not None:
+            await session.close()
+        await asyncio.to_thread(homework.stop_services, bot, tracker)
+
+
+def run():
+    """Запускает асинхронный цикл бота."""
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+"""Загрузка истории работ: запрос с `from_date=0` и потоковый разбор.
+
+    python -m backfill                         # вся история
+    python -m backfill --from-date 1672531200  # с указанной даты
+    python -m backfill --print                 # и вывести статусы
+
+Тело ответа читается кусками, массив `homeworks` разбирается по одной
+записи через `JSONDecoder.raw_decode`, поэтому память не зависит от
+длины истории. Изменения статусов попадают в `DedupStore` контрольной
+точки `CHECKPOINT_PATH`, и основной цикл не присылает уже известные.
+С `HISTORY_PATH` все записи сохраняются и в историю статусов.
+"""
+import argparse
+import codecs
+import json
+import logging
+import re
+import time
+from contextlib import closing
+from http import HTTPStatus
+
+import homework
+import practicum
+from checkpoint import open_store
+from exceptions import ApiError, HttpError, JsonError
+from history import open_history_store
+from lazy import lazy_import
+from models import Homework
+
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+HOMEWORKS = re.compile(r'"homeworks"\s*:\s*\[')
+CURRENT_DATE = re.compile(r'"current_date"\s*:\s*(-?\d+)')
+SEPARATORS = re.compile(r'[\s,]*')
+TAIL = 64
+
+
+class HomeworkStream:
+    """Итератор по записям массива `homeworks` из кусков тела ответа.
+
+    В буфере держится только неразобранный остаток, то есть не больше
+    одной записи и одного куска. `current_date` заполняется, когда
+    поле встретится до или после массива.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.current_date = None
+
+    def _read(self):
+        """Дописывает в буфер следующий кусок; False — тело кончилось."""
+        try:
+            for chunk in self._chunks:
+                text = self._text.decode(chunk)
+                if text:
+                    self.buffer = self.buffer[self.position:] + text
+                    self.position = 0
+                    return True
+            text = self._text.decode(b'', final=True)
+        except UnicodeDecodeError as error:
+            raise JsonError('Ошибка JSON') from error
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+        return bool(text)
+
+    def _scan_date(self, text):
+        match = CURRENT_DATE.search(text)
+        if match is not None:
+            self.current_date = int(match.group(1))
+
+    def _start(self):
+        match = HOMEWORKS.search(self.buffer)
+        while match is None:
+            if not self._read():
+                raise JsonError('В ответе нет массива "homeworks"')
+            match = HOMEWORKS.search(self.buffer)
+        self._scan_date(self.buffer[:match.start()])
+        self.position = match.end()
+
+    def _finish(self):
+        self._scan_date(self.buffer[self.position:])
+        while self._read():
+            self._scan_date(self.buffer)
+            self.position = max(0, len(self.buffer) - TAIL)
+
+    def __iter__(self):
+        self._start()
+        while True:
+            self.position = SEPARATORS.match(
+                self.buffer, self.position
+            ).end()
+            if self.position == len(self.buffer):
+                if not self._read():
+                    raise JsonError('Ответ оборвался внутри "homeworks"')
+                continue
+            if self.buffer[self.position] == ']':
+                self.position += 1
+                break
+            try:
+                item, end = self._decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except ValueError as error:
+                if not self._read():
+                    raise JsonError('Ошибка JSON') from error
+                continue
+            if end == len(self.buffer) and not isinstance(
+                item, (dict, list)
+            ) and self._read():
+                continue
+            self.position = end
+            yield item
+        self._finish()
+
+
+def open_history(timestamp):
+    """ЗАПРОС К ENDPOINT С ПОТОКОВЫМ ЧТЕНИЕМ ТЕЛА."""
+    session = practicum.shared_session()
+    http_get = requests.get if session is None else session.get
+    response = http_get(
+        homework.ENDPOINT, headers=homework.HEADERS,
+        params={'from_date': timestamp}, stream=True,
+        timeout=homework.API_TIMEOUT,
+    )
+    if response.status_code != HTTPStatus.OK:
+        response.close()
+        raise HttpError('Код ответа != 200.', response.status_code)
+    return response
+
+
+def _remember(tracker, record, cutoff):
+    """Запоминает изменение, если оно не новее даты опроса `cutoff`."""
+    updated = record.updated
+    if cutoff is not None and updated and updated > cutoff:
+        return False
+    if record.key is None:
+        return False
+    tracker.dedup.add(
+        tracker.chat_id, record.key, record.status, record.date_updated
+    )
+    return True
+
+
+def backfill(since=0, store=None, on_record=None):
+    """Загружает историю с `since` в контрольную точку.
+
+    `on_record(homework, message)` вызывается для каждой корректной
+    записи. Записи новее уже сохранённой даты опроса не трогаются —
+    о них сообщит основной цикл. Возвращает счётчики записей.
+    """
+    store = store or open_store(homework.CHECKPOINT_PATH)
+    cutoff = store.load().get('timestamp')
+    tracker = homework.StatusTracker.from_store(store)
+    started = int(time.time())
+    stats = {'records': 0, 'recorded': 0, 'errors': 0}
+    try:
+        with closing(open_history(since)) as response:
+            stream = HomeworkStream(response.iter_content(CHUNK_SIZE))
+            for item in stream:
+                stats['records'] += 1
+                try:
+                    record = Homework.from_dict(
+                        item, homework.HOMEWORK_VERDICTS
+                    )
+                    message = homework.parse_status(record)
+                except Exception as error:
+                    stats['errors'] += 1
+                    logger.warning(f'Пропущена запись истории: {error}')
+                    continue
+                if on_record is not None:
+                    on_record(record, message)
+                stats['recorded'] += _remember(tracker, record, cutoff)
+    except requests.RequestException as error:
+        raise ApiError('Ошибка подключения к API') from error
+    if stream.current_date is None:
+        logger.error('В ответе нет "current_date", дата опроса — '
+                     'время запроса')
+    if cutoff is None:
+        tracker.timestamp = stream.current_date or started
+    store.save(tracker.state())
+    logger.info(
+        f'История загружена: {stats["records"]} записей, '
+        f'сохранено статусов {stats["recorded"]}, ошибок {stats["errors"]}'
+    )
+    return stats
+
+
+def print_record(record, message):
+    """Выводит дату и статус работы."""
+    print(record.date_updated, message)
+
+
+def chain(*callbacks):
+    """Один `on_record` из нескольких; None пропускаются."""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if not callbacks:
+        return None
+
+    def on_record(record, message):
+        for callback in callbacks:
+            callback(record, message)
+    return on_record
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--from-date', type=int, default=0)
+    parser.add_argument('--print', action='store_true',
+                        help='выводить статус каждой работы')
+    args = parser.parse_args()
+
+    homework.configure_logging()
+    if not homework.PRACTICUM_TOKEN:
+        logger.critical('Отсутствует переменная окружения! PRACTICUM_TOKEN')
+        raise SystemExit('Проверь токены!')
+    if not homework.CHECKPOINT_PATH:
+        logger.warning('CHECKPOINT_PATH не задан, статусы не сохранятся')
+    store = open_store(homework.CHECKPOINT_PATH)
+    history = open_history_store(homework.HISTORY_PATH)
+    on_record = chain(
+        print_record if args.print else None,
+        history.observer(homework.TELEGRAM_CHAT_ID),
+    )
+    try:
+        backfill(args.from_date, store, on_record)
+    finally:
+        store.close()
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Время 1000 опросов: синхронный цикл против асинхронного.
+
+    python -m benchmarks.bench_async --polls 1000 --latency 0.01
+"""
+import argparse
+import asyncio
+import time
+
+import async_bot
+import homework
+from benchmarks.stub_server import PracticumStub
+
+
+def run_sync(polls):
+    """Опросы по одному, как в `homework.main`."""
+    for _ in range(polls):
+        homework.get_api_answer(0)
+
+
+async def run_async(polls, concurrency, use_session):
+    """Те же опросы конкурентно на цикле событий."""
+    session = async_bot.create_session(concurrency) if use_session else None
+    slots = asyncio.Semaphore(concurrency)
+
+    async def poll():
+        async with slots:
+            await async_bot.get_api_answer(0, session)
+
+    try:
+        await asyncio.gather(*(poll() for _ in range(polls)))
+    finally:
+        if session is not None:
+            await session.close()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--polls', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+
+    with PracticumStub(latency=args.latency) as stub:
+        homework.ENDPOINT = stub.endpoint
+        results = [('sync', timed(run_sync, args.polls))]
+        results.append(('async, потоки', timed(
+            asyncio.run, run_async(args.polls, args.concurrency, False)
+        )))
+        if async_bot.aiohttp is not None:
+            results.append(('async, aiohttp', timed(
+                asyncio.run, run_async(args.polls, args.concurrency, True)
+            )))
+    for name, elapsed in results:
+        print(f'{name:<16} {elapsed:>8.2f} с {args.polls / elapsed:>10.1f} '
+              'опросов/с')
+
+
+if __name__ == '__main__':
+    main()
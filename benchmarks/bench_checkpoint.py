@@ -0,0 +1,58 @@
+"""Стоимость записи контрольной точки на один цикл опроса.
+
+    python -m benchmarks.bench_checkpoint --cycles 2000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from checkpoint import FileCheckpointStore, SqliteCheckpointStore
+
+
+def measure(store, cycles):
+    """Время `save` в микросекундах для каждого цикла."""
+    timings = []
+    for cycle in range(cycles):
+        state = {
+            'timestamp': 1700000000 + cycle,
+            'old_message': 'Изменился статус проверки работы "hw". '
+                           'Работа взята на проверку ревьюером.',
+        }
+        started = time.perf_counter()
+        store.save(state)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cycles', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            'json + fsync': FileCheckpointStore(
+                os.path.join(directory, 'a.json')
+            ),
+            'json без fsync': FileCheckpointStore(
+                os.path.join(directory, 'b.json'), fsync=False
+            ),
+            'sqlite (WAL)': SqliteCheckpointStore(
+                os.path.join(directory, 'c.db')
+            ),
+        }
+        print(f'{"хранилище":<16} {"p50, мкс":>10} {"p99, мкс":>10} '
+              f'{"max, мкс":>10}')
+        for name, store in stores.items():
+            timings = measure(store, args.cycles)
+            store.close()
+            print(f'{name:<16} {statistics.median(timings):>10.0f} '
+                  f'{timings[int(len(timings) * 0.99)]:>10.0f} '
+                  f'{timings[-1]:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
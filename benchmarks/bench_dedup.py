@@ -0,0 +1,102 @@
+"""Хранилище отправленных изменений: скорость и память на десятках тысяч работ.
+
+Сравнивается прежний словарь `{работа: статус}` и `DedupStore` с ключом
+(чат, работа, статус, дата): время проверки уже известного и нового
+изменения, память на запись и стоимость `dump()`/`load()` для
+контрольной точки.
+
+    python -m benchmarks.bench_dedup --sizes 10000 50000 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from dedup import DedupStore
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+CHATS = 100
+
+
+def make_changes(count):
+    """Изменения: работы по чатам, у каждой свой статус и дата."""
+    return [
+        (str(number % CHATS), str(10_000_000 + number),
+         STATUSES[number % len(STATUSES)],
+         f'2024-{number % 12 + 1:02d}-{number % 28 + 1:02d}T'
+         f'{number % 24:02d}:{number % 60:02d}:00Z')
+        for number in range(count)
+    ]
+
+
+def fill_dict(changes):
+    statuses = {}
+    for _, key, status, _ in changes:
+        statuses[key] = status
+    return statuses
+
+
+def fill_store(changes):
+    store = DedupStore(max_size=len(changes))
+    for change in changes:
+        store.add(*change)
+    return store
+
+
+def traced(build, changes):
+    gc.collect()
+    tracemalloc.start()
+    kept = build(changes)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return kept, used
+
+
+def per_call(func, items):
+    started = time.perf_counter()
+    for item in items:
+        func(*item)
+    return (time.perf_counter() - started) / len(items) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10_000, 50_000, 100_000])
+    args = parser.parse_args()
+
+    print(f'{"записей":>8} {"словарь, Б":>11} {"store, Б":>9} '
+          f'{"stats(), Б":>11} {"известное":>10} {"новое":>7} '
+          f'{"dump":>7} {"load":>7}')
+    for size in args.sizes:
+        changes = make_changes(size)
+        statuses, dict_bytes = traced(fill_dict, changes)
+        store, store_bytes = traced(fill_store, changes)
+        reported = store.stats()['bytes']
+
+        def legacy(chat_id, key, status, date_updated):
+            return statuses.get(key) != status
+
+        known = per_call(store.add, changes)
+        assert not any(legacy(*change) for change in changes)
+        fresh = [
+            (chat_id, key, 'approved', date + '1')
+            for chat_id, key, _, date in changes
+        ]
+        new = per_call(DedupStore(max_size=size).add, fresh)
+
+        started = time.perf_counter()
+        payload = json.dumps(store.dump())
+        dumped = time.perf_counter() - started
+        started = time.perf_counter()
+        DedupStore(max_size=size).load(json.loads(payload))
+        loaded = time.perf_counter() - started
+        print(f'{size:>8} {dict_bytes / size:>11.0f} '
+              f'{store_bytes / size:>9.0f} {reported / size:>11.0f} '
+              f'{known:>8.0f}нс {new:>5.0f}нс '
+              f'{dumped * 1000:>5.0f}мс {loaded * 1000:>5.0f}мс')
+
+
+if __name__ == '__main__':
+    main()
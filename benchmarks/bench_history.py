@@ -0,0 +1,123 @@
+"""История статусов на миллионах строк: стоимость записи и запросов.
+
+База наполняется пачками, как при работе бота: у каждого чата
+`--homeworks` работ, каждая проходит цикл reviewing -> rejected ->
+reviewing -> approved. Время пачки измеряется в начале и в конце
+наполнения — запись не должна дорожать с ростом таблицы. Затем
+случайные запросы каждого вида: последний статус работ чата, история
+одной работы, время проверки по работам чата и среднее время проверки
+работы по всем чатам.
+
+    python -m benchmarks.bench_history --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from history import HistoryStore
+from models import Homework
+
+CYCLE = ('reviewing', 'rejected', 'reviewing', 'approved')
+HOUR = 3600
+
+
+def changes(chats, homeworks):
+    """Изменения в порядке времени: по кругу чатов и работ."""
+    started = 1_700_000_000
+    for step, status in enumerate(CYCLE):
+        for number in range(homeworks):
+            for chat in range(chats):
+                updated = started + (number * len(CYCLE) + step) * HOUR
+                yield str(chat), Homework(
+                    None, f'hw{number:02d}', status, '', time.strftime(
+                        '%Y-%m-%dT%H:%M:%SZ', time.gmtime(updated)
+                    ),
+                )
+
+
+def fill(store, chats, homeworks, batch):
+    """Наполняет базу; времена пачек в миллисекундах."""
+    timings = []
+    started = time.perf_counter()
+    for count, (chat, record) in enumerate(
+        changes(chats, homeworks), start=1
+    ):
+        store.record(chat, record)
+        if count % batch == 0:
+            flushed = time.perf_counter()
+            store.flush()
+            timings.append((time.perf_counter() - flushed) * 1000)
+    store.flush()
+    return timings, time.perf_counter() - started
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return (statistics.median(timings),
+            timings[int(len(timings) * 0.99) - 1])
+
+
+def timed(query, arguments):
+    timings = []
+    for argument in arguments:
+        started = time.perf_counter()
+        query(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentiles(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--homeworks', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    chats = max(1, args.rows // (args.homeworks * len(CYCLE)))
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.db')
+        store = HistoryStore(path, batch_size=float('inf'),
+                             flush_interval=float('inf'))
+        timings, elapsed = fill(store, chats, args.homeworks, args.batch)
+        rows = len(store)
+        tenth = max(1, len(timings) // 10)
+        first, last = timings[:tenth], timings[-tenth:]
+        print(f'строк: {rows}, чатов: {chats}, '
+              f'{rows / elapsed:.0f} строк/с, '
+              f'{os.path.getsize(path) / rows:.0f} Б на строку')
+        print(f'пачка из {args.batch}: первые 10% — '
+              f'{statistics.median(first):.2f} мс, последние 10% — '
+              f'{statistics.median(last):.2f} мс')
+
+        chat_ids = [str(rng.randrange(chats)) for _ in range(args.queries)]
+        names = [
+            f'hw{rng.randrange(args.homeworks):02d}'
+            for _ in range(args.queries)
+        ]
+        queries = {
+            'последний статус работ чата': (store.latest, chat_ids),
+            'история одной работы': (
+                lambda pair: store.transitions(*pair),
+                list(zip(chat_ids, names)),
+            ),
+            'время проверки по работам чата': (
+                store.review_times, chat_ids
+            ),
+            'среднее время проверки работы': (
+                store.review_time_stats, names[:20]
+            ),
+        }
+        print(f'{"запрос":<34} {"p50, мс":>8} {"p99, мс":>8}')
+        for name, (query, arguments) in queries.items():
+            median, p99 = timed(query, arguments)
+            print(f'{name:<34} {median:>8.3f} {p99:>8.3f}')
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
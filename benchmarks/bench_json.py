@@ -0,0 +1,91 @@
+"""Разбор большого ответа API разными декодерами JSON.
+
+Ответ как при `from_date=0`: вся история работ студента. Сравнивается
+`response.json()` из requests (декодирование тела в строку, затем
+stdlib json) и разбор байтов каждым установленным декодером.
+
+    python -m benchmarks.bench_json --homeworks 100 500 2000
+"""
+import argparse
+import json
+import time
+
+import requests
+
+import decoders
+
+STATUSES = ('approved', 'rejected', 'reviewing')
+COMMENT = (
+    'Отличная работа! Код читается легко, тесты проходят. '
+    'Обрати внимание на обработку ошибок в функции main: '
+    'стоит логировать исключения с трассировкой. '
+)
+
+
+def make_payload(count):
+    """Тело ответа с `count` работами."""
+    homeworks = [
+        {
+            'id': 100000 + number,
+            'status': STATUSES[number % len(STATUSES)],
+            'homework_name': f'student__hw{number:04d}_project.zip',
+            'reviewer_comment': COMMENT * (1 + number % 4),
+            'date_updated': '2023-02-13T14:40:57Z',
+            'lesson_name': f'Спринт {number % 20}: итоговый проект',
+        }
+        for number in range(count)
+    ]
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': 1700000000},
+        ensure_ascii=False,
+    ).encode()
+
+
+def make_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+
+def measure(func, body, repeat):
+    """Лучшее время разбора в миллисекундах."""
+    best = None
+    for _ in range(repeat):
+        response = make_response(body)
+        started = time.perf_counter()
+        func(response)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--homeworks', type=int, nargs='+',
+                        default=[100, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    candidates = [('response.json()', lambda response: response.json())]
+    for backend in decoders.available():
+        loads = decoders.BACKENDS[backend]()
+        candidates.append((
+            f'{backend}(bytes)',
+            lambda response, loads=loads: loads(response.content),
+        ))
+
+    for count in args.homeworks:
+        body = make_payload(count)
+        print(f'{count} работ, {len(body) / 1024:.0f} КиБ:')
+        baseline = None
+        for name, func in candidates:
+            elapsed = measure(func, body, args.repeat)
+            baseline = baseline or elapsed
+            print(f'  {name:>16}: {elapsed:7.3f} мс '
+                  f'(x{baseline / elapsed:.1f})')
+
+
+if __name__ == '__main__':
+    main()
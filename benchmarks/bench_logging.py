@@ -0,0 +1,51 @@
+"""Накладные расходы логирования на один цикл опроса.
+
+Цикл без изменений пишет одну отладочную строку «Нет изменений в
+статусе работы». Сравниваются синхронные обработчики и очередь с
+JSON, ротацией и прореживанием.
+
+    python -m benchmarks.bench_logging --polls 20000
+"""
+import argparse
+import io
+import logging
+import os
+import tempfile
+import time
+
+from log_config import setup_logging, shutdown_logging
+
+NO_CHANGES = 'Нет изменений в статусе работы'
+
+
+def measure(polls, **options):
+    """Среднее время вызова `logger.debug` в микросекундах."""
+    setup_logging(stream=io.StringIO(), **options)
+    logger = logging.getLogger('homework')
+    started = time.perf_counter()
+    for _ in range(polls):
+        logger.debug(NO_CHANGES)
+    elapsed = time.perf_counter() - started
+    shutdown_logging()
+    return elapsed / polls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--polls', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'logger.log')
+        modes = {
+            'sync (до)': dict(mode='sync'),
+            'queue, без прореживания': dict(mode='queue', sample_every=1),
+            'queue (после)': dict(mode='queue'),
+        }
+        for name, options in modes.items():
+            per_poll = measure(args.polls, filename=filename, **options)
+            print(f'{name:<26} {per_poll:>8.2f} мкс на опрос')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Проверка ответов API: разбор словарей против `models.py`.
+
+Каждый путь делает то, что нужно трекеру: проверяет ответ, для каждой
+работы — поля, ключ, статус, вердикт и время обновления. Текст
+уведомления собирается из этих полей одинаково во всех путях, его цена
+— в `bench_templates`. Трекер работает с кортежем полей
+`parse_homework`; модель `Homework` создаётся только для хранимых
+записей, поэтому её цена показана отдельно, а память — для хранения
+записей словарями и моделями.
+
+    python -m benchmarks.bench_models --responses 1000000
+"""
+import argparse
+import gc
+import itertools
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from exceptions import CurrentDateError, HomeworkStatusError
+from homework import HOMEWORK_VERDICTS
+from models import Homework, parse_date, parse_homework, validate_response
+
+TEMPLATES = 1000
+
+
+def legacy_check_response(response):
+    """`check_response` до появления моделей."""
+    if not isinstance(response, dict):
+        raise TypeError('Ответ не ввиде словаря!')
+    homeworks = response.get('homeworks')
+    current_date = response.get('current_date')
+    if homeworks is None:
+        raise KeyError('Отсутсвует значение Homeworks')
+    if current_date is None:
+        raise CurrentDateError('Отсутствует ключ "current_dates"'
+                               'или ответ не ввиде числа.')
+    if not isinstance(homeworks, list):
+        raise TypeError('Ответ не ввиде списка!')
+    if not isinstance(current_date, int):
+        raise CurrentDateError('Значение "current_date" не является "int"')
+    return homeworks
+
+
+def legacy_parse_status(homework):
+    """Проверки `parse_status` до появления моделей, без сборки текста."""
+    homework_name = homework.get('homework_name')
+    if homework_name is None:
+        raise KeyError('Отсутствует ключ "homework_name"')
+    homework_status = homework.get('status')
+    if 'status' not in homework:
+        raise HomeworkStatusError('Отсутстует ключ homework_status.')
+    verdict = HOMEWORK_VERDICTS.get(homework_status)
+    if homework_status not in HOMEWORK_VERDICTS:
+        raise ValueError('Неизвестный статус домашней работы')
+    return homework_name, verdict
+
+
+def legacy_parse_date(value):
+    try:
+        return datetime.fromisoformat(
+            value.replace('Z', '+00:00')
+        ).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def legacy(response):
+    for homework in legacy_check_response(response):
+        key = homework.get('id', homework.get('homework_name'))
+        key = None if key is None else str(key)
+        homework.get('status')
+        homework.get('date_updated')
+        homework.get('reviewer_comment')
+        legacy_parse_status(homework)
+        legacy_parse_date(homework.get('date_updated'))
+
+
+def modern(response):
+    homeworks, _ = validate_response(response)
+    for item in homeworks:
+        fields = parse_homework(item, HOMEWORK_VERDICTS)
+        parse_date(fields[4])
+
+
+def stored(response):
+    homeworks, _ = validate_response(response)
+    for item in homeworks:
+        Homework.from_dict(item, HOMEWORK_VERDICTS).updated
+
+
+def make_responses(count=TEMPLATES):
+    """Синтетические ответы: 0, 1 или 2 работы с разными статусами."""
+    statuses = list(HOMEWORK_VERDICTS)
+    responses = []
+    for number in range(count):
+        homeworks = [
+            {
+                'id': number * 2 + index,
+                'homework_name': f'user__hw{number}_{index}.zip',
+                'status': statuses[(number + index) % len(statuses)],
+                'reviewer_comment': 'Всё нравится',
+                'date_updated': '2023-02-13T14:40:57Z',
+                'lesson_name': 'Итоговый проект',
+            }
+            for index in range(number % 3)
+        ]
+        responses.append({
+            'homeworks': homeworks, 'current_date': 1700000000 + number,
+        })
+    return responses
+
+
+def measure_time(func, responses, total):
+    started = time.perf_counter()
+    for response in itertools.islice(itertools.cycle(responses), total):
+        func(response)
+    return time.perf_counter() - started
+
+
+def measure_memory(build, payloads):
+    """Память, занятая `count` проверенными записями о работах."""
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(json.loads(payload)) for payload in payloads]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--responses', type=int, default=1_000_000)
+    parser.add_argument('--records', type=int, default=100_000,
+                        help='записей для замера памяти')
+    args = parser.parse_args()
+
+    responses = make_responses()
+    print(f'{args.responses} ответов, '
+          f'{sum(len(r["homeworks"]) for r in responses) / TEMPLATES:.1f} '
+          'работы на ответ')
+    for name, func in (('словари', legacy), ('поля', modern),
+                       ('модели', stored)):
+        elapsed = measure_time(func, responses, args.responses)
+        print(f'{name:>8}: {elapsed:6.2f} с, '
+              f'{elapsed / args.responses * 1e6:5.2f} мкс на ответ')
+
+    payloads = [
+        json.dumps(homework).encode()
+        for homework in itertools.islice(itertools.cycle(
+            item for response in responses for item in response['homeworks']
+        ), args.records)
+    ]
+    builders = (
+        ('словари', lambda item: item),
+        ('модели', lambda item: Homework.from_dict(item, HOMEWORK_VERDICTS)),
+    )
+    for name, build in builders:
+        used = measure_memory(build, payloads)
+        print(f'{name:>8}: {used / 2 ** 20:6.1f} МиБ на {args.records} '
+              f'записей, {used / args.records:5.0f} байт на запись')
+
+
+if __name__ == '__main__':
+    main()
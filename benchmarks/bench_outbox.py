@@ -0,0 +1,75 @@
+"""Нагрузочный тест очереди сообщений на фейковом боте.
+
+Фейковый бот отвечает с задержкой и время от времени требует подождать
+(`RetryAfter`). Отчёт: время постановки в очередь на стороне опроса,
+скорость отправки, склейки, повторы и глубина очереди.
+
+    python -m benchmarks.bench_outbox --chats 200 --messages 5000
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+
+import telegram
+
+from outbox import Outbox
+
+
+class FakeBot:
+    """Бот, который спит `latency` и иногда отвечает `RetryAfter`."""
+
+    def __init__(self, latency, retry_after_ratio, seed=1):
+        self.latency = latency
+        self.retry_after_ratio = retry_after_ratio
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def send_message(self, chat_id, text, **kwargs):
+        with self.lock:
+            self.calls += 1
+            throttle = self.rng.random() < self.retry_after_ratio
+        time.sleep(self.latency)
+        if throttle:
+            raise telegram.error.RetryAfter(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chats', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.002)
+    parser.add_argument('--retry-after-ratio', type=float, default=0.02)
+    parser.add_argument('--per-chat-rate', type=float, default=20.0)
+    parser.add_argument('--global-rate', type=float, default=300.0)
+    args = parser.parse_args()
+
+    logging.getLogger('outbox').setLevel(logging.ERROR)
+    bot = FakeBot(args.latency, args.retry_after_ratio)
+    outbox = Outbox(bot, per_chat_rate=args.per_chat_rate,
+                    global_rate=args.global_rate).start()
+    started = time.perf_counter()
+    max_depth = 0
+    for number in range(args.messages):
+        outbox.send_message(number % args.chats, f'Сообщение {number}')
+        max_depth = max(max_depth, outbox.depth)
+    enqueue = time.perf_counter() - started
+    outbox.close()
+    elapsed = time.perf_counter() - started
+    stats = outbox.stats()
+    print(f'постановка в очередь: {enqueue * 1e6 / args.messages:.1f} мкс '
+          'на сообщение')
+    print(f'доставлено текстов:  {stats["delivered"]} за {elapsed:.2f} с '
+          f'({stats["delivered"] / elapsed:.0f}/с)')
+    print(f'вызовов API:         {bot.calls}, успешных {stats["sent"]} '
+          f'({stats["sent"] / elapsed:.0f}/с)')
+    print(f'склеено текстов:     {stats["merged"]}')
+    print(f'повторов:            {stats["retried"]}')
+    print(f'ошибок:              {stats["failed"]}')
+    print(f'макс. глубина:       {max_depth}')
+
+
+if __name__ == '__main__':
+    main()
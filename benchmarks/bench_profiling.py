@@ -0,0 +1,81 @@
+"""Цена замеров фаз и сэмплирующего профилировщика.
+
+Сравнивается `parse_status` без замеров, с выключенными и включёнными
+`span`, а затем та же нагрузка под `StackSampler`. В конце — самые
+частые стеки, как их увидит flame graph.
+
+    python -m benchmarks.bench_profiling --calls 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import homework
+import profiling
+from models import Homework
+
+ITEM = {
+    'id': 1, 'homework_name': 'student__hw05.zip', 'status': 'approved',
+    'date_updated': '2024-01-01T10:00:00Z',
+}
+
+
+def per_call(func, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--interval', type=float,
+                        default=profiling.DEFAULT_INTERVAL)
+    args = parser.parse_args()
+
+    record = Homework.from_dict(ITEM, homework.HOMEWORK_VERDICTS)
+
+    def empty():
+        with profiling.span('parse'):
+            pass
+
+    def parse():
+        homework.parse_status(ITEM)
+
+    def parse_record():
+        homework.parse_status(record)
+
+    rows = []
+    for spans in (False, True):
+        profiling.enable_spans(spans)
+        state = 'включены' if spans else 'выключены'
+        rows.append((f'пустой span, замеры {state}',
+                     per_call(empty, args.calls)))
+        rows.append((f'parse_status(dict), замеры {state}',
+                     per_call(parse, args.calls)))
+        rows.append((f'parse_status(Homework), замеры {state}',
+                     per_call(parse_record, args.calls)))
+    profiling.enable_spans(False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'profile.folded')
+        sampler = profiling.StackSampler(path, args.interval).start()
+        sampled = per_call(parse, args.calls)
+        sampler.stop()
+        rows.append((f'parse_status(dict) под сэмплером '
+                     f'{1 / args.interval:.0f} Гц', sampled))
+        with open(path, encoding='utf-8') as profile_file:
+            stacks = profile_file.read().splitlines()
+
+    for name, nanoseconds in rows:
+        print(f'{name:<50} {nanoseconds:>8.0f} нс')
+    print(f'\nснимков: {sampler.samples}, разных стеков: {len(stacks)}')
+    for line in stacks[:3]:
+        stack, count = line.rsplit(' ', 1)
+        print(f'{count:>6}  ...{stack[-90:]}')
+
+
+if __name__ == '__main__':
+    main()
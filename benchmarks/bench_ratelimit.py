@@ -0,0 +1,126 @@
+"""Общий лимит запросов: равномерность и цена резервирования.
+
+1. `--pollers` потоков одновременно начинают период опроса, как
+   `PollingEngine.poll_once`. Без лимита все запросы уходят пачкой;
+   с лимитом `--rate` они идут через равные интервалы. Показано
+   наибольшее число запросов в окне 100 мс и фактическая частота.
+2. `--processes` процессов берут слоты из одного файла SQLite: общая
+   частота должна остаться равной `--rate`, а не умножиться.
+3. Цена одного `reserve()` в памяти и в SQLite.
+
+    python -m benchmarks.bench_ratelimit --pollers 50 --rate 20
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from ratelimit import MemoryState, RateLimiter, SqliteState
+
+WINDOW = 0.1
+
+
+def herd(pollers, limiter):
+    """Моменты начала запросов `pollers` потоков, стартовавших разом."""
+    started, moments = threading.Event(), []
+    lock = threading.Lock()
+
+    def poll():
+        started.wait()
+        if limiter is not None:
+            limiter.acquire()
+        with lock:
+            moments.append(time.monotonic())
+
+    threads = [threading.Thread(target=poll) for _ in range(pollers)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    return sorted(moments)
+
+
+def peak(moments, window=WINDOW):
+    """Наибольшее число моментов в скользящем окне `window` секунд."""
+    best, first = 0, 0
+    for last, moment in enumerate(moments):
+        while moment - moments[first] > window:
+            first += 1
+        best = max(best, last - first + 1)
+    return best
+
+
+def rate_of(moments):
+    span = moments[-1] - moments[0]
+    return (len(moments) - 1) / span if span else float('inf')
+
+
+def take_slots(path, rate, count, results):
+    limiter = RateLimiter(rate, state=SqliteState(path))
+    moments = []
+    for _ in range(count):
+        limiter.acquire()
+        moments.append(time.time())
+    limiter.close()
+    results.put(moments)
+
+
+def reserve_cost(state, calls):
+    limiter = RateLimiter(1e9, state=state)
+    started = time.perf_counter()
+    for _ in range(calls):
+        limiter.reserve()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pollers', type=int, default=50)
+    parser.add_argument('--rate', type=float, default=20)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f'{"режим":<28} {"пик за 100 мс":>14} {"запросов/с":>11}')
+    for name, limiter in (
+        ('без лимита', None),
+        (f'лимит {args.rate:g}/с', RateLimiter(args.rate)),
+        (f'лимит {args.rate:g}/с, burst 5', RateLimiter(args.rate, 5)),
+    ):
+        moments = herd(args.pollers, limiter)
+        print(f'{name:<28} {peak(moments):>14} {rate_of(moments):>11.1f}')
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    per_process = args.pollers // args.processes
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ratelimit.db')
+        SqliteState(path).close()
+        processes = [
+            context.Process(
+                target=take_slots,
+                args=(path, args.rate, per_process, results),
+            )
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        moments = sorted(
+            moment for _ in processes for moment in results.get()
+        )
+        for process in processes:
+            process.join()
+        print(f'{f"{args.processes} процесса, SQLite":<28} '
+              f'{peak(moments):>14} {rate_of(moments):>11.1f}')
+
+        print(f'\nreserve() в памяти: '
+              f'{reserve_cost(MemoryState(), args.calls):.1f} мкс, '
+              f'в SQLite: {reserve_cost(SqliteState(path), args.calls):.1f} '
+              f'мкс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Холодный старт: сколько стоит `import homework`.
+
+Импорт выполняется в отдельном интерпретаторе с `-X importtime`;
+берётся медиана накопленного времени модуля по нескольким запускам и
+самые дорогие модули последнего запуска. С `--threshold` скрипт
+завершается с кодом 1, если медиана превысила порог, — так его можно
+поставить в CI как проверку регрессии.
+
+    python -m benchmarks.bench_startup --runs 7 --threshold 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """Накладные `{модуль: (собственное, накопленное)}` в микросекундах."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='homework')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--threshold', type=float,
+                        help='допустимая медиана, мс')
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        times = import_times(args.module)
+        totals.append(times[args.module][1] / 1000)
+    median = statistics.median(totals)
+
+    print(f'{"модуль":<32} {"своё, мс":>9} {"всего, мс":>10}')
+    heaviest = sorted(times.items(), key=lambda item: -item[1][0])
+    for name, (own, cumulative) in heaviest[:args.top]:
+        print(f'{name:<32} {own / 1000:>9.1f} {cumulative / 1000:>10.1f}')
+    for heavy in ('telegram', 'requests'):
+        state = 'загружен' if heavy in times else 'отложен'
+        print(f'{heavy}: {state}')
+    print(f'import {args.module}: медиана {median:.1f} мс, '
+          f'мин {min(totals):.1f}, макс {max(totals):.1f} '
+          f'({args.runs} запусков)')
+    if args.threshold is not None and median > args.threshold:
+        print(f'Порог {args.threshold:g} мс превышен', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
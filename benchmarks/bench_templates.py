@@ -0,0 +1,110 @@
+"""Отрисовка уведомлений: f-строка, шаблон без кэша и `templates`.
+
+Без кэша шаблон разбирается, а вердикт, постоянный текст и название
+экранируются при каждом сообщении; `templates.render` компилирует
+шаблон один раз на язык, статус и вердикт.
+
+    python -m benchmarks.bench_templates --updates 100000
+"""
+import argparse
+import time
+
+import templates
+from homework import HOMEWORK_VERDICTS
+from models import Homework
+
+NAMES = ('user__hw_python_oop.zip', 'api_final_yatube', 'kittygram<v2>')
+COMMENTS = ('', 'Всё нравится!', 'Поправь *README* и тесты (2 шт.)')
+
+
+def fstring(record, code=None):
+    """`parse_status` до появления шаблонов."""
+    return (
+        f'Изменился статус проверки работы "{record.name}". '
+        f'{record.verdict}'
+    )
+
+
+def uncompiled(record, code=None):
+    """Тот же шаблон, разбираемый и экранируемый при каждом вызове."""
+    texts = templates.LOCALES[code or templates.locale]
+    values = {
+        'status': record.status,
+        'verdict': texts['verdicts'].get(record.status, record.verdict),
+    }
+    mode = templates.parse_mode
+    name = templates.escape(record.name)
+    text = name.join(
+        templates.compile_template(texts['message'], values, mode)
+    )
+    if templates.comments and record.comment:
+        text += templates.escape(record.comment).join(
+            templates.compile_template(
+                texts['comment'], values, mode, 'comment',
+                templates.COMMENT_FIELDS,
+            )
+        )
+    return text
+
+
+def make_records(count):
+    """Записи с разными статусами, названиями и комментариями."""
+    statuses = list(HOMEWORK_VERDICTS)
+    return [
+        Homework.from_dict({
+            'id': number,
+            'homework_name': NAMES[number % len(NAMES)],
+            'status': statuses[number % len(statuses)],
+            'reviewer_comment': COMMENTS[number % len(COMMENTS)],
+        }, HOMEWORK_VERDICTS)
+        for number in range(count)
+    ]
+
+
+def measure(render, records, locales):
+    started = time.perf_counter()
+    for record, code in zip(records, locales):
+        render(record, code)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--updates', type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = make_records(args.updates)
+    default = [None] * len(records)
+    mixed = [('ru', 'en')[number % 2] for number in range(len(records))]
+    templates.configure()
+    assert all(
+        fstring(record) == templates.render(record) for record in records
+    )
+
+    cases = (
+        ('ru, без разметки', {}, default, fstring),
+        ('ru, MarkdownV2', {'mode': 'MarkdownV2'}, default, None),
+        ('ru+en, HTML', {'mode': 'HTML'}, mixed, None),
+        ('ru+en, MarkdownV2, комментарии',
+         {'mode': 'MarkdownV2', 'with_comments': True}, mixed, None),
+    )
+    print(f'{args.updates} обновлений, мкс на сообщение')
+    for title, options, locales, baseline in cases:
+        templates.configure(**options)
+        timings = [
+            ('f-строка', baseline),
+            ('без кэша', uncompiled),
+            ('templates', templates.render),
+        ]
+        cells = []
+        for name, render in timings:
+            if render is None:
+                continue
+            elapsed = measure(render, records, locales)
+            cells.append(f'{name} {elapsed / len(records) * 1e6:5.2f}')
+        print(f'{title:>32}: ' + ', '.join(cells))
+    templates.configure()
+
+
+if __name__ == '__main__':
+    main()
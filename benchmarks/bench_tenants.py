@@ -0,0 +1,73 @@
+"""Масштабирование опросов в секунду от 1 до 10k тенантов.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_tenants --max-tenants 10000 --workers 32
+"""
+import argparse
+import tracemalloc
+
+import homework
+import practicum
+from benchmarks.stub_server import PracticumStub
+from engine import PollingEngine
+from tenants import TenantRegistry
+
+
+def build_registry(size):
+    """Реестр из `size` синтетических тенантов."""
+    registry = TenantRegistry()
+    for number in range(size):
+        registry.add(f'token-{number}', str(100000 + number), 0)
+    return registry
+
+
+def measure_registry_memory(size):
+    """Байт на тенанта в реестре."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    registry = build_registry(size)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del registry
+    return (after - before) / size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-tenants', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--no-pool', action='store_true',
+                        help='новое соединение на каждый запрос')
+    args = parser.parse_args()
+
+    sizes = [1]
+    while sizes[-1] * 10 <= args.max_tenants:
+        sizes.append(sizes[-1] * 10)
+
+    with PracticumStub() as stub:
+        homework.ENDPOINT = stub.endpoint
+        print(f'{"тенантов":>10} {"время, с":>10} {"опросов/с":>12} '
+              f'{"ошибок":>8} {"байт/тенант":>12} {"соединений":>11}')
+        for size in sizes:
+            session = None if args.no_pool else practicum.configure(
+                args.workers
+            )
+            engine = PollingEngine(build_registry(size),
+                                   max_workers=args.workers)
+            try:
+                stats = engine.poll_once()
+            finally:
+                engine.close()
+            connections = (
+                size if session is None else session.stats()['connections']
+            )
+            practicum.reset()
+            print(f'{size:>10} {stats.elapsed:>10.3f} '
+                  f'{stats.polls_per_second:>12.1f} {stats.failed:>8} '
+                  f'{measure_registry_memory(size):>12.0f} '
+                  f'{connections:>11}')
+
+
+if __name__ == '__main__':
+    main()
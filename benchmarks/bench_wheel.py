@@ -0,0 +1,141 @@
+"""Нагрузка по периоду опроса: все тенанты разом или колесо таймеров.
+
+1. На модельных часах `--tenants` тенантов опрашиваются один период:
+   либо все в начале периода (`PollingEngine.run`), либо каждый в своей
+   фазе (`TimingWheel`). Показано число опросов по секундам периода.
+2. Цена колеса на `--tenants` ключах: добавление, удаление и
+   срабатывание на ключ.
+3. С `--live` `PollingEngine.run_spread` два периода `--live-period`
+   опрашивает заглушку Практикума; показаны запросы по секундам.
+
+    python -m benchmarks.bench_wheel --tenants 100000
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import homework
+import practicum
+from benchmarks.bench_tenants import build_registry
+from benchmarks.stub_server import PracticumStub
+from engine import PollingEngine
+from shutdown import GracefulShutdown
+from wheel import DEFAULT_SLOTS, TimingWheel
+
+
+class ModelClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def describe(name, counts):
+    print(f'{name:<22} макс {max(counts):>7} мин {min(counts):>7} '
+          f'среднее {statistics.mean(counts):>9.1f} '
+          f'σ {statistics.pstdev(counts):>8.1f}')
+
+
+def model_load(tenants, period, slots):
+    """Опросов по секундам периода: разом и по колесу."""
+    burst = [tenants] + [0] * (period - 1)
+    clock = ModelClock()
+    wheel = TimingWheel(period, slots, clock)
+    for number in range(tenants):
+        wheel.add(f'token-{number}', number)
+    spread = []
+    for second in range(period):
+        clock.now = second + 0.999
+        spread.append(len(wheel.advance()))
+    return burst, spread
+
+
+def wheel_costs(tenants, period, slots):
+    """Микросекунд на ключ: добавление, срабатывание, удаление."""
+    clock = ModelClock()
+    wheel = TimingWheel(period, slots, clock)
+    keys = [f'token-{number}' for number in range(tenants)]
+    started = time.perf_counter()
+    for key in keys:
+        wheel.add(key, key)
+    added = time.perf_counter() - started
+    clock.now = period
+    started = time.perf_counter()
+    fired = len(wheel.advance())
+    expired = time.perf_counter() - started
+    started = time.perf_counter()
+    for key in keys:
+        wheel.remove(key)
+    removed = time.perf_counter() - started
+    return [
+        seconds / count * 1e6
+        for seconds, count in ((added, tenants), (expired, fired),
+                               (removed, tenants))
+    ]
+
+
+def live_load(tenants, period, workers):
+    """Запросов к заглушке по секундам двух периодов `run_spread`."""
+    with PracticumStub() as stub:
+        homework.ENDPOINT = stub.endpoint
+        practicum.configure(workers)
+        engine = PollingEngine(build_registry(tenants), max_workers=workers)
+        shutdown = GracefulShutdown()
+        counts = []
+
+        def sample():
+            previous = stub.requests
+            for _ in range(2 * period):
+                time.sleep(1)
+                counts.append(stub.requests - previous)
+                previous = stub.requests
+            shutdown.requested = True
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        try:
+            engine.run_spread(period, shutdown)
+        except SystemExit:
+            pass
+        finally:
+            sampler.join()
+            engine.close()
+            practicum.reset()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, default=100_000)
+    parser.add_argument('--period', type=int, default=homework.RETRY_PERIOD)
+    parser.add_argument('--slots', type=int, default=DEFAULT_SLOTS)
+    parser.add_argument('--live', action='store_true')
+    parser.add_argument('--live-tenants', type=int, default=500)
+    parser.add_argument('--live-period', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f'{args.tenants} тенантов, период {args.period} с, '
+          f'опросов в секунду:')
+    burst, spread = model_load(args.tenants, args.period, args.slots)
+    describe('все разом', burst)
+    describe(f'колесо, {args.slots} делений', spread)
+
+    added, expired, removed = wheel_costs(
+        args.tenants, args.period, args.slots
+    )
+    print(f'\nколесо на {args.tenants} ключах, мкс на ключ: '
+          f'добавление {added:.2f}, срабатывание {expired:.2f}, '
+          f'удаление {removed:.2f}')
+
+    if args.live:
+        counts = live_load(args.live_tenants, args.live_period, args.workers)
+        print(f'\nrun_spread, {args.live_tenants} тенантов, период '
+              f'{args.live_period} с, запросов по секундам: {counts}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Опросов в секунду в зависимости от числа процессов-опросчиков.
+
+Опросчики запускает `Supervisor` из `supervisor.py`; синтетический
+реестр делится между ними по кольцу, как в режиме `WORKER_PROCESSES`.
+Каждый процесс `--seconds` секунд гоняет `PollingEngine.poll_once` по
+своим тенантам и собирает сообщения об изменениях. Заглушка Практикума
+слушает порт из `--stub-processes` процессов (`SO_REUSEPORT`), чтобы
+узким местом была не она. Рост близок к линейному, пока процессов
+опросчиков и заглушки вместе не больше, чем ядер.
+
+    python -m benchmarks.bench_workers --processes 1 2 4 --tenants 2000
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import homework
+import practicum
+import templates
+from benchmarks.bench_tenants import build_registry
+from benchmarks.stub_server import PracticumStub
+from engine import PollingEngine
+from models import Homework
+from supervisor import HashRing, Supervisor, select_shard
+
+CHANGE_RATE = 0.5
+
+
+def serve_stub(port, stop):
+    """Ещё один процесс заглушки на общем порту."""
+    with PracticumStub(port=port, change_rate=CHANGE_RATE, reuse_port=True):
+        stop.wait()
+
+
+def render(tenant, homeworks):
+    for item in homeworks:
+        templates.render(Homework.from_dict(item, homework.HOMEWORK_VERDICTS))
+
+
+def poll_shard(endpoint, tenants, threads, seconds, ready, start, results,
+               slot, count):
+    """Опросчик: свой шард реестра, опросы до конца замера."""
+    homework.ENDPOINT = endpoint
+    practicum.configure(threads)
+    registry = select_shard(build_registry(tenants), HashRing(range(count)),
+                            slot)
+    engine = PollingEngine(registry, max_workers=threads, on_update=render)
+    ready.put(slot)
+    start.wait()
+    polls = 0
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < seconds:
+            polls += engine.poll_once().polled
+    finally:
+        engine.close()
+    results.put((len(registry), polls / (time.monotonic() - started)))
+
+
+def measure(count, args, endpoint):
+    """Суммарные опросы в секунду и размеры шардов при `count` процессах."""
+    context = multiprocessing.get_context('spawn')
+    ready, results, start = context.Queue(), context.Queue(), context.Event()
+    supervisor = Supervisor(poll_shard, count, args=(
+        endpoint, args.tenants, args.threads, args.seconds,
+        ready, start, results,
+    )).start()
+    try:
+        for _ in range(count):
+            ready.get()
+        start.set()
+        shards = [results.get() for _ in range(count)]
+    finally:
+        supervisor.stop(timeout=5)
+    return sum(rate for _, rate in shards), [size for size, _ in shards]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    cores = os.cpu_count() or 1
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores}))
+    parser.add_argument('--tenants', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--stub-processes', type=int, default=cores)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    with PracticumStub(change_rate=CHANGE_RATE, reuse_port=True) as stub:
+        port = int(stub.base_url.rsplit(':', 1)[1])
+        stubs = [
+            context.Process(target=serve_stub, args=(port, stop))
+            for _ in range(args.stub_processes - 1)
+        ]
+        for process in stubs:
+            process.start()
+        print(f'ядер: {cores}, процессов заглушки: {args.stub_processes}')
+        print(f'{"процессов":>9} {"тенантов в шарде":>17} '
+              f'{"опросов/с":>10} {"ускорение":>10} {"на процесс":>11}')
+        baseline = None
+        try:
+            for count in args.processes:
+                rate, sizes = measure(count, args, stub.endpoint)
+                baseline = baseline or rate
+                print(f'{count:>9} {min(sizes):>8}–{max(sizes):<8} '
+                      f'{rate:>10.0f} {rate / baseline:>9.2f}x '
+                      f'{rate / baseline / count:>10.0%}')
+        finally:
+            stop.set()
+            for process in stubs:
+                process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""Нагрузочный тест бота против локальных заглушек Практикума и Telegram.
+
+Запускает `homework.main()` (один студент) или `PollingEngine`
+(`--tenants N`) на `--duration` секунд, внедряя сбои в заглушки. Затем
+сбои выключаются, бот дорабатывает очередь, и отчёт сравнивает:
+
+* исходы ответов заглушки с исключениями клиента (500 и 429 —
+  `HttpError`, обрезанный JSON — `JsonError`);
+* число изменений статусов с числом доставленных уведомлений.
+
+Сеть не нужна. Код возврата 1 — если нашлось расхождение.
+
+    python -m benchmarks.load_test --duration 10 --period 0.01 \\
+        --error-rate 0.05 --throttle-rate 0.02 --malformed-rate 0.02
+    python -m benchmarks.load_test --tenants 1000 --workers 32
+"""
+import argparse
+import functools
+import sys
+import threading
+import time
+from collections import Counter
+
+import telegram
+
+import engine
+import homework
+import practicum
+from benchmarks.stub_server import (ERROR, MALFORMED, OK, THROTTLED,
+                                    PracticumStub, TelegramStub)
+from dedup import DedupStore
+from exceptions import HttpError, JsonError
+from history import NullHistoryStore
+from outbox import Outbox
+from tenants import TenantRegistry
+from webhook import StatusCache
+
+NOTIFICATION = 'Изменился статус проверки работы'
+
+
+class StopLoadTest(BaseException):
+    """Останавливает `homework.main()` из подменённого `time.sleep`."""
+
+
+class _Clock:
+    """Модуль `time` для `homework`, чей `sleep` можно прервать."""
+
+    def __init__(self):
+        self.stopping = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def sleep(self, seconds):
+        if self.stopping.wait(seconds):
+            raise StopLoadTest
+
+
+class Probe:
+    """Обёртка `homework.request_api`: задержки и исходы вызовов."""
+
+    def __init__(self, request_api):
+        self.request_api = request_api
+        self.calls = []
+        self.outcomes = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, timestamp, headers):
+        started = time.perf_counter()
+        outcome = OK
+        try:
+            return self.request_api(timestamp, headers)
+        except HttpError as error:
+            outcome = {500: ERROR, 429: THROTTLED}.get(
+                error.status_code, f'http {error.status_code}'
+            )
+            raise
+        except JsonError:
+            outcome = MALFORMED
+            raise
+        except Exception as error:
+            outcome = type(error).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.calls.append((started, elapsed))
+                self.outcomes[outcome] += 1
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def count_notifications(telegram_stub):
+    with telegram_stub._lock:
+        texts = [message.get('text', '') for message in telegram_stub.messages]
+    return sum(text.count(NOTIFICATION) for text in texts), len(texts)
+
+
+def wait_delivery(practicum_stub, telegram_stub, timeout):
+    """Ждёт, пока все изменения статусов дойдут до Telegram."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        delivered, _ = count_notifications(telegram_stub)
+        if delivered >= practicum_stub.changes:
+            return
+        time.sleep(0.05)
+
+
+def quiesce(*stubs):
+    for stub in stubs:
+        stub.error_rate = stub.throttle_rate = stub.malformed_rate = 0.0
+        stub.change_rate = 0.0
+
+
+def run_main(args, practicum_stub, telegram_stub):
+    """`homework.main()` в потоке; остановка через `time.sleep`."""
+    clock = _Clock()
+    patches = {
+        'ENDPOINT': practicum_stub.endpoint,
+        'RETRY_PERIOD': args.period,
+        'PRACTICUM_TOKEN': 'load-test',
+        'HEADERS': homework.make_headers('load-test'),
+        'TELEGRAM_TOKEN': '123:load-test',
+        'TELEGRAM_CHAT_ID': '1',
+        'TELEGRAM_OUTBOX': '1' if args.outbox else None,
+        'time': clock,
+    }
+    saved = {name: getattr(homework, name) for name in patches}
+    bot_class = telegram.Bot
+    for name, value in patches.items():
+        setattr(homework, name, value)
+    telegram.Bot = functools.partial(bot_class, base_url=telegram_stub.bot_url)
+    errors = []
+
+    def target():
+        try:
+            homework.main()
+        except StopLoadTest:
+            pass
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=target, name='main', daemon=True)
+    try:
+        thread.start()
+        time.sleep(args.duration)
+        quiesce(practicum_stub, telegram_stub)
+        wait_delivery(practicum_stub, telegram_stub, args.settle)
+    finally:
+        clock.stopping.set()
+        thread.join(args.settle)
+        telegram.Bot = bot_class
+        for name, value in saved.items():
+            setattr(homework, name, value)
+    if errors:
+        raise errors[0]
+
+
+def run_engine(args, practicum_stub, telegram_stub):
+    """`PollingEngine` с отправкой через `Outbox`, как `run_tenants`."""
+    registry = TenantRegistry()
+    for number in range(args.tenants):
+        registry.add(f'tenant-{number}', str(number + 1), 0)
+    bot = Outbox(
+        telegram.Bot('123:load-test', base_url=telegram_stub.bot_url),
+        per_chat_rate=args.telegram_rate, global_rate=args.telegram_rate,
+    ).start()
+    on_update = engine.make_update_handler(
+        bot, StatusCache(), DedupStore(), NullHistoryStore()
+    )
+    saved_endpoint = homework.ENDPOINT
+    homework.ENDPOINT = practicum_stub.endpoint
+    practicum.configure(args.workers)
+    poller = engine.PollingEngine(
+        registry, max_workers=args.workers, on_update=on_update,
+        on_error=lambda tenant, error: None,
+    )
+    try:
+        deadline = time.monotonic() + args.duration
+        while time.monotonic() < deadline:
+            stats = poller.poll_once()
+            time.sleep(max(0.0, args.period - stats.elapsed))
+        quiesce(practicum_stub, telegram_stub)
+        wait_delivery(practicum_stub, telegram_stub, args.settle)
+    finally:
+        poller.close()
+        bot.close(args.settle)
+        practicum.reset()
+        homework.ENDPOINT = saved_endpoint
+
+
+def run(args):
+    """Прогон теста; возвращает отчёт."""
+    practicum_stub = PracticumStub(
+        latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        malformed_rate=args.malformed_rate, change_rate=args.change_rate,
+        seed=args.seed,
+    )
+    telegram_stub = TelegramStub(
+        error_rate=args.telegram_error_rate,
+        throttle_rate=args.telegram_throttle_rate, seed=args.seed,
+    )
+    probe = Probe(homework.request_api)
+    homework.request_api = probe
+    started = time.perf_counter()
+    try:
+        with practicum_stub, telegram_stub:
+            if args.tenants:
+                run_engine(args, practicum_stub, telegram_stub)
+            else:
+                run_main(args, practicum_stub, telegram_stub)
+    finally:
+        homework.request_api = probe.request_api
+    load_end = started + args.duration
+    latencies = [elapsed for at, elapsed in probe.calls if at < load_end]
+    delivered, sent = count_notifications(telegram_stub)
+    served = +practicum_stub.outcomes
+    served.pop('unauthorized', None)
+    return {
+        'elapsed': args.duration,
+        'requests': len(latencies),
+        'throughput': len(latencies) / args.duration,
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+        'served': served,
+        'observed': +probe.outcomes,
+        'changes': practicum_stub.changes,
+        'delivered': delivered,
+        'messages': sent,
+        'telegram': +telegram_stub.outcomes,
+    }
+
+
+def check(report):
+    """Список расхождений отчёта."""
+    problems = []
+    if report['served'] != report['observed']:
+        problems.append(
+            f'исходы заглушки {dict(report["served"])} не совпали с '
+            f'исключениями клиента {dict(report["observed"])}'
+        )
+    if report['delivered'] != report['changes']:
+        problems.append(
+            f'изменений статуса {report["changes"]}, '
+            f'доставлено уведомлений {report["delivered"]}'
+        )
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--period', type=float, default=0.01,
+                        help='интервал опроса вместо RETRY_PERIOD')
+    parser.add_argument('--tenants', type=int, default=0,
+                        help='0 — homework.main(), иначе PollingEngine')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--outbox', action='store_true',
+                        help='main() отправляет через Outbox')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--throttle-rate', type=float, default=0.02)
+    parser.add_argument('--malformed-rate', type=float, default=0.02)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-throttle-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-rate', type=float, default=1000.0,
+                        help='лимит Outbox, сообщений в секунду')
+    parser.add_argument('--settle', type=float, default=10.0,
+                        help='сколько ждать доставки после нагрузки')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    report = run(parse_args(argv))
+    print(f'запросов к API: {report["requests"]} за '
+          f'{report["elapsed"]:.1f} с, {report["throughput"]:.0f} в секунду')
+    print(f'задержка запроса: p50 {report["p50"] * 1000:.2f} мс, '
+          f'p99 {report["p99"] * 1000:.2f} мс')
+    print(f'исходы ответов: {dict(report["served"])}')
+    print(f'изменений статуса: {report["changes"]}, доставлено: '
+          f'{report["delivered"]} в {report["messages"]} сообщениях; '
+          f'ответы Telegram: {dict(report["telegram"])}')
+    problems = check(report)
+    for problem in problems:
+        print(f'РАСХОЖДЕНИЕ: {problem}')
+    if not problems:
+        print('обработка ошибок и доставка: без расхождений')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
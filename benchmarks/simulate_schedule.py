@@ -0,0 +1,125 @@
+"""Симуляция расписаний опроса на синтетических историях статусов.
+
+Для каждой истории проигрывается работа бота: опрос видит только
+последний статус работ, изменившихся с прошлого опроса, а во время
+простоев API получает `HttpError`. Отчёт: задержка уведомления
+(медиана, p90), пропущенные промежуточные статусы и число запросов.
+
+    python -m benchmarks.simulate_schedule --students 200 --days 30
+"""
+import argparse
+import random
+import statistics
+
+from exceptions import HttpError
+from scheduler import AdaptiveSchedule, FixedSchedule
+
+RETRY_PERIOD = 600
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def generate_timeline(rng, horizon):
+    """События (время, статус) одной работы и окна простоя API."""
+    events = []
+    now = rng.expovariate(1 / (2 * DAY))
+    while now < horizon:
+        now += rng.expovariate(1 / (6 * HOUR))
+        events.append((now, 'reviewing'))
+        now += rng.expovariate(1 / (40 * 60))
+        verdict = 'approved' if rng.random() < 0.7 else 'rejected'
+        events.append((now, verdict))
+        pause = DAY if verdict == 'rejected' else 3 * DAY
+        now += rng.expovariate(1 / pause)
+    outages = []
+    start = rng.expovariate(1 / (7 * DAY))
+    while start < horizon:
+        outages.append((start, start + rng.uniform(10 * 60, 2 * HOUR)))
+        start += rng.expovariate(1 / (7 * DAY))
+    return [event for event in events if event[0] < horizon], outages
+
+
+def replay(schedule, events, outages, horizon, clock):
+    """Проигрывает один таймлайн, возвращает задержки и число запросов."""
+    delays, missed, requests = [], 0, 0
+    pending = []
+    index = 0
+    now = 0.0
+    while now < horizon:
+        clock.now = now
+        requests += 1
+        while index < len(events) and events[index][0] <= now:
+            pending.append(events[index])
+            index += 1
+        if any(start <= now < end for start, end in outages):
+            schedule.observe_error(HttpError('Код ответа != 200.'))
+        else:
+            if pending:
+                delays.append(now - pending[-1][0])
+                missed += len(pending) - 1
+                schedule.observe([{'status': pending[-1][1]}])
+                pending = []
+            else:
+                schedule.observe([])
+        now += schedule.next_delay()
+    return delays, missed, requests
+
+
+class SimClock:
+    """Часы симуляции для `AdaptiveSchedule`."""
+
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(factory, timelines, horizon):
+    """Сводка по всем таймлайнам для одного вида расписания."""
+    all_delays, all_missed, all_requests = [], 0, 0
+    for events, outages in timelines:
+        clock = SimClock()
+        delays, missed, requests = replay(
+            factory(clock), events, outages, horizon, clock
+        )
+        all_delays += delays
+        all_missed += missed
+        all_requests += requests
+    all_delays.sort()
+    p90 = all_delays[int(len(all_delays) * 0.9)] if all_delays else 0
+    return {
+        'median': statistics.median(all_delays) if all_delays else 0,
+        'p90': p90,
+        'missed': all_missed,
+        'requests': all_requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    horizon = args.days * DAY
+    timelines = [
+        generate_timeline(rng, horizon) for _ in range(args.students)
+    ]
+    schedules = {
+        'fixed': lambda clock: FixedSchedule(RETRY_PERIOD),
+        'adaptive': lambda clock: AdaptiveSchedule(
+            RETRY_PERIOD, clock=clock, rng=random.Random(args.seed)
+        ),
+    }
+    print(f'{"расписание":<10} {"медиана, с":>11} {"p90, с":>8} '
+          f'{"пропущено":>10} {"запросов":>10}')
+    for name, factory in schedules.items():
+        report = simulate(factory, timelines, horizon)
+        print(f'{name:<10} {report["median"]:>11.0f} {report["p90"]:>8.0f} '
+              f'{report["missed"]:>10} {report["requests"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""Локальные заглушки API Практикума и Bot API для бенчмарков и тестов.
+
+Обе заглушки умеют задерживать ответ и с заданной вероятностью
+отвечать ошибкой 5xx, 429 с `Retry-After` или (Практикум) обрезанным
+JSON. Случайность детерминирована `seed`; исходы считаются в `outcomes`.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+API_PATH = '/api/user_api/homework_statuses/'
+STATUS_CYCLE = ('reviewing', 'approved', 'reviewing', 'rejected')
+
+OK = 'ok'
+ERROR = 'error'
+THROTTLED = 'throttled'
+MALFORMED = 'malformed'
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class _SharedPortServer(_Server):
+    allow_reuse_port = True
+
+
+class PracticumStubHandler(BaseHTTPRequestHandler):
+    """Отвечает как `ENDPOINT`: работы с новым статусом и текущая дата."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None, body=None):
+        if body is None:
+            body = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fault(self, outcome):
+        """Ответ на внедрённый сбой; True — ответ уже отправлен."""
+        if outcome == ERROR:
+            self._reply(HTTPStatus.INTERNAL_SERVER_ERROR, {
+                'ok': False, 'error_code': 500,
+                'description': 'Internal Server Error',
+            })
+        elif outcome == THROTTLED:
+            retry_after = self.server.stub.retry_after
+            self._reply(HTTPStatus.TOO_MANY_REQUESTS, {
+                'ok': False, 'error_code': 429,
+                'description': 'Too Many Requests',
+                'parameters': {'retry_after': retry_after},
+            }, {'Retry-After': str(retry_after)})
+        elif outcome == MALFORMED:
+            self._reply(HTTPStatus.OK, None, body=b'{"homeworks": [{"id"')
+        else:
+            return False
+        return True
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count_request()
+        if stub.latency:
+            time.sleep(stub.latency)
+        if not self.path.startswith(API_PATH):
+            return self._reply(HTTPStatus.NOT_FOUND, {'detail': 'Not found'})
+        token = self.headers.get('Authorization', '')
+        if not token.startswith('OAuth '):
+            stub.count_outcome('unauthorized')
+            return self._reply(HTTPStatus.UNAUTHORIZED, {
+                'code': 'not_authenticated',
+                'message': 'Учетные данные не были предоставлены.',
+            })
+        outcome = stub.next_outcome()
+        if self._fault(outcome):
+            return None
+        homeworks = stub.homeworks_for(token)
+        headers = {}
+        if stub.etag:
+            tag = '"%08x"' % zlib.crc32(json.dumps(homeworks).encode())
+            if self.headers.get('If-None-Match') == tag:
+                return self._reply(HTTPStatus.NOT_MODIFIED, None)
+            headers['ETag'] = tag
+        return self._reply(HTTPStatus.OK, {
+            'homeworks': homeworks,
+            'current_date': int(time.time()),
+        }, headers)
+
+
+class PracticumStub:
+    """HTTP-сервер заглушки в фоновом потоке.
+
+    Используется как контекстный менеджер; `endpoint` подставляется
+    вместо `homework.ENDPOINT`, `latency` — задержка ответа в секундах,
+    `etag` — отдавать `ETag` и отвечать 304 на условные запросы.
+    `error_rate`, `throttle_rate`, `malformed_rate` — доли ответов 500,
+    429 и обрезанного JSON. С вероятностью `change_rate` успешный ответ
+    содержит работу токена с новым статусом; число таких изменений
+    в `changes` — столько уведомлений должен отправить бот.
+    `reuse_port` — слушать порт вместе с другими процессами
+    (`SO_REUSEPORT`), чтобы заглушка не упиралась в одно ядро.
+    """
+
+    handler_class = PracticumStubHandler
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, etag=False,
+                 error_rate=0.0, throttle_rate=0.0, malformed_rate=0.0,
+                 change_rate=0.0, retry_after=1, seed=None,
+                 reuse_port=False):
+        self.latency = latency
+        self.etag = etag
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.malformed_rate = malformed_rate
+        self.change_rate = change_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        server_class = _SharedPortServer if reuse_port else _Server
+        self._server = server_class((host, port), self.handler_class)
+        self._server.stub = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.outcomes = Counter()
+        self.changes = 0
+        self.started = int(time.time())
+        self._homeworks = {}
+
+    def count_request(self):
+        """Учитывает обращение к заглушке."""
+        with self._lock:
+            self.requests += 1
+
+    def count_outcome(self, outcome):
+        """Учитывает исход ответа."""
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def next_outcome(self):
+        """Случайный исход ответа по заданным долям сбоев."""
+        with self._lock:
+            value = self.rng.random()
+            outcome = OK
+            for name, rate in ((ERROR, self.error_rate),
+                               (THROTTLED, self.throttle_rate),
+                               (MALFORMED, self.malformed_rate)):
+                if value < rate:
+                    outcome = name
+                    break
+                value -= rate
+            self.outcomes[outcome] += 1
+            return outcome
+
+    def homeworks_for(self, token):
+        """Работы для успешного ответа: изменившаяся или ни одной."""
+        with self._lock:
+            if not self.change_rate or self.rng.random() >= self.change_rate:
+                return []
+            step = self._homeworks.get(token, -1) + 1
+            self._homeworks[token] = step
+            self.changes += 1
+        return [{
+            'id': zlib.crc32(token.encode()),
+            'homework_name': f'{token[6:]}__hw.zip',
+            'status': STATUS_CYCLE[step % len(STATUS_CYCLE)],
+            # Секунда на каждое изменение: даты не совпадают, даже если
+            # статус вернулся к прежнему в ту же секунду.
+            'date_updated': time.strftime(
+                '%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.started + step)
+            ),
+        }]
+
+    @property
+    def base_url(self):
+        """Адрес сервера без пути."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def endpoint(self):
+        """Адрес, подменяющий `homework.ENDPOINT`."""
+        return self.base_url + API_PATH
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и закрывает сокет."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class TelegramStubHandler(PracticumStubHandler):
+    """Отвечает как Bot API на `sendMessage` и `setWebhook`."""
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub.count_request()
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if stub.latency:
+            time.sleep(stub.latency)
+        if self.headers.get('Content-Type', '').startswith(
+            'application/json'
+        ):
+            params = json.loads(body or b'{}')
+        else:
+            params = dict(parse_qsl(body.decode()))
+        method = self.path.rsplit('/', 1)[-1]
+        if method == 'sendMessage':
+            if self._fault(stub.next_outcome()):
+                return None
+            message = stub.record(params)
+            return self._reply(HTTPStatus.OK, {'ok': True, 'result': message})
+        if method in ('setWebhook', 'deleteWebhook'):
+            return self._reply(HTTPStatus.OK, {'ok': True, 'result': True})
+        return self._reply(HTTPStatus.NOT_FOUND, {
+            'ok': False, 'error_code': 404, 'description': 'Not Found',
+        })
+
+
+class TelegramStub(PracticumStub):
+    """Заглушка Bot API: запоминает отправленные сообщения.
+
+    `bot_url` передаётся в `telegram.Bot(token, base_url=...)`.
+    Сбои внедряются только в `sendMessage`; обрезанный JSON не
+    поддерживается — Bot API так не отвечает.
+    """
+
+    handler_class = TelegramStubHandler
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 seed=None):
+        super().__init__(host, port, latency, error_rate=error_rate,
+                         throttle_rate=throttle_rate,
+                         retry_after=retry_after, seed=seed)
+        self.messages = []
+
+    @property
+    def bot_url(self):
+        """Префикс адреса методов Bot API."""
+        return self.base_url + '/bot'
+
+    def record(self, params):
+        """Запоминает сообщение и возвращает его в формате Bot API."""
+        with self._lock:
+            self.messages.append(params)
+            message_id = len(self.messages)
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(params['chat_id']), 'type': 'private'},
+            'text': params.get('text', ''),
+        }
@@ -0,0 +1,134 @@
+"""Предохранитель для запросов к API Практикума.
+
+После `failure_threshold` сбоев подряд предохранитель размыкается, и
+вызовы сразу завершаются `CircuitOpenError`, не занимая поток ожиданием
+таймаута. Через `recovery_timeout` секунд пропускается `half_open_calls`
+пробных запросов: успех замыкает цепь, сбой размыкает её снова.
+"""
+import logging
+import threading
+import time
+from http import HTTPStatus
+
+import metrics
+from exceptions import ApiError, CircuitOpenError, HttpError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+FAILURE_THRESHOLD = 5
+RECOVERY_TIMEOUT = 60.0
+HALF_OPEN_CALLS = 1
+
+
+def is_failure(error):
+    """Сбой на стороне API, а не ошибка конкретного запроса.
+
+    Ответы 4xx, кроме 429, означают проблему с токеном или запросом
+    одного тенанта и не должны размыкать цепь для остальных.
+    """
+    if isinstance(error, HttpError):
+        status = error.status_code
+        return (
+            status is None
+            or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or status == HTTPStatus.TOO_MANY_REQUESTS
+        )
+    return isinstance(error, ApiError)
+
+
+class CircuitBreaker:
+    """Предохранитель с состояниями closed, open и half_open."""
+
+    def __init__(self, name='practicum', failure_threshold=FAILURE_THRESHOLD,
+                 recovery_timeout=RECOVERY_TIMEOUT,
+                 half_open_calls=HALF_OPEN_CALLS, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self._lock = threading.Lock()
+        self._gauge = metrics.BREAKER_STATE.labels(name)
+        self._gauge.set(STATE_VALUES[CLOSED])
+
+    def _switch(self, state):
+        previous, self.state = self.state, state
+        self._gauge.set(STATE_VALUES[state])
+        if state == OPEN:
+            self.opened_at = self.clock()
+            logger.error(
+                f'Предохранитель {self.name}: {previous} -> {state}, '
+                f'сбоев подряд: {self.failures}, '
+                f'повтор через {self.recovery_timeout} с'
+            )
+        else:
+            logger.warning(
+                f'Предохранитель {self.name}: {previous} -> {state}'
+            )
+
+    def before(self):
+        """Разрешает вызов или бросает `CircuitOpenError`."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.recovery_timeout - (
+                    self.clock()
+                )
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f'API недоступен, запросы приостановлены '
+                        f'на {remaining:.0f} с'
+                    )
+                self._switch(HALF_OPEN)
+                self.probes = 0
+            if self.state == HALF_OPEN:
+                if self.probes >= self.half_open_calls:
+                    raise CircuitOpenError('API недоступен, идёт проверка')
+                self.probes += 1
+
+    def record(self, error=None):
+        """Учитывает результат вызова, разрешённого `before()`."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+            if error is not None and is_failure(error):
+                self.failures += 1
+                if self.state == HALF_OPEN or (
+                    self.state == CLOSED
+                    and self.failures >= self.failure_threshold
+                ):
+                    self._switch(OPEN)
+                return
+            self.failures = 0
+            if self.state == HALF_OPEN:
+                self._switch(CLOSED)
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает `func` через предохранитель."""
+        self.before()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record(error)
+            raise
+        self.record()
+        return result
+
+    async def acall(self, func, *args, **kwargs):
+        """Асинхронный аналог `call` для корутинной функции."""
+        self.before()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as error:
+            self.record(error)
+            raise
+        self.record()
+        return result
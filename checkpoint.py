@@ -0,0 +1,117 @@
+"""Хранилище контрольной точки: дата опроса и последнее отправленное.
+
+После перезапуска бот продолжает опрос с сохранённой даты, поэтому
+изменения, пришедшие во время простоя, не теряются, а уже отправленные
+сообщения не дублируются.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+class NullCheckpointStore:
+    """Ничего не хранит: поведение бота без контрольной точки."""
+
+    def load(self):
+        """Сохранённое состояние или пустой словарь."""
+        return {}
+
+    def save(self, state):
+        """Сохраняет состояние."""
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+
+
+class FileCheckpointStore(NullCheckpointStore):
+    """JSON-файл, перезаписываемый атомарно через `os.replace`."""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+
+    def load(self):
+        """Читает файл; повреждённый файл не мешает запуску."""
+        try:
+            with open(self.path, encoding='utf-8') as checkpoint_file:
+                state = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.error(f'Не удалось прочитать {self.path}: {error}')
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def save(self, state):
+        """Пишет во временный файл рядом и подменяет им старый."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix='.checkpoint-', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as temp_file:
+                json.dump(state, temp_file, ensure_ascii=False)
+                if self.fsync:
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class SqliteCheckpointStore(NullCheckpointStore):
+    """Таблица ключ-значение в SQLite, запись одной транзакцией."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoint '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        self._connection.commit()
+
+    def load(self):
+        """Собирает состояние из всех ключей таблицы."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key, value FROM checkpoint'
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save(self, state):
+        """Заменяет ключи состояния в одной транзакции."""
+        rows = [
+            (key, json.dumps(value, ensure_ascii=False))
+            for key, value in state.items()
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO checkpoint (key, value) '
+                'VALUES (?, ?)', rows
+            )
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._connection.close()
+
+
+def open_store(path):
+    """Хранилище по пути: SQLite для .db/.sqlite, иначе JSON-файл."""
+    if not path:
+        return NullCheckpointStore()
+    if path.endswith(SQLITE_SUFFIXES):
+        return SqliteCheckpointStore(path)
+    return FileCheckpointStore(path)
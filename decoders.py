@@ -0,0 +1,60 @@
+"""Разбор JSON из ответов API: orjson, ujson или стандартный json.
+
+Все декодеры читают байты тела напрямую, без промежуточной строки.
+Ошибка разбора у каждого — подкласс `ValueError`, в `request_api` она
+становится `JsonError`.
+"""
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _orjson():
+    import orjson
+    return orjson.loads
+
+
+def _ujson():
+    import ujson
+    return ujson.loads
+
+
+BACKENDS = {
+    'orjson': _orjson,
+    'ujson': _ujson,
+    'json': lambda: json.loads,
+}
+AUTO_ORDER = ('orjson', 'ujson', 'json')
+
+name = 'json'
+loads = json.loads
+
+
+def available():
+    """Имена установленных декодеров в порядке предпочтения."""
+    names = []
+    for candidate in AUTO_ORDER:
+        try:
+            BACKENDS[candidate]()
+        except ImportError:
+            continue
+        names.append(candidate)
+    return names
+
+
+def configure(backend='auto'):
+    """Выбирает декодер; недоступный заменяется стандартным json."""
+    global name, loads
+    if backend in (None, '', 'auto'):
+        backend = available()[0]
+    factory = BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f'Неизвестный декодер JSON: {backend}')
+    try:
+        loads = factory()
+    except ImportError:
+        logger.warning(f'Декодер {backend} не установлен, используем json')
+        backend, loads = 'json', json.loads
+    name = backend
+    return name
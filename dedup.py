@@ -0,0 +1,121 @@
+"""Уже отправленные изменения статусов: ограниченное хранилище с LRU и TTL.
+
+Запись — кортеж (чат, работа, статус, `date_updated`): повторная
+проверка с новой датой — новое изменение, даже если статус вернулся
+к прежнему. Хранилище — `OrderedDict` в порядке последнего обращения:
+поиск, вставка и вытеснение за O(1). Старейшие записи вытесняются при
+превышении `max_size` или через `ttl` секунд после последнего
+обращения. Для контрольной точки есть `dump()` и `load()`.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 100_000
+
+
+class DedupStore:
+    """Множество отправленных (чат, работа, статус, дата)."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=None,
+                 clock=time.time):
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self.clock = clock
+        self.evicted = 0
+        self.expired = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(chat_id, key, status, date_updated):
+        """Ключ записи; повторяющиеся строки интернируются."""
+        return (
+            sys.intern(str(chat_id)), sys.intern(key),
+            sys.intern(status), date_updated,
+        )
+
+    def _alive(self, entry, now):
+        seen = self._entries.get(entry)
+        if seen is None:
+            return False
+        if self.ttl is None or now - seen < self.ttl:
+            return True
+        del self._entries[entry]
+        self.expired += 1
+        return False
+
+    def seen(self, chat_id, key, status, date_updated=''):
+        """Было ли изменение уже отправлено; ничего не запоминает."""
+        entry = self.make_key(chat_id, key, status, date_updated)
+        with self._lock:
+            return self._alive(entry, self.clock())
+
+    def add(self, chat_id, key, status, date_updated=''):
+        """Запоминает изменение; False — оно уже было отправлено."""
+        entry = self.make_key(chat_id, key, status, date_updated)
+        now = self.clock()
+        with self._lock:
+            known = self._alive(entry, now)
+            self._entries[entry] = now
+            self._entries.move_to_end(entry)
+            self._evict(now)
+            return not known
+
+    def _evict(self, now):
+        entries = self._entries
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evicted += 1
+        if self.ttl is None:
+            return
+        while entries and now - next(iter(entries.values())) >= self.ttl:
+            entries.popitem(last=False)
+            self.expired += 1
+
+    def dump(self):
+        """Записи для контрольной точки, от старых к новым."""
+        with self._lock:
+            return [[*entry, seen] for entry, seen in self._entries.items()]
+
+    def load(self, rows):
+        """Восстанавливает записи из `dump()`; истёкшие пропускаются."""
+        now = self.clock()
+        with self._lock:
+            for chat_id, key, status, date_updated, seen in rows:
+                if self.ttl is not None and now - seen >= self.ttl:
+                    continue
+                entry = self.make_key(chat_id, key, status, date_updated)
+                self._entries[entry] = seen
+                self._entries.move_to_end(entry)
+            self._evict(now)
+
+    def memory(self):
+        """Примерный объём памяти хранилища в байтах, со строками."""
+        with self._lock:
+            items = list(self._entries.items())
+        counted = set()
+        total = sys.getsizeof(self._entries)
+        for entry, seen in items:
+            total += sys.getsizeof(entry) + sys.getsizeof(seen)
+            for part in entry:
+                if id(part) not in counted:
+                    counted.add(id(part))
+                    total += sys.getsizeof(part)
+        return total
+
+    def stats(self):
+        """Размер, вытеснения и занятая память."""
+        size = len(self)
+        memory = self.memory()
+        return {
+            'entries': size,
+            'evicted': self.evicted,
+            'expired': self.expired,
+            'bytes': memory,
+            'bytes_per_entry': memory / size if size else 0.0,
+        }
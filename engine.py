@@ -0,0 +1,326 @@
+"""Опрос API Практикума сразу для многих тенантов из одного процесса."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+import metrics
+import practicum
+import profiling
+import templates
+from dedup import DedupStore
+from exceptions import CircuitOpenError
+from history import open_history_store
+from models import (Homework, parse_date, parse_homework,
+                    validate_response)
+from outbox import GLOBAL_RATE, PER_CHAT_RATE, Outbox
+from shutdown import GracefulShutdown
+from tenants import TenantRegistry
+from webhook import StatusCache, WebhookServer
+from wheel import DEFAULT_SLOTS, TimingWheel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 32
+
+
+class PollStats:
+    """Итоги одного прохода по тенантам."""
+
+    __slots__ = ('polled', 'updated', 'failed', 'elapsed')
+
+    def __init__(self):
+        self.polled = 0
+        self.updated = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def polls_per_second(self):
+        """Пропускная способность прохода."""
+        return self.polled / self.elapsed if self.elapsed else 0.0
+
+
+class PollingEngine:
+    """Опрашивает всех тенантов реестра пулом потоков.
+
+    Число одновременных запросов ограничено `max_workers`, а очередь
+    ожидающих задач — удвоенным числом потоков, поэтому расход памяти
+    растёт с числом тенантов только на размер самого реестра.
+    Общий предохранитель `breaker` при недоступности API не даёт
+    потокам ждать таймаутов: запросы остальных тенантов сразу
+    завершаются ошибкой до пробного запроса.
+    """
+
+    def __init__(self, registry, max_workers=DEFAULT_WORKERS,
+                 on_update=None, on_error=None, breaker=None):
+        self.registry = registry
+        self.breaker = breaker or homework.make_breaker()
+        self.max_workers = max_workers
+        self.on_update = on_update
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='poller'
+        )
+        self._lock = threading.Lock()
+
+    def poll_tenant(self, tenant):
+        """Опрашивает одного тенанта; возвращает список работ или None.
+
+        `timestamp` тенанта сдвигается, если `on_update` не вернул False.
+        """
+        try:
+            response = self.breaker.call(
+                homework.request_api,
+                tenant.timestamp, homework.make_headers(tenant.token)
+            )
+            homeworks, timestamp = validate_response(response)
+            if (
+                homeworks and self.on_update is not None
+                and self.on_update(tenant, homeworks) is False
+            ):
+                return homeworks
+            tenant.timestamp = timestamp
+        except Exception as error:
+            metrics.ERRORS.labels(type(error).__name__).inc()
+            tenant.errors += 1
+            if self.on_error is not None:
+                self.on_error(tenant, error)
+            elif isinstance(error, CircuitOpenError):
+                logger.debug(f'Опрос {tenant} пропущен: {error}')
+            else:
+                logger.error(f'Ошибка опроса {tenant}: {error}')
+            return None
+        tenant.errors = 0
+        return homeworks
+
+    def _count(self, stats, homeworks):
+        with self._lock:
+            stats.polled += 1
+            if homeworks is None:
+                stats.failed += 1
+            elif homeworks:
+                stats.updated += 1
+
+    def poll_once(self, shutdown=None):
+        """Один проход по всем тенантам, ждёт завершения всех запросов.
+
+        После сигнала остановки `shutdown` новые тенанты в пул не
+        отдаются, начатые запросы доводятся до конца.
+        """
+        stats = PollStats()
+        capacity = self.max_workers * 2
+        slots = threading.BoundedSemaphore(capacity)
+        started = time.monotonic()
+
+        def task(tenant):
+            try:
+                self._count(stats, self.poll_tenant(tenant))
+            finally:
+                slots.release()
+
+        for tenant in self.registry:
+            slots.acquire()
+            if shutdown is not None and shutdown.requested:
+                slots.release()
+                break
+            self._executor.submit(task, tenant)
+        for _ in range(capacity):
+            slots.acquire()
+        for _ in range(capacity):
+            slots.release()
+        stats.elapsed = time.monotonic() - started
+        return stats
+
+    def run(self, period=None, cycles=None, shutdown=None):
+        """Проходы раз в `period` секунд; `cycles=None` — бесконечно.
+
+        `shutdown` — `GracefulShutdown`: сигнал прерывает паузу между
+        проходами, а в начатом проходе доводятся до конца только уже
+        отправленные запросы.
+        """
+        period = homework.RETRY_PERIOD if period is None else period
+        shutdown = shutdown or GracefulShutdown()
+        done = 0
+        while cycles is None or done < cycles:
+            stats = self.poll_once(shutdown)
+            done += 1
+            logger.debug(
+                f'Опрошено {stats.polled} тенантов за {stats.elapsed:.2f} с, '
+                f'ошибок: {stats.failed}'
+            )
+            profiling.report()
+            if cycles is None or done < cycles:
+                with shutdown.interruptible():
+                    time.sleep(max(0.0, period - stats.elapsed))
+
+    def run_spread(self, period=None, shutdown=None, slots=DEFAULT_SLOTS):
+        """Каждый тенант раз в `period` секунд, в своей фазе периода.
+
+        Вместо прохода по всем тенантам разом один цикл раз в
+        `period / slots` секунд отдаёт пулу тенантов, чья фаза наступила
+        (`wheel.py`), и запросы идут ровным потоком. Тенант, чей прошлый
+        опрос ещё не закончился, пропускает оборот.
+        """
+        period = homework.RETRY_PERIOD if period is None else period
+        shutdown = shutdown or GracefulShutdown()
+        timers = TimingWheel(period, slots)
+        for tenant in self.registry:
+            timers.add(tenant.token, tenant)
+        busy = set()
+        stats = PollStats()
+
+        def task(tenant):
+            try:
+                self._count(stats, self.poll_tenant(tenant))
+            finally:
+                with self._lock:
+                    busy.discard(tenant.token)
+
+        while True:
+            for tenant in timers.advance():
+                if shutdown.requested:
+                    break
+                with self._lock:
+                    if tenant.token in busy:
+                        continue
+                    busy.add(tenant.token)
+                self._executor.submit(task, tenant)
+            if stats.polled >= len(timers):
+                logger.debug(
+                    f'Опрошено {stats.polled} тенантов, '
+                    f'ошибок: {stats.failed}'
+                )
+                profiling.report()
+                stats = PollStats()
+            with shutdown.interruptible():
+                time.sleep(timers.until_next())
+
+    def close(self):
+        """Останавливает пул потоков."""
+        self._executor.shutdown(wait=True)
+
+
+def load_registry(path, shard=None):
+    """Реестр из файла; `shard(registry)` оставляет тенантов процесса."""
+    registry = TenantRegistry.from_file(path)
+    if shard is not None:
+        shard(registry)
+    return registry
+
+
+def new_records(tenant, homeworks, dedup):
+    """Поля записей ответа, о которых чат тенанта ещё не знает, и их ключи.
+
+    Запись, которую не удалось разобрать, пропускается с ошибкой в
+    логе: остальные изменения ответа всё равно доставляются.
+    """
+    changes, records = set(), []
+    for item in sorted(homeworks, key=homework.update_order):
+        try:
+            fields = parse_homework(item, homework.HOMEWORK_VERDICTS)
+        except Exception as error:
+            metrics.ERRORS.labels(type(error).__name__).inc()
+            logger.error(f'Ошибка разбора работы {tenant}: {error}')
+            continue
+        key, _, status, _, date_updated, _ = fields
+        if key is not None:
+            change = (key, status, date_updated)
+            if change in changes or dedup.seen(tenant.chat_id, *change):
+                continue
+            changes.add(change)
+        records.append(fields)
+    return records, changes
+
+
+def make_update_handler(bot, cache, dedup, history):
+    """Обработчик `on_update`: новые статусы тенанта уходят в его чат.
+
+    Изменения запоминаются в `dedup` и истории, а задержка уведомления
+    попадает в `NOTIFICATION_DELAY` только после отправки всех
+    сообщений; при сбое обработчик возвращает False, `timestamp`
+    тенанта не сдвигается и следующий опрос повторит их.
+    """
+    def on_update(tenant, homeworks):
+        cache.update(tenant.chat_id, homeworks)
+        records, changes = new_records(tenant, homeworks, dedup)
+        updates = [
+            templates.render(record, tenant.locale) for record in records
+        ]
+        for message in homework.batch_messages(updates):
+            if not homework.deliver_message(bot, tenant.chat_id, message):
+                return False
+        now = time.time()
+        for fields in records:
+            updated = parse_date(fields[4])
+            if updated is not None:
+                metrics.NOTIFICATION_DELAY.observe(max(0.0, now - updated))
+            history.record(tenant.chat_id, Homework(*fields))
+        for change in changes:
+            dedup.add(tenant.chat_id, *change)
+        return True
+
+    return on_update
+
+
+def make_outbox(bot, share=1.0):
+    """Очередь отправки с долей `share` лимитов Telegram на бота.
+
+    Лимиты Telegram общие для всех процессов с одним токеном бота,
+    поэтому каждый из `N` опросчиков получает `1 / N` от них.
+    """
+    return Outbox(
+        bot, per_chat_rate=PER_CHAT_RATE * share,
+        global_rate=GLOBAL_RATE * share,
+    )
+
+
+def run_tenants(path, shard=None, share=1.0):
+    """Многотенантный режим: один бот, чаты и токены из файла.
+
+    `shard(registry)` оставляет в реестре только тенантов этого
+    процесса, `share` — его долю лимитов отправки; см. `supervisor.py`.
+    """
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical('Отсутствует переменная окружения! TELEGRAM_TOKEN')
+        raise SystemExit('Проверь токены!')
+    registry = load_registry(path, shard)
+    api_bot = homework.telegram.Bot(token=homework.TELEGRAM_TOKEN)
+    bot = make_outbox(api_bot, share).start()
+    cache = StatusCache()
+    dedup = DedupStore(homework.DEDUP_SIZE, homework.DEDUP_TTL)
+    history = open_history_store(homework.HISTORY_PATH)
+    server = None
+    if homework.WEBHOOK_PORT:
+        server = WebhookServer(
+            bot, cache, port=homework.WEBHOOK_PORT,
+            path=homework.WEBHOOK_PATH, api_bot=api_bot,
+        ).start(homework.WEBHOOK_URL)
+
+    logger.info(f'Многотенантный режим: {len(registry)} тенантов')
+    engine = PollingEngine(
+        registry, on_update=make_update_handler(bot, cache, dedup, history)
+    )
+    if practicum.shared_session() is None:
+        practicum.configure(engine.max_workers)
+    if practicum.shared_cache() is None:
+        practicum.configure_cache(max(len(registry), 1))
+    shutdown = GracefulShutdown().install()
+    try:
+        run = engine.run_spread if homework.SPREAD_POLLS else engine.run
+        run(shutdown=shutdown)
+    finally:
+        shutdown.restore()
+        engine.close()
+        if server is not None:
+            server.stop()
+        if not bot.close(homework.SHUTDOWN_TIMEOUT):
+            logger.error(f'Не отправлено сообщений: {bot.depth}')
+        practicum.reset()
+        history.close()
+        stats = dedup.stats()
+        logger.info(
+            f'Известных изменений: {stats["entries"]}, '
+            f'{stats["bytes"] / 2 ** 20:.1f} МиБ'
+        )
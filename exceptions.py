@@ -1,7 +1,17 @@
 class HttpError(Exception):
     """Ошибка http запроса."""
 
-    pass
+    def __init__(self, message='', status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TooManyRequestsError(HttpError):
+    """API ответил 429: превышен лимит запросов."""
+
+    def __init__(self, message='', status_code=429, retry_after=None):
+        super().__init__(message, status_code)
+        self.retry_after = retry_after
 
 
 class ApiError(Exception):
@@ -10,6 +20,12 @@ class ApiError(Exception):
     pass
 
 
+class CircuitOpenError(ApiError):
+    """API недоступен: запросы временно не отправляются."""
+
+    pass
+
+
 class TokenError(Exception):
     """Не хватает переменных окружения."""
 
@@ -32,3 +48,9 @@ class HomeworkStatusError(Exception):
     """Отсутстует ключ homework_status."""
 
     pass
+
+
+class ShutdownRequest(SystemExit):
+    """Получен сигнал остановки."""
+
+    pass
@@ -0,0 +1,196 @@
+"""История статусов работ в SQLite.
+
+Каждое замеченное изменение — чат, название работы, статус и
+`date_updated` — пишется строкой в `transitions`. Строки копятся в
+буфере и уходят одной транзакцией: пачкой `batch_size` или не реже
+раза в `flush_interval` секунд (фоновый поток пишет буфер, даже если
+новых изменений нет), поэтому запись стоит одной вставки в
+B-дерево, а не `fsync` на строку. Повтор того же изменения
+игнорируется первичным ключом.
+
+Таблица `latest` хранит последний статус каждой работы и обновляется
+в той же транзакции: «текущее состояние» не требует группировки по
+всей истории. Запросы идут по индексам и на миллионах строк отвечают
+за миллисекунды (`python -m benchmarks.bench_history`). Токены
+Практикума не сохраняются — тенант определяется id чата.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+REVIEWING = 'reviewing'
+APPROVED = 'approved'
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS transitions ('
+    'chat_id TEXT NOT NULL, homework TEXT NOT NULL, '
+    'updated INTEGER NOT NULL, status TEXT NOT NULL, '
+    'PRIMARY KEY (chat_id, homework, updated, status)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS transitions_by_homework '
+    'ON transitions (homework, status)',
+    'CREATE TABLE IF NOT EXISTS latest ('
+    'chat_id TEXT NOT NULL, homework TEXT NOT NULL, '
+    'updated INTEGER NOT NULL, status TEXT NOT NULL, '
+    'PRIMARY KEY (chat_id, homework)) WITHOUT ROWID',
+)
+INSERT = 'INSERT OR IGNORE INTO transitions VALUES (?, ?, ?, ?)'
+UPSERT_LATEST = (
+    'INSERT INTO latest VALUES (?, ?, ?, ?) '
+    'ON CONFLICT (chat_id, homework) DO UPDATE SET '
+    'updated = excluded.updated, status = excluded.status '
+    'WHERE excluded.updated >= latest.updated'
+)
+REVIEW_TIME = (
+    'SELECT approved.homework, approved.updated - ('
+    'SELECT MAX(reviewing.updated) FROM transitions AS reviewing '
+    'WHERE reviewing.chat_id = approved.chat_id '
+    'AND reviewing.homework = approved.homework '
+    'AND reviewing.status = ? AND reviewing.updated <= approved.updated'
+    ') AS seconds FROM transitions AS approved '
+)
+
+
+class NullHistoryStore:
+    """Ничего не хранит: поведение бота без истории."""
+
+    def record(self, chat_id, homework):
+        """Запоминает изменение `homework` (`models.Homework`) в чате."""
+
+    def observer(self, chat_id):
+        """Функция `(homework, message)` для `on_record` загрузки истории."""
+        return lambda homework, message: self.record(chat_id, homework)
+
+    def flush(self):
+        """Записывает накопленные изменения."""
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+
+
+class HistoryStore(NullHistoryStore):
+    """Журнал изменений статусов с пакетной записью."""
+
+    def __init__(self, path, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, clock=time.monotonic):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._pending = []
+        self._flushed_at = clock()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, timeout=30
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+        self._closed = threading.Event()
+        self._timer = None
+        if math.isfinite(flush_interval):
+            self._timer = threading.Thread(
+                target=self._flush_periodically, name='history-flush',
+                daemon=True,
+            )
+            self._timer.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def record(self, chat_id, homework):
+        """Добавляет изменение в буфер; полный буфер пишется сразу."""
+        updated = homework.updated
+        if updated is None:
+            logger.debug(f'Без даты в историю не пишется: {homework.name}')
+            return
+        with self._lock:
+            self._pending.append(
+                (str(chat_id), homework.name, int(updated), homework.status)
+            )
+            if (len(self._pending) >= self.batch_size
+                    or self._clock() - self._flushed_at
+                    >= self.flush_interval):
+                self._flush()
+
+    def _flush(self):
+        rows, self._pending = self._pending, []
+        self._flushed_at = self._clock()
+        if not rows:
+            return
+        try:
+            with self._connection:
+                self._connection.executemany(INSERT, rows)
+                self._connection.executemany(UPSERT_LATEST, rows)
+        except sqlite3.Error as error:
+            logger.error(
+                f'Не удалось записать в историю {len(rows)} строк: {error}'
+            )
+
+    def flush(self):
+        """Записывает накопленные изменения одной транзакцией."""
+        with self._lock:
+            self._flush()
+
+    def _query(self, sql, parameters):
+        with self._lock:
+            self._flush()
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def latest(self, chat_id):
+        """Последний статус каждой работы чата: `(работа, статус, время)`."""
+        return self._query(
+            'SELECT homework, status, updated FROM latest '
+            'WHERE chat_id = ? ORDER BY homework', (str(chat_id),)
+        )
+
+    def transitions(self, chat_id, homework):
+        """Изменения статуса работы от старых к новым: `(статус, время)`."""
+        return self._query(
+            'SELECT status, updated FROM transitions '
+            'WHERE chat_id = ? AND homework = ? ORDER BY updated',
+            (str(chat_id), homework),
+        )
+
+    def review_times(self, chat_id):
+        """Секунды от `reviewing` до `approved` по работам чата."""
+        return self._query(
+            REVIEW_TIME + 'WHERE approved.chat_id = ? '
+            'AND approved.status = ? ORDER BY approved.homework',
+            (REVIEWING, str(chat_id), APPROVED),
+        )
+
+    def review_time_stats(self, homework):
+        """Число принятых и среднее время проверки работы по всем чатам."""
+        count, average = self._query(
+            f'WITH reviews AS MATERIALIZED ({REVIEW_TIME}'
+            'WHERE approved.homework = ? AND approved.status = ?) '
+            'SELECT COUNT(seconds), AVG(seconds) FROM reviews',
+            (REVIEWING, homework, APPROVED),
+        )[0]
+        return {'count': count, 'average': average}
+
+    def __len__(self):
+        return self._query('SELECT COUNT(*) FROM transitions', ())[0][0]
+
+    def close(self):
+        """Дописывает буфер и закрывает соединение."""
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+
+def open_history_store(path):
+    """История по пути; без пути — `NullHistoryStore`."""
+    return HistoryStore(path) if path else NullHistoryStore()
@@ -3,15 +3,34 @@ import os
 import time
 from http import HTTPStatus
 
-import requests
-import telegram
 from dotenv import load_dotenv
 
+import practicum
+from breaker import (FAILURE_THRESHOLD, RECOVERY_TIMEOUT,
+                     CircuitBreaker)
+from checkpoint import NullCheckpointStore, open_store
+import decoders
+from dedup import DEFAULT_MAX_SIZE, DedupStore
+from history import NullHistoryStore, open_history_store
+import metrics
+import profiling
+import ratelimit
+import templates
+from models import Homework, parse_date, parse_homework, validate_response
+from log_config import DEFAULT_MAX_BYTES, DEFAULT_SAMPLE_EVERY, setup_logging
+from scheduler import make_schedule
+from shutdown import GracefulShutdown
+
 from exceptions import (ApiError,
+                        CircuitOpenError,
                         HttpError,
                         JsonError,
                         CurrentDateError,
-                        HomeworkStatusError)
+                        TooManyRequestsError)
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+telegram = lazy_import('telegram')
 
 load_dotenv()
 
@@ -22,19 +41,54 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 RETRY_PERIOD = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+SPREAD_POLLS = os.getenv('SPREAD_POLLS')
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', 0))
+ASYNC_MODE = os.getenv('ASYNC_MODE')
+API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', 0))
+API_RATE = float(os.getenv('API_RATE', 0))
+API_BURST = int(os.getenv('API_BURST', 1))
+API_RATE_PATH = os.getenv('API_RATE_PATH')
+API_CACHE = os.getenv('API_CACHE')
+ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING')
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH')
+HISTORY_PATH = os.getenv('HISTORY_PATH')
+TELEGRAM_OUTBOX = os.getenv('TELEGRAM_OUTBOX')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 0))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+API_TIMEOUT = (
+    float(os.getenv('API_CONNECT_TIMEOUT', 3.05)),
+    float(os.getenv('API_READ_TIMEOUT', 30)),
+)
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', FAILURE_THRESHOLD))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', RECOVERY_TIMEOUT))
+JSON_DECODER = os.getenv('JSON_DECODER', 'auto')
+PHASE_TIMING = os.getenv('PHASE_TIMING')
+PROFILE = os.getenv('PROFILE')
+PROFILE_PATH = os.getenv('PROFILE_PATH', profiling.DEFAULT_PATH)
+PROFILE_INTERVAL = float(
+    os.getenv('PROFILE_INTERVAL', profiling.DEFAULT_INTERVAL)
+)
+MESSAGE_LOCALE = os.getenv('MESSAGE_LOCALE', templates.DEFAULT_LOCALE)
+MESSAGE_PARSE_MODE = os.getenv('MESSAGE_PARSE_MODE')
+MESSAGE_COMMENTS = os.getenv('MESSAGE_COMMENTS')
+MESSAGE_TEMPLATE = os.getenv('MESSAGE_TEMPLATE')
+DEDUP_SIZE = int(os.getenv('DEDUP_SIZE', DEFAULT_MAX_SIZE))
+DEDUP_TTL = float(os.getenv('DEDUP_TTL', 0))
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 3))
+
+LOG_MODE = os.getenv('LOG_MODE', 'sync')
+LOG_FILE = os.getenv('LOG_FILE', 'logger.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', DEFAULT_MAX_BYTES))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', DEFAULT_SAMPLE_EVERY))
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s -'
-                              '%(levelname)s - %(message)s')
-stream_handler = logging.StreamHandler()
-stream_handler.setFormatter(formatter)
-logger.addHandler(stream_handler)
-
-file_handler = logging.FileHandler(filename="logger.log")
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+MESSAGE_LIMIT = 4096
+CACHEABLE = (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED)
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -54,93 +108,396 @@ def check_tokens():
 
 def send_message(bot, message):
     """ОТПРАВЛЯЕМ СООБЩЕНИЕ В ТЕЛЕГРАММ."""
+    return deliver_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def deliver_message(bot, chat_id, message):
+    """ОТПРАВЛЯЕМ СООБЩЕНИЕ В УКАЗАННЫЙ ЧАТ."""
+    started = time.perf_counter()
+    options = {}
+    if templates.parse_mode:
+        options['parse_mode'] = templates.parse_mode
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        with profiling.span('send'):
+            bot.send_message(chat_id, message, **options)
     except telegram.error.TelegramError:
+        metrics.SEND_FAILURES.inc()
         logger.error('Сообщение не отправлено!Проверь id чата или бота.')
-    else:
-        logger.debug('Сообщение успешно отправлено!')
+        return False
+    if not getattr(bot, 'queued', False):
+        metrics.SEND_LATENCY.observe(time.perf_counter() - started)
+    logger.debug('Сообщение успешно отправлено!')
+    return True
+
+
+def make_headers(token):
+    """СОБИРАЕМ ЗАГОЛОВКИ АВТОРИЗАЦИИ ДЛЯ ТОКЕНА."""
+    return {'Authorization': f'OAuth {token}'}
 
 
 def get_api_answer(timestamp):
     """ДЕЛАЕМ ЗАПРОС К ENDPOINT."""
+    return request_api(timestamp, HEADERS)
+
+
+def request_api(timestamp, headers):
+    """ДЕЛАЕМ ЗАПРОС К ENDPOINT С ЗАГОЛОВКАМИ КОНКРЕТНОГО ТОКЕНА."""
     params = {'from_date': timestamp}
+    session = practicum.shared_session()
+    http_get = requests.get if session is None else session.get
+    cache = practicum.shared_cache()
+    token = headers.get('Authorization')
+    if cache is not None:
+        headers = {**headers, **cache.conditional_headers(token)}
+    limiter = ratelimit.shared_limiter()
+    if limiter is not None:
+        limiter.acquire()
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+        with metrics.API_LATENCY.time(), profiling.span('api'):
+            response = http_get(ENDPOINT, headers=headers, params=params,
+                                timeout=API_TIMEOUT)
+        metrics.API_RESPONSES.labels(response.status_code).inc()
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            raise throttled(response.headers.get('Retry-After'))
+        if cache is not None and response.status_code in CACHEABLE:
+            return cache.fetch(token, response, decode_response)
         if response.status_code != HTTPStatus.OK:
-            raise HttpError('Код ответа != 200.')
-        return response.json()
-    except requests.JSONDecodeError as json_error:
-        raise JsonError('Ошибка JSON') from json_error
+            raise HttpError('Код ответа != 200.', response.status_code)
+        return decode_response(response)
     except requests.RequestException as request_error:
         raise ApiError('Ошибка подключения к API') from request_error
 
 
+def throttled(retry_after):
+    """ОТВЕТ 429: ОБЩАЯ ПАУЗА ПО Retry-After И ОТДЕЛЬНОЕ ИСКЛЮЧЕНИЕ."""
+    seconds = ratelimit.parse_retry_after(retry_after)
+    limiter = ratelimit.shared_limiter()
+    if limiter is not None:
+        limiter.block(seconds)
+    return TooManyRequestsError(
+        'Превышен лимит запросов к API.', retry_after=seconds
+    )
+
+
+def decode_response(response):
+    """РАЗБИРАЕМ JSON ПРЯМО ИЗ БАЙТОВ ОТВЕТА API."""
+    content = getattr(response, 'content', None)
+    try:
+        with profiling.span('decode'):
+            if not isinstance(content, bytes):
+                return response.json()
+            return decoders.loads(content)
+    except ValueError as json_error:
+        raise JsonError('Ошибка JSON') from json_error
+
+
 def check_response(response):
     """ПРОВЕРЯЕМ ОТВЕТ API НА КОРРЕКТНОСТЬ."""
-    if not isinstance(response, dict):
-        raise TypeError('Ответ не ввиде словаря!')
-    homeworks = response.get('homeworks')
-    current_date = response.get('current_date')
-    if homeworks is None:
-        raise KeyError('Отсутсвует значение Homeworks')
-    if current_date is None:
-        raise CurrentDateError('Отсутствует ключ "current_dates"'
-                               'или ответ не ввиде числа.')
-    if not isinstance(homeworks, list):
-        raise TypeError('Ответ не ввиде списка!')
-    if not isinstance(current_date, int):
-        raise CurrentDateError('Значение "current_date" не является "int"')
-    return homeworks
-
-
-def parse_status(homework: dict) -> str:
+    with profiling.span('check'):
+        return validate_response(response)[0]
+
+
+def parse_status(homework) -> str:
     """ИЗВЛЕКАЕТ СТАТУС ДОМАШНЕЙ РАБОТЫ."""
-    homework_name = homework.get('homework_name')
-    if homework_name is None:
-        raise KeyError('Отсутствует ключ "homework_name"')
+    with profiling.span('parse'):
+        if not isinstance(homework, tuple):
+            homework = parse_homework(homework, HOMEWORK_VERDICTS)
+        return templates.render(homework)
+
+
+def update_order(homework):
+    """КЛЮЧ СОРТИРОВКИ: СТАРЫЕ ОБНОВЛЕНИЯ ПЕРВЫМИ."""
+    return homework.get('date_updated') or ''
+
+
+def batch_messages(messages, limit=MESSAGE_LIMIT):
+    """СКЛЕИВАЕМ СООБЩЕНИЯ В ПАЧКИ НЕ ДЛИННЕЕ ЛИМИТА TELEGRAM."""
+    batches, current = [], ''
+    for message in messages:
+        candidate = f'{current}\n\n{message}' if current else message
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            batches.append(current)
+        while len(message) > limit:
+            batches.append(message[:limit])
+            message = message[limit:]
+        current = message
+    if current:
+        batches.append(current)
+    return batches
+
+
+class StatusTracker:
+    """Помнит дату последнего опроса и последнее отправленное сообщение.
+
+    Обрабатывает все работы из ответа: отправленные изменения
+    запоминаются в `DedupStore` по чату, ключу работы, статусу и
+    `date_updated`, новые уходят одним сообщением или несколькими
+    пачками по порядку `date_updated`. Изменения цикла и новый
+    `current_date` принимаются только в `delivered()`: если отправка не
+    удалась, следующий опрос начнётся с прежней даты и повторит их.
+
+    Не выполняет сетевого ввода-вывода: решает, что отправить по ответу
+    API или по ошибке, поэтому общая для синхронного и асинхронного
+    циклов. Состояние сохраняется в `store` вызовом `checkpoint()`,
+    новые изменения статусов — в историю `history`.
+    """
+
+    NO_CHANGES = 'Нет изменений в статусе работы'
 
-    homework_status = homework.get('status')
-    if 'status' not in homework:
-        raise HomeworkStatusError('Отсутстует ключ homework_status.')
+    def __init__(self, timestamp, schedule=None, store=None, dedup=None,
+                 history=None):
+        """Начинаем опрос с даты `timestamp`."""
+        self.timestamp = timestamp
+        self.pending_timestamp = timestamp
+        self.pending = {}
+        self.old_message = ''
+        self.chat_id = TELEGRAM_CHAT_ID
+        self.dedup = (
+            DedupStore(DEDUP_SIZE, DEDUP_TTL) if dedup is None else dedup
+        )
+        self.delivering = []
+        self.schedule = schedule or make_schedule(
+            RETRY_PERIOD, ADAPTIVE_POLLING
+        )
+        self.store = store or NullCheckpointStore()
+        self.history = NullHistoryStore() if history is None else history
+        self.observers = []
 
-    verdict = HOMEWORK_VERDICTS.get(homework_status)
-    if homework_status not in HOMEWORK_VERDICTS:
-        raise ValueError('Неизвестный статус домашней работы')
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    @classmethod
+    def from_store(cls, store, schedule=None, history=None):
+        """ВОССТАНАВЛИВАЕМ СОСТОЯНИЕ ИЗ КОНТРОЛЬНОЙ ТОЧКИ."""
+        state = store.load()
+        tracker = cls(
+            state.get('timestamp', int(time.time())), schedule, store,
+            history=history,
+        )
+        tracker.old_message = state.get('old_message', '')
+        tracker.dedup.load(state.get('seen', []))
+        if state:
+            logger.info(
+                f'Продолжаем опрос с {tracker.timestamp}, '
+                f'известных изменений: {len(tracker.dedup)}'
+            )
+        return tracker
+
+    def state(self):
+        """СОСТОЯНИЕ ДЛЯ КОНТРОЛЬНОЙ ТОЧКИ."""
+        return {
+            'timestamp': self.timestamp,
+            'old_message': self.old_message,
+            'seen': self.dedup.dump(),
+        }
+
+    def delivered(self):
+        """ОТМЕЧАЕМ ДОСТАВКУ СООБЩЕНИЙ ЦИКЛА И СОХРАНЯЕМ СОСТОЯНИЕ."""
+        now = time.time()
+        for updated in self.delivering:
+            metrics.NOTIFICATION_DELAY.observe(max(0.0, now - updated))
+        self.delivering = []
+        for change in self.pending:
+            self.dedup.add(self.chat_id, *change)
+        self.pending = {}
+        self.timestamp = self.pending_timestamp
+        self.checkpoint()
+
+    def checkpoint(self):
+        """СОХРАНЯЕМ СОСТОЯНИЕ ПОСЛЕ УСПЕШНОЙ ОТПРАВКИ."""
+        self.history.flush()
+        try:
+            self.store.save(self.state())
+        except (OSError, ValueError) as error:
+            logger.error(f'Не удалось сохранить контрольную точку: {error}')
+
+    def close(self):
+        """ЗАКРЫВАЕМ КОНТРОЛЬНУЮ ТОЧКУ И ИСТОРИЮ."""
+        self.store.close()
+        self.history.close()
+
+    def _changed(self, message):
+        if message == self.old_message:
+            return []
+        self.old_message = message
+        return [message]
+
+    def next_delay(self):
+        """СКОЛЬКО ЖДАТЬ ДО СЛЕДУЮЩЕГО ОПРОСА."""
+        return self.schedule.next_delay()
+
+    def on_response(self, response):
+        """ВОЗВРАЩАЕМ СООБЩЕНИЯ ДЛЯ ОТПРАВКИ ПО ОТВЕТУ API."""
+        self.delivering = []
+        self.pending = {}
+        homeworks = check_response(response)
+        self.pending_timestamp = response.get('current_date', self.timestamp)
+        self.schedule.observe(homeworks)
+        for observe in self.observers:
+            observe(homeworks)
+        if not homeworks:
+            messages = self._changed(self.NO_CHANGES)
+        else:
+            messages = self._process(homeworks)
+        if not messages:
+            logger.debug(self.NO_CHANGES)
+        return messages
+
+    def _process(self, homeworks):
+        updates, errors = [], []
+        for item in sorted(homeworks, key=update_order):
+            try:
+                fields = parse_homework(item, HOMEWORK_VERDICTS)
+            except Exception as error:
+                errors.extend(self._report(error))
+                continue
+            if not self._is_new(fields):
+                continue
+            updates.append(parse_status(fields))
+            self.history.record(self.chat_id, Homework(*fields))
+            updated = parse_date(fields[4])
+            if updated is not None:
+                self.delivering.append(updated)
+        if not updates:
+            return errors
+        batches = batch_messages(updates)
+        self.old_message = batches[-1]
+        return batches + errors
+
+    def _is_new(self, fields):
+        key, _, status, _, date_updated, _ = fields
+        if key is None:
+            return True
+        change = (key, status, date_updated)
+        if change in self.pending or self.dedup.seen(self.chat_id, *change):
+            return False
+        self.pending[change] = None
+        return True
+
+    def on_error(self, error):
+        """ВОЗВРАЩАЕМ СООБЩЕНИЯ ДЛЯ ОТПРАВКИ ПО ОШИБКЕ ЦИКЛА."""
+        self.delivering = []
+        self.pending = {}
+        self.pending_timestamp = self.timestamp
+        return self._report(error)
+
+    def _report(self, error):
+        metrics.ERRORS.labels(type(error).__name__).inc()
+        self.schedule.observe_error(error)
+        if isinstance(error, (CurrentDateError, CircuitOpenError)):
+            logger.error(f'Ошибка {error}')
+            return []
+        message = f'Сбой в работе программы: {error}'
+        logger.error(message)
+        return self._changed(templates.escape(message))
+
+
+def configure_logging():
+    """НАСТРАИВАЕМ ЛОГИРОВАНИЕ: ФАЙЛ И ПОТОК ОТКРЫВАЮТСЯ ТОЛЬКО ЗДЕСЬ."""
+    setup_logging(LOG_MODE, LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                  when=LOG_ROTATE_WHEN, sample_every=LOG_SAMPLE_EVERY)
+
+
+def configure_runtime():
+    """НАСТРАИВАЕМ ДЕКОДЕР, ТЕКСТЫ, ПУЛ, КЭШ, МЕТРИКИ И ПРОФИЛИРОВАНИЕ."""
+    logger.debug(f'Декодер JSON: {decoders.configure(JSON_DECODER)}')
+    templates.configure(MESSAGE_LOCALE, MESSAGE_PARSE_MODE,
+                        MESSAGE_COMMENTS, MESSAGE_TEMPLATE)
+    if API_POOL_SIZE:
+        practicum.configure(API_POOL_SIZE)
+    if API_CACHE:
+        practicum.configure_cache()
+    if API_RATE:
+        ratelimit.configure(API_RATE, API_BURST, API_RATE_PATH)
+    if METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT)
+    profiling.configure(PHASE_TIMING, PROFILE, PROFILE_PATH, PROFILE_INTERVAL)
+
+
+def make_breaker():
+    """СОЗДАЁМ ПРЕДОХРАНИТЕЛЬ ДЛЯ ЗАПРОСОВ К API."""
+    return CircuitBreaker(
+        failure_threshold=BREAKER_FAILURES, recovery_timeout=BREAKER_RESET
+    )
+
+
+def start_services(bot, tracker):
+    """ВКЛЮЧАЕМ ОЧЕРЕДЬ СООБЩЕНИЙ И ПРИЁМ КОМАНД ЧЕРЕЗ ВЕБХУК."""
+    api_bot = bot
+    if TELEGRAM_OUTBOX:
+        from outbox import Outbox
+        bot = Outbox(bot).start()
+    if WEBHOOK_PORT:
+        from webhook import StatusCache, WebhookServer
+        cache = StatusCache()
+        tracker.observers.append(cache.observer(TELEGRAM_CHAT_ID))
+        WebhookServer(
+            bot, cache, port=WEBHOOK_PORT, path=WEBHOOK_PATH, api_bot=api_bot
+        ).start(WEBHOOK_URL)
+    return bot
+
+
+def confirmed(bot):
+    """ЖДЁМ ОЧЕРЕДЬ: КОНТРОЛЬНАЯ ТОЧКА ТОЛЬКО ПОСЛЕ ДОСТАВКИ В TELEGRAM."""
+    if not getattr(bot, 'queued', False):
+        return True
+    if bot.confirm(SHUTDOWN_TIMEOUT):
+        return True
+    logger.warning('Очередь сообщений не доставлена, состояние не сохранено')
+    return False
+
+
+def stop_services(bot, tracker):
+    """ДОСЫЛАЕМ ОЧЕРЕДЬ СООБЩЕНИЙ И ЗАКРЫВАЕМ КОНТРОЛЬНУЮ ТОЧКУ."""
+    if getattr(bot, 'queued', False) and not bot.close(SHUTDOWN_TIMEOUT):
+        logger.error(
+            f'За {SHUTDOWN_TIMEOUT} с не отправлено сообщений: {bot.depth}'
+        )
+    tracker.close()
+    logger.info('Бот остановлен')
 
 
 def main():
     """Основная логика работы бота."""
-    old_message = ''
+    configure_logging()
+    configure_runtime()
+    if TENANTS_FILE and WORKER_PROCESSES:
+        import supervisor
+        return supervisor.run(TENANTS_FILE, WORKER_PROCESSES)
+    if TENANTS_FILE:
+        import engine
+        return engine.run_tenants(TENANTS_FILE)
+    if ASYNC_MODE:
+        import async_bot
+        return async_bot.run()
     check_tokens()
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-            timestamp = response.get('current_date', timestamp)
-            if homeworks:
-                homework = homeworks[0]
-                status = parse_status(homework)
-            else:
-                status = 'Нет изменений в статусе работы'
-            if status != old_message:
-                old_message = status
-                send_message(bot, status)
-            else:
-                logger.debug('Нет изменений в статусе работы')
-        except CurrentDateError as error:
-            logger.error(f'Ошибка {error}')
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            if message != old_message:
-                old_message = message
-                send_message(bot, message)
-            logger.error(message, bot)
-        finally:
-            time.sleep(RETRY_PERIOD)
+    tracker = StatusTracker.from_store(
+        open_store(CHECKPOINT_PATH), history=open_history_store(HISTORY_PATH)
+    )
+    bot = start_services(bot, tracker)
+    breaker = make_breaker()
+    shutdown = GracefulShutdown().install()
+    try:
+        while True:
+            try:
+                with shutdown.interruptible():
+                    response = breaker.call(get_api_answer, tracker.timestamp)
+                messages = tracker.on_response(response)
+            except Exception as error:
+                messages = tracker.on_error(error)
+            try:
+                sent = [send_message(bot, message) for message in messages]
+                if all(sent) and confirmed(bot):
+                    tracker.delivered()
+            finally:
+                profiling.report()
+                delay = tracker.next_delay()
+                with shutdown.interruptible():
+                    time.sleep(delay)
+    finally:
+        shutdown.restore()
+        stop_services(bot, tracker)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,32 @@
+"""Отложенный импорт тяжёлых зависимостей.
+
+`lazy_import('telegram')` сразу кладёт в `sys.modules` модуль, код
+которого выполнится при первом обращении к атрибуту
+(`importlib.util.LazyLoader`). Это настоящий объект модуля: `import
+telegram` в другом месте вернёт его же, поэтому `monkeypatch.setattr(
+telegram, 'Bot', ...)` в тестах продолжает работать.
+"""
+import importlib.util
+import sys
+import types
+
+
+def lazy_import(name):
+    """Модуль `name`, который загрузится при первом обращении."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name):
+    """Выполнен ли уже код модуля `name`."""
+    return type(sys.modules.get(name)) is types.ModuleType
@@ -0,0 +1,160 @@
+"""Настройка логирования бота.
+
+Режим `sync` повторяет исходное поведение: поток и файл `logger.log`
+пишутся прямо в цикле опроса. Режим `queue` отдаёт записи в очередь,
+а вывод, JSON-форматирование и ротацию файла выполняет отдельный поток
+`QueueListener`; повторяющиеся отладочные строки прореживаются.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+FORMAT = '%(asctime)s - %(name)s -%(levelname)s - %(message)s'
+NOISY_LOGGERS = ('urllib3', 'telegram', 'apscheduler', 'asyncio', 'aiohttp')
+SAMPLED_MESSAGES = frozenset({'Нет изменений в статусе работы'})
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_SAMPLE_EVERY = 100
+
+_installed = []
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        sampled = getattr(record, 'sampled', None)
+        if sampled:
+            payload['sampled'] = sampled
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает одну из `every` отладочных записей с текстом из набора.
+
+    В пропущенную запись добавляется поле `sampled` — сколько таких
+    записей она представляет.
+    """
+
+    def __init__(self, every=DEFAULT_SAMPLE_EVERY, messages=SAMPLED_MESSAGES):
+        super().__init__()
+        self.every = every
+        self.messages = messages
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not (
+            isinstance(record.msg, str) and record.msg in self.messages
+        ):
+            return True
+        with self._lock:
+            count = self._counts.get(record.msg, 0)
+            self._counts[record.msg] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every if count else 1
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Кладёт запись в очередь без копирования, если нет исключения.
+
+    Стандартный `prepare` форматирует и копирует каждую запись в
+    вызывающем потоке — это большая часть стоимости вызова логгера.
+    """
+
+    def prepare(self, record):
+        if record.exc_info or record.stack_info:
+            return super().prepare(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def _file_handler(filename, max_bytes, backup_count, when):
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            filename, when=when, backupCount=backup_count, encoding='utf-8'
+        )
+    return logging.handlers.RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count,
+        encoding='utf-8'
+    )
+
+
+def setup_logging(mode='sync', filename='logger.log',
+                  max_bytes=DEFAULT_MAX_BYTES,
+                  backup_count=DEFAULT_BACKUP_COUNT, when=None,
+                  sample_every=DEFAULT_SAMPLE_EVERY, stream=None):
+    """Подключает обработчики к корневому логгеру.
+
+    Повторный вызов заменяет обработчики, установленные прошлым.
+    Возвращает `QueueListener` в режиме `queue`, иначе None.
+    """
+    global _listener
+    shutdown_logging()
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    stream_handler = logging.StreamHandler(stream)
+    if mode != 'queue':
+        formatter = logging.Formatter(FORMAT)
+        stream_handler.setFormatter(formatter)
+        file_handler = logging.FileHandler(filename=filename)
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(formatter)
+        _install(root, stream_handler, file_handler)
+        return None
+
+    stream_handler.setFormatter(logging.Formatter(FORMAT))
+    file_handler = _file_handler(filename, max_bytes, backup_count, when)
+    file_handler.setFormatter(JsonFormatter())
+    records = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(sample_every))
+    _listener = logging.handlers.QueueListener(
+        records, stream_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    _install(root, queue_handler)
+    return _listener
+
+
+def _install(root, *handlers):
+    for handler in handlers:
+        root.addHandler(handler)
+        _installed.append(handler)
+
+
+def shutdown_logging():
+    """Дописывает очередь и снимает установленные обработчики."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    root = logging.getLogger()
+    while _installed:
+        handler = _installed.pop()
+        root.removeHandler(handler)
+        handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,259 @@
+"""Метрики бота в текстовом формате Prometheus и HTTP-экспортёр."""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DELAY_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 86400)
+PHASE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + body + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values, **kwargs):
+        """Дочерняя метрика для набора значений меток."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def collect(self):
+        """Строки метрики в формате экспозиции."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    """Монотонный счётчик."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        """Увеличивает счётчик без меток."""
+        self._default().inc(amount)
+
+    def _samples(self, values, child):
+        labels = _format_labels(self.labelnames, values)
+        return [f'{self.name}_total{labels} {child.value}']
+
+
+class Gauge(Counter):
+    """Значение, которое может расти и убывать."""
+
+    kind = 'gauge'
+
+    def set(self, value):
+        """Устанавливает значение без меток."""
+        self._default().set(value)
+
+    def _samples(self, values, child):
+        labels = _format_labels(self.labelnames, values)
+        return [f'{self.name}{labels} {child.value}']
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        """Добавляет наблюдение без меток."""
+        self._default().observe(value)
+
+    def time(self):
+        """Контекстный менеджер, измеряющий длительность блока."""
+        return self._default().time()
+
+    def _samples(self, values, child):
+        with child._lock:
+            counts = list(child.counts)
+            total_sum = child.sum
+        lines, cumulative = [], 0
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [('le', bound)])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {total_sum}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Набор метрик, отдаваемых экспортёром."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Добавляет метрику в реестр."""
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds', 'Длительность запроса к API Практикума.'
+)
+API_RESPONSES = Counter(
+    'homework_api_responses', 'Ответы API Практикума по HTTP-коду.', ['code']
+)
+ERRORS = Counter(
+    'homework_errors', 'Ошибки цикла опроса по классу исключения.', ['error']
+)
+SEND_LATENCY = Histogram(
+    'homework_send_seconds', 'Длительность отправки сообщения в Telegram.'
+)
+SEND_FAILURES = Counter(
+    'homework_send_failures', 'Неудачные отправки сообщений в Telegram.'
+)
+OUTBOX_DEPTH = Gauge(
+    'homework_outbox_depth', 'Сообщения в очереди на отправку в Telegram.'
+)
+NOTIFICATION_DELAY = Histogram(
+    'homework_notification_delay_seconds',
+    'Время от date_updated работы до отправки уведомления.',
+    buckets=DELAY_BUCKETS,
+)
+PHASE_SECONDS = Histogram(
+    'homework_phase_seconds',
+    'Время фаз цикла опроса: api, decode, check, parse, send.',
+    ['phase'], buckets=PHASE_BUCKETS,
+)
+RATE_LIMIT_WAIT = Histogram(
+    'homework_rate_limit_wait_seconds',
+    'Ожидание слота общего лимита запросов к API Практикума.',
+)
+BREAKER_STATE = Gauge(
+    'homework_breaker_state',
+    'Состояние предохранителя: 0 — closed, 1 — open, 2 — half_open.',
+    ['name'],
+)
+
+
+def start_http_server(port, addr='0.0.0.0', registry=REGISTRY):
+    """Отдаёт `/metrics` из фонового потока; возвращает сервер.
+
+    `http.server` тянет за собой `email` и `ssl`, поэтому загружается
+    только здесь, а не при импорте метрик.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            body = self.server.registry.render().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,91 @@
+"""Проверка ответа API Практикума и модель записи о работе.
+
+Исключения те же, что бросали `check_response` и `parse_status` при
+разборе словарей. `parse_homework` проверяет запись и возвращает её
+поля обычным кортежем — этого хватает, чтобы решить, новое ли
+изменение, и собрать текст уведомления. Модель `Homework` с теми же
+полями создаётся только для записей, которые хранятся дольше цикла
+(кэш вебхука, история): `NamedTuple` без `__dict__`, втрое компактнее
+исходного словаря.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from exceptions import CurrentDateError, HomeworkStatusError
+
+
+def parse_date(value):
+    """Переводит `date_updated` из ISO 8601 в Unix-время или None."""
+    try:
+        return datetime.fromisoformat(
+            value.replace('Z', '+00:00')
+        ).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def validate_response(data):
+    """Проверяет ответ API; возвращает список работ и `current_date`.
+
+    Работы остаются словарями: каждая проверяется отдельно через
+    `parse_homework`, чтобы одна некорректная запись не отменяла
+    остальные.
+    """
+    if not isinstance(data, dict):
+        raise TypeError('Ответ не ввиде словаря!')
+    homeworks = data.get('homeworks')
+    current_date = data.get('current_date')
+    if homeworks is None:
+        raise KeyError('Отсутсвует значение Homeworks')
+    if current_date is None:
+        raise CurrentDateError('Отсутствует ключ "current_dates"'
+                               'или ответ не ввиде числа.')
+    if not isinstance(homeworks, list):
+        raise TypeError('Ответ не ввиде списка!')
+    if not isinstance(current_date, int):
+        raise CurrentDateError('Значение "current_date" не является "int"')
+    return homeworks, current_date
+
+
+def parse_homework(data, verdicts):
+    """Проверяет запись о работе; `verdicts` — тексты статусов.
+
+    Возвращает поля `Homework` по порядку: ключ, название, статус,
+    вердикт, `date_updated` и комментарий ревьюера.
+    """
+    name = data.get('homework_name')
+    if name is None:
+        raise KeyError('Отсутствует ключ "homework_name"')
+    if 'status' not in data:
+        raise HomeworkStatusError('Отсутстует ключ homework_status.')
+    status = data['status']
+    verdict = verdicts.get(status)
+    if verdict is None:
+        raise ValueError('Неизвестный статус домашней работы')
+    key = data.get('id', name)
+    return (
+        None if key is None else str(key), name, status, verdict,
+        data.get('date_updated') or '',
+        data.get('reviewer_comment') or '',
+    )
+
+
+class Homework(NamedTuple):
+    """Проверенная запись о работе со всем, что нужно для уведомления."""
+
+    key: Optional[str]
+    name: str
+    status: str
+    verdict: str
+    date_updated: str
+    comment: str = ''
+
+    @property
+    def updated(self):
+        """`date_updated` в Unix-времени или None."""
+        return parse_date(self.date_updated)
+
+    @classmethod
+    def from_dict(cls, data, verdicts):
+        """Проверяет запись о работе; `verdicts` — тексты статусов."""
+        return cls(*parse_homework(data, verdicts))
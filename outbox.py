@@ -0,0 +1,280 @@
+"""Очередь исходящих сообщений Telegram с учётом лимитов API.
+
+`Outbox` подменяет бота: его `send_message` только ставит текст в
+очередь, а фоновый поток отправляет сообщения, соблюдая лимиты на чат и
+на бота в целом. Тексты, накопившиеся для одного чата, склеиваются в
+одно сообщение; при `RetryAfter` отправка в чат откладывается.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+import telegram
+
+import metrics
+from homework import MESSAGE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+PER_CHAT_RATE = 1.0
+GLOBAL_RATE = 30.0
+MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` токенов в секунду, не больше `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self):
+        """Через сколько секунд появится токен; 0 — уже есть."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Забирает токен, если он есть."""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class _Chat:
+    __slots__ = ('queue', 'bucket', 'not_before', 'attempts', 'options')
+
+    def __init__(self, rate, clock):
+        self.queue = deque()
+        self.bucket = TokenBucket(rate, clock=clock)
+        self.not_before = 0.0
+        self.attempts = 0
+        self.options = {}
+
+
+class Outbox:
+    """Очередь сообщений с фоновым отправителем."""
+
+    queued = True
+
+    def __init__(self, bot, per_chat_rate=PER_CHAT_RATE,
+                 global_rate=GLOBAL_RATE, max_retries=MAX_RETRIES,
+                 limit=MESSAGE_LIMIT, clock=time.monotonic):
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        self.limit = limit
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, clock=clock)
+        self._chats = {}
+        self._ready = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closing = False
+        self._started = clock()
+        self.depth = 0
+        self.in_flight = 0
+        self.sent = 0
+        self.delivered = 0
+        self.merged = 0
+        self.retried = 0
+        self.failed = 0
+        self._confirmed_failed = 0
+
+    def start(self):
+        """Запускает фоновый поток отправки."""
+        self._thread = threading.Thread(
+            target=self._run, name='outbox', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Ставит текст в очередь чата и сразу возвращает управление.
+
+        Параметры отправки (`parse_mode`) общие для склеиваемых текстов
+        чата: действуют последние переданные.
+        """
+        chunks = [
+            text[start:start + self.limit]
+            for start in range(0, max(len(text), 1), self.limit)
+        ]
+        with self._condition:
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _Chat(
+                    self.per_chat_rate, self.clock
+                )
+            chat.queue.extend((chunk, 1) for chunk in chunks)
+            chat.options = kwargs
+            self.depth += len(chunks)
+            metrics.OUTBOX_DEPTH.set(self.depth)
+            self._ready[chat_id] = chat
+            self._condition.notify_all()
+
+    def _merge(self, chat):
+        text, count = chat.queue.popleft()
+        while chat.queue:
+            following, extra = chat.queue[0]
+            if len(text) + 2 + len(following) > self.limit:
+                break
+            chat.queue.popleft()
+            text = f'{text}\n\n{following}'
+            count += extra
+        return text, count
+
+    def _pick(self):
+        """Следующий чат, готовый к отправке, или время ожидания."""
+        now = self.clock()
+        wait = None
+        for chat_id, chat in list(self._ready.items()):
+            delay = max(chat.not_before - now, chat.bucket.delay())
+            if delay <= 0:
+                global_delay = self.global_bucket.delay()
+                if global_delay > 0:
+                    return None, global_delay
+                self.global_bucket.consume()
+                chat.bucket.consume()
+                self._ready.move_to_end(chat_id)
+                return chat_id, 0.0
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closing and not self._ready:
+                        return
+                    chat_id, wait = self._pick()
+                    if chat_id is not None:
+                        break
+                    self._condition.wait(wait)
+                chat = self._chats[chat_id]
+                text, count = self._merge(chat)
+                if not chat.queue:
+                    del self._ready[chat_id]
+                self.depth -= count
+                self.in_flight += count
+                metrics.OUTBOX_DEPTH.set(self.depth)
+            self._deliver(chat_id, chat, text, count)
+
+    def _requeue(self, chat_id, chat, text, count, delay):
+        with self._condition:
+            chat.queue.appendleft((text, count))
+            chat.not_before = self.clock() + delay
+            self._ready[chat_id] = chat
+            self._ready.move_to_end(chat_id, last=False)
+            self.depth += count
+            self.in_flight -= count
+            self.retried += 1
+            self._condition.notify_all()
+
+    def _deliver(self, chat_id, chat, text, count):
+        try:
+            with metrics.SEND_LATENCY.time():
+                self.bot.send_message(chat_id, text, **chat.options)
+        except telegram.error.RetryAfter as error:
+            logger.warning(
+                f'Telegram просит подождать {error.retry_after} с '
+                f'перед отправкой в чат {chat_id}'
+            )
+            return self._requeue(chat_id, chat, text, count,
+                                 float(error.retry_after))
+        except telegram.error.NetworkError as error:
+            retryable = not isinstance(error, telegram.error.BadRequest)
+            if retryable and chat.attempts < self.max_retries:
+                chat.attempts += 1
+                return self._requeue(chat_id, chat, text, count,
+                                     2 ** chat.attempts)
+            self._finish(chat, count, ok=False, error=error)
+        except Exception as error:
+            self._finish(chat, count, ok=False, error=error)
+        else:
+            self._finish(chat, count, ok=True)
+
+    def _finish(self, chat, count, ok, error=None):
+        with self._condition:
+            chat.attempts = 0
+            self.in_flight -= count
+            if ok:
+                self.sent += 1
+                self.delivered += count
+                self.merged += count - 1
+            else:
+                self.failed += count
+                metrics.SEND_FAILURES.inc()
+            self._condition.notify_all()
+        if not ok:
+            logger.error(
+                f'Сообщение не отправлено!Проверь id чата или бота. {error}'
+            )
+
+    def stats(self):
+        """Метрики очереди: глубина, отправки, скорость."""
+        elapsed = self.clock() - self._started
+        with self._condition:
+            return {
+                'queued': self.depth,
+                'in_flight': self.in_flight,
+                'sent': self.sent,
+                'delivered': self.delivered,
+                'merged': self.merged,
+                'retried': self.retried,
+                'failed': self.failed,
+                'messages_per_second': self.sent / elapsed if elapsed else 0,
+            }
+
+    def join(self, timeout=None):
+        """Ждёт, пока очередь опустеет; False — не успела за `timeout`."""
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while self.depth or self.in_flight:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        return False
+                self._condition.wait(remaining)
+        return True
+
+    def confirm(self, timeout=None):
+        """Ждёт очередь; True — всё поставленное с прошлого раза доставлено.
+
+        False, если очередь не опустела за `timeout` или с прошлого
+        вызова какое-то сообщение отброшено: такие изменения нельзя
+        записывать в контрольную точку как отправленные.
+        """
+        drained = self.join(timeout)
+        with self._condition:
+            clean = self.failed == self._confirmed_failed
+            if drained:
+                self._confirmed_failed = self.failed
+        return drained and clean
+
+    def close(self, timeout=None):
+        """Отправляет остаток очереди и останавливает поток."""
+        drained = self.join(timeout)
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return drained
@@ -0,0 +1,205 @@
+"""HTTP-клиент API Практикума: пул соединений и кэш ответов."""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+
+from exceptions import HttpError
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CACHE_SIZE = 10000
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+
+
+class PracticumSession:
+    """`requests.Session` с ограниченным пулом соединений.
+
+    Соединения переиспользуются между запросами, поэтому TCP и TLS
+    рукопожатия выполняются один раз на соединение, а не на опрос.
+    `pool_block=True` не даёт открыть больше `pool_size` соединений
+    к одному хосту: лишние потоки ждут свободное.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def get(self, url, **kwargs):
+        """GET через пул; аргументы как у `requests.get`."""
+        return self.session.get(url, **kwargs)
+
+    def stats(self):
+        """Счётчики пула: запросы, открытые соединения, переиспользования."""
+        pools = self.adapter.poolmanager.pools
+        with pools.lock:
+            connection_pools = list(pools._container.values())
+        sent = sum(pool.num_requests for pool in connection_pools)
+        opened = sum(pool.num_connections for pool in connection_pools)
+        return {
+            'requests': sent,
+            'connections': opened,
+            'reused': sent - opened,
+        }
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        self.session.close()
+
+
+def fingerprint(content):
+    """Хэш тела без поля `current_date` и само значение поля.
+
+    `current_date` меняется в каждом ответе, остальное тело у пустых
+    ответов совпадает байт в байт — по нему и сравниваем.
+    """
+    match = CURRENT_DATE.search(content)
+    if match is None:
+        return hashlib.blake2b(content, digest_size=16).digest(), None
+    stripped = content[:match.start()] + content[match.end():]
+    return (
+        hashlib.blake2b(stripped, digest_size=16).digest(),
+        int(match.group(1)),
+    )
+
+
+class _CacheEntry:
+    __slots__ = ('etag', 'last_modified', 'digest', 'data')
+
+    def __init__(self, etag, last_modified, digest, data):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.data = data
+
+
+class ResponseCache:
+    """Кэш разобранных ответов API по токену.
+
+    Если сервер отдаёт `ETag` или `Last-Modified`, следующий запрос
+    становится условным и ответ 304 берётся из кэша с `current_date`,
+    равным времени ответа, — иначе дата опроса бы не сдвигалась. Ответ
+    304 на токен, которого нет в кэше, — `HttpError`: следующий запрос
+    будет безусловным. Иначе тело ответа
+    сравнивается по `fingerprint` с прошлым, и при совпадении разбор
+    JSON пропускается. Хранит не больше `max_entries` токенов (LRU).
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.hash_hits = 0
+
+    def conditional_headers(self, key):
+        """Заголовки условного запроса для токена `key`."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def fetch(self, key, response, decode):
+        """Данные ответа: из кэша, если можно, иначе `decode(response)`."""
+        with self._lock:
+            self.requests += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            if entry is None:
+                raise HttpError('Ответ 304 без записи в кэше.',
+                                response.status_code)
+            with self._lock:
+                self.not_modified += 1
+            return dict(entry.data, current_date=int(time.time()))
+        digest, current_date = fingerprint(response.content)
+        if entry is not None and entry.digest == digest:
+            with self._lock:
+                self.hash_hits += 1
+            if current_date is None:
+                return entry.data
+            return dict(entry.data, current_date=current_date)
+        data = decode(response)
+        entry = _CacheEntry(
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            digest, data,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    def stats(self):
+        """Счётчики кэша и доля попаданий."""
+        with self._lock:
+            hits = self.not_modified + self.hash_hits
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'hash_hits': self.hash_hits,
+                'hit_ratio': hits / self.requests if self.requests else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+_shared = None
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE):
+    """Создаёт общий пул для всех вызовов `get_api_answer`."""
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+        _shared = PracticumSession(pool_size)
+        return _shared
+
+
+def shared_session():
+    """Общий пул или None, если он не настроен."""
+    return _shared
+
+
+def configure_cache(max_entries=DEFAULT_CACHE_SIZE):
+    """Включает общий кэш ответов для `get_api_answer`."""
+    global _shared_cache
+    with _shared_lock:
+        _shared_cache = ResponseCache(max_entries)
+        return _shared_cache
+
+
+def shared_cache():
+    """Общий кэш ответов или None, если он не включён."""
+    return _shared_cache
+
+
+def reset():
+    """Закрывает общий пул и выключает кэш."""
+    global _shared, _shared_cache
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+        _shared = None
+        _shared_cache = None
@@ -0,0 +1,195 @@
+"""Время фаз цикла опроса и сэмплирующий профилировщик.
+
+`span('api')` оборачивает фазу цикла: запрос к API, разбор JSON,
+проверку ответа, сборку и отправку сообщения. Пока замеры выключены,
+`span` возвращает один и тот же пустой контекстный менеджер — это
+один вызов функции на фазу. Включённые (`PHASE_TIMING=1`) замеры идут
+в гистограмму `homework_phase_seconds` и в сводку `report()` по циклу.
+
+`StackSampler` раз в `interval` секунд снимает стеки всех потоков
+через `sys._current_frames()` и пишет их в свёрнутом формате
+(`поток;функция;функция N`), который понимают `flamegraph.pl`,
+speedscope и inferno. Профилировщик включается при старте
+(`PROFILE=1`) или сигналом `SIGUSR2` в работающий процесс; повторный
+`SIGUSR2` останавливает его и записывает файл — перезапуск не нужен.
+"""
+import atexit
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.01
+DEFAULT_PATH = 'profile-{pid}-{started}.folded'
+TOGGLE_SIGNAL = signal.SIGUSR2
+
+_NULL_SPAN = nullcontext()
+_totals = Counter()
+_histograms = {}
+_totals_lock = threading.Lock()
+_sampler = None
+
+
+def _disabled_span(phase):
+    return _NULL_SPAN
+
+
+class _TimedSpan:
+    __slots__ = ('phase', 'started')
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        histogram = _histograms.get(self.phase)
+        if histogram is None:
+            histogram = metrics.PHASE_SECONDS.labels(self.phase)
+            _histograms[self.phase] = histogram
+        histogram.observe(elapsed)
+        with _totals_lock:
+            _totals[self.phase] += elapsed
+
+
+span = _disabled_span
+
+
+def enable_spans(enabled=True):
+    """Включает или выключает замеры фаз."""
+    global span
+    span = _TimedSpan if enabled else _disabled_span
+
+
+def report():
+    """Пишет в лог время фаз с прошлого вызова и обнуляет его."""
+    if span is _disabled_span:
+        return
+    with _totals_lock:
+        totals = dict(_totals)
+        _totals.clear()
+    if totals:
+        logger.debug('Фазы цикла: ' + ', '.join(
+            f'{phase} {seconds * 1000:.1f} мс'
+            for phase, seconds in totals.items()
+        ))
+
+
+class StackSampler:
+    """Снимает стеки всех потоков с заданным интервалом."""
+
+    def __init__(self, path, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+        self._frames = {}
+
+    def _describe(self, code):
+        described = self._frames.get(code)
+        if described is None:
+            described = (
+                f'{code.co_name} ({os.path.basename(code.co_filename)}'
+                f':{code.co_firstlineno})'
+            )
+            self._frames[code] = described
+        return described
+
+    def _collapse(self, thread_name, frame):
+        parts = []
+        while frame is not None:
+            parts.append(self._describe(frame.f_code))
+            frame = frame.f_back
+        parts.append(thread_name)
+        return ';'.join(reversed(parts))
+
+    def sample(self):
+        """Один снимок стеков всех потоков, кроме самого сэмплера."""
+        names = {
+            thread.ident: thread.name for thread in threading.enumerate()
+        }
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident != own:
+                name = names.get(ident, str(ident))
+                self.stacks[self._collapse(name, frame)] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Запускает фоновый поток сэмплера."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сэмплер и записывает свёрнутые стеки."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+    def write(self):
+        """Файл `стек количество` для построения flame graph."""
+        with open(self.path, 'w', encoding='utf-8') as profile_file:
+            for stack, count in self.stacks.most_common():
+                profile_file.write(f'{stack} {count}\n')
+
+
+def start_profiler(path=DEFAULT_PATH, interval=DEFAULT_INTERVAL):
+    """Запускает сэмплер, если он ещё не работает."""
+    global _sampler
+    if _sampler is not None:
+        return _sampler
+    path = path.format(pid=os.getpid(), started=int(time.time()))
+    _sampler = StackSampler(path, interval).start()
+    logger.info(f'Профилировщик запущен, стеки будут в {path}')
+    return _sampler
+
+
+def stop_profiler():
+    """Останавливает сэмплер и записывает файл; без сэмплера — None."""
+    global _sampler
+    sampler, _sampler = _sampler, None
+    if sampler is None:
+        return None
+    sampler.stop()
+    logger.info(
+        f'Профилировщик остановлен: {sampler.samples} снимков в '
+        f'{sampler.path}'
+    )
+    return sampler
+
+
+def configure(spans=False, profile=False, path=DEFAULT_PATH,
+              interval=DEFAULT_INTERVAL):
+    """Замеры фаз, профилировщик при старте и его включение сигналом."""
+    enable_spans(spans)
+
+    def toggle(signum, frame):
+        if stop_profiler() is None:
+            start_profiler(path, interval)
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(TOGGLE_SIGNAL, toggle)
+    if profile:
+        start_profiler(path, interval)
+
+
+atexit.register(stop_profiler)
@@ -0,0 +1,196 @@
+"""Общий лимит запросов к API Практикума для всех опросчиков.
+
+Лимит — алгоритм GCRA («ведро токенов» через расписание): хранится
+одно число, ближайшее время, с которого разрешён следующий запрос.
+`reserve()` занимает ближайший свободный слот и возвращает, сколько до
+него ждать, поэтому запросы идут ровно через `1 / rate` секунд и не
+собираются в пачку в начале каждого периода опроса. `burst` разрешает
+столько запросов подряд после простоя.
+
+Состояние лежит в памяти процесса (`MemoryState`) или в файле SQLite
+(`SqliteState`): тогда лимит общий для всех процессов на машине —
+например, для опросчиков `WORKER_PROCESSES` за одним внешним IP.
+Ответ 429 с `Retry-After` останавливает запросы всех опросчиков до
+указанного времени (`block()`).
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_AFTER = 60.0
+
+
+def parse_retry_after(value, now=None):
+    """Секунды из `Retry-After`: число или HTTP-дата; иначе None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - now)
+
+
+class MemoryState:
+    """Расписание лимита в памяти процесса."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._ready_at = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, interval, tolerance):
+        """Занимает слот; возвращает ожидание до него в секундах."""
+        with self._lock:
+            now = self.clock()
+            ready_at = max(self._ready_at, now)
+            self._ready_at = ready_at + interval
+            return max(0.0, ready_at - tolerance - now)
+
+    def block(self, seconds, tolerance):
+        """Запрещает запросы на `seconds` секунд."""
+        with self._lock:
+            self._ready_at = max(
+                self._ready_at, self.clock() + seconds + tolerance
+            )
+
+    def close(self):
+        """Освобождает ресурсы."""
+
+
+class SqliteState(MemoryState):
+    """Расписание лимита в SQLite: общее для процессов одной машины.
+
+    Каждое резервирование — одна короткая транзакция `BEGIN IMMEDIATE`,
+    которая атомарно читает и сдвигает время. Время берётся по
+    `time.time()`, одинаковому для всех процессов.
+    """
+
+    def __init__(self, path, name='practicum', clock=time.time):
+        super().__init__(clock)
+        self.path = path
+        self.name = name
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=OFF')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS ratelimit '
+            '(name TEXT PRIMARY KEY, ready_at REAL NOT NULL)'
+        )
+
+    def _update(self, shift):
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._connection.execute(
+                    'SELECT ready_at FROM ratelimit WHERE name = ?',
+                    (self.name,),
+                ).fetchone()
+                now = self.clock()
+                ready_at, result = shift(0.0 if row is None else row[0], now)
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO ratelimit VALUES (?, ?)',
+                    (self.name, ready_at),
+                )
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+            return result
+
+    def reserve(self, interval, tolerance):
+        """Занимает слот; возвращает ожидание до него в секундах."""
+        def shift(stored, now):
+            ready_at = max(stored, now)
+            return ready_at + interval, max(0.0, ready_at - tolerance - now)
+        return self._update(shift)
+
+    def block(self, seconds, tolerance):
+        """Запрещает запросы всем процессам на `seconds` секунд."""
+        self._update(
+            lambda stored, now: (max(stored, now + seconds + tolerance), None)
+        )
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._connection.close()
+
+
+class RateLimiter:
+    """Не больше `rate` запросов в секунду, до `burst` подряд."""
+
+    def __init__(self, rate, burst=1, state=None, sleep=time.sleep):
+        if rate <= 0 or burst < 1:
+            raise ValueError('Лимит запросов должен быть больше нуля.')
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1.0 / rate
+        self.tolerance = (burst - 1) * self.interval
+        self.state = MemoryState() if state is None else state
+        self.sleep = sleep
+
+    def reserve(self):
+        """Занимает слот для запроса; возвращает, сколько ждать."""
+        wait = self.state.reserve(self.interval, self.tolerance)
+        metrics.RATE_LIMIT_WAIT.observe(wait)
+        return wait
+
+    def acquire(self):
+        """Ждёт своего слота; возвращает время ожидания."""
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def block(self, retry_after=None):
+        """Ответ 429: все опросчики ждут `retry_after` секунд."""
+        seconds = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        self.state.block(seconds, self.tolerance)
+        logger.warning(f'API просит подождать: запросы на паузе {seconds} с')
+
+    def close(self):
+        """Закрывает хранилище состояния."""
+        self.state.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def configure(rate, burst=1, path=None):
+    """Включает общий лимит для `request_api`; `path` — файл SQLite."""
+    global _shared
+    state = SqliteState(path) if path else MemoryState()
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+        _shared = RateLimiter(rate, burst, state)
+        return _shared
+
+
+def shared_limiter():
+    """Общий лимит или None, если он не настроен."""
+    return _shared
+
+
+def reset():
+    """Выключает общий лимит."""
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+        _shared = None
@@ -0,0 +1,108 @@
+"""Интервал между опросами API: фиксированный или адаптивный."""
+import random
+import time
+
+from exceptions import ApiError, HttpError
+
+
+class FixedSchedule:
+    """Всегда один и тот же интервал `period`."""
+
+    def __init__(self, period):
+        self.period = period
+        self.retry_after = 0
+
+    def observe(self, homeworks):
+        """Учитывает ответ API."""
+        self.retry_after = 0
+
+    def observe_error(self, error):
+        """Учитывает ошибку опроса: `Retry-After` ответа 429."""
+        self.retry_after = getattr(error, 'retry_after', None) or 0
+
+    def next_delay(self):
+        """Сколько секунд ждать до следующего опроса."""
+        return max(self.period, self.retry_after)
+
+
+class AdaptiveSchedule(FixedSchedule):
+    """Интервал подстраивается под недавнюю активность.
+
+    * после статуса `reviewing` в течение `review_window` секунд опрос
+      идёт раз в `review_period` — вердикт часто приходит вскоре;
+    * после подряд идущих `ApiError`/`HttpError` интервал растёт
+      от `period` вдвое на каждую ошибку, до `max_period`: во время
+      сбоя бот опрашивает API реже, а не чаще;
+    * после `quiet_after` пустых ответов подряд интервал растёт
+      на `period` за каждый следующий пустой ответ, до `quiet_period`.
+
+    Ко всем интервалам, кроме базового, добавляется случайный разброс
+    ±`jitter`, чтобы повторные попытки многих ботов не совпадали.
+    Интервал не короче `Retry-After` последнего ответа 429.
+    """
+
+    def __init__(self, period, review_period=120,
+                 review_window=3600, max_period=3600,
+                 quiet_after=6, quiet_period=1200, jitter=0.1,
+                 clock=time.monotonic, rng=None):
+        super().__init__(period)
+        self.review_period = review_period
+        self.review_window = review_window
+        self.max_period = max_period
+        self.quiet_after = quiet_after
+        self.quiet_period = quiet_period
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.failures = 0
+        self.idle_polls = 0
+        self.review_until = None
+
+    def observe(self, homeworks):
+        """Учитывает ответ API: статусы работ или их отсутствие."""
+        super().observe(homeworks)
+        self.failures = 0
+        if not homeworks:
+            self.idle_polls += 1
+            return
+        self.idle_polls = 0
+        statuses = {homework.get('status') for homework in homeworks}
+        if 'reviewing' in statuses:
+            self.review_until = self.clock() + self.review_window
+        elif statuses & {'approved', 'rejected'}:
+            self.review_until = None
+
+    def observe_error(self, error):
+        """Считает только сбои сети и HTTP — их имеет смысл пережидать."""
+        super().observe_error(error)
+        if isinstance(error, (ApiError, HttpError)):
+            self.failures += 1
+
+    def _jittered(self, delay):
+        spread = delay * self.jitter
+        return delay + self.rng.uniform(-spread, spread)
+
+    def next_delay(self):
+        """Интервал до следующего опроса с учётом состояния."""
+        return max(self._delay(), self.retry_after)
+
+    def _delay(self):
+        if self.failures:
+            delay = self.period * 2 ** (self.failures - 1)
+            return self._jittered(min(delay, self.max_period))
+        if self.review_until is not None:
+            if self.clock() < self.review_until:
+                return self._jittered(self.review_period)
+            self.review_until = None
+        extra = self.idle_polls - self.quiet_after
+        if extra > 0:
+            delay = self.period + extra * self.period
+            return self._jittered(min(delay, self.quiet_period))
+        return self.period
+
+
+def make_schedule(period, adaptive=False):
+    """Фабрика расписания по настройке `ADAPTIVE_POLLING`."""
+    if adaptive:
+        return AdaptiveSchedule(period)
+    return FixedSchedule(period)
@@ -0,0 +1,76 @@
+"""Остановка по SIGTERM и SIGINT без потери сообщений и состояния.
+
+Обработчик сигнала только ставит флаг `requested`. Исключение
+`ShutdownRequest` бросается лишь внутри `interruptible()` — в паузе
+между опросами и в запросе к API, где прерывание ничего не теряет.
+Начатая отправка в Telegram доводится до конца; входя в следующую
+паузу, цикл видит флаг и выходит. Повторный сигнал прерывает и
+остановку; сигнал, пришедший быстрее `DUPLICATE_WINDOW` секунд после
+первого, считается тем же — так бывает, когда SIGTERM получают все
+процессы сразу, а супервизор ещё и пересылает его опросчикам.
+"""
+import logging
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+from exceptions import ShutdownRequest
+
+logger = logging.getLogger(__name__)
+
+SIGNALS = (signal.SIGTERM, signal.SIGINT)
+DUPLICATE_WINDOW = 1.0
+
+
+class GracefulShutdown:
+    """Обработчик сигналов остановки для цикла опроса."""
+
+    def __init__(self, signals=SIGNALS):
+        self.signals = signals
+        self.requested = False
+        self._requested_at = None
+        self._interruptible = False
+        self._previous = {}
+
+    def install(self):
+        """Ставит обработчики; вне главного потока ничего не делает."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in self.signals:
+                self._previous[signum] = signal.signal(signum, self._handle)
+        return self
+
+    def restore(self):
+        """Возвращает прежние обработчики сигналов."""
+        while self._previous:
+            signum, handler = self._previous.popitem()
+            signal.signal(signum, handler)
+
+    def _handle(self, signum, frame):
+        name = signal.Signals(signum).name
+        if self.requested:
+            if time.monotonic() - self._requested_at < DUPLICATE_WINDOW:
+                return
+            logger.warning(f'Повторный {name}: останавливаемся немедленно')
+            raise ShutdownRequest(0)
+        self.requested = True
+        self._requested_at = time.monotonic()
+        logger.info(f'Получен {name}: завершаем работу')
+        if self._interruptible:
+            self._interruptible = False
+            raise ShutdownRequest(0)
+
+    @contextmanager
+    def interruptible(self):
+        """Участок, который сигнал остановки может прервать.
+
+        Флаг ставится до проверки `requested`: сигнал, пришедший между
+        ними, либо прерывает сразу, либо виден в проверке.
+        """
+        self._interruptible = True
+        try:
+            if self.requested:
+                raise ShutdownRequest(0)
+            yield
+        finally:
+            self._interruptible = False
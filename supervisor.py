@@ -0,0 +1,242 @@
+"""Несколько процессов-опросчиков для большого реестра тенантов.
+
+Один процесс упирается в одно ядро: разбор JSON и сборка сообщений
+идут под GIL. Супервизор запускает `WORKER_PROCESSES` процессов, и
+каждый опрашивает свою часть реестра. Тенант попадает в процесс по
+кольцу согласованного хеширования токена, поэтому при добавлении
+процесса переезжает лишь около `1 / N` тенантов, а не все.
+
+Процессы не делят память: неверный токен или упавший процесс не
+задевают остальных. Упавший процесс перезапускается в тот же слот —
+с теми же тенантами — с растущей паузой, чтобы процесс, падающий при
+старте, не крутился в цикле. Процессы создаются методом `spawn`: у
+супервизора уже могут работать потоки логирования и метрик, а `fork`
+скопировал бы их блокировки.
+"""
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+import homework
+from shutdown import GracefulShutdown
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLICAS = 128
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+
+
+class HashRing:
+    """Кольцо согласованного хеширования: ключ -> узел.
+
+    Каждый узел занимает на кольце `replicas` точек; ключ достаётся
+    узлу первой точки по часовой стрелке от хеша ключа.
+    """
+
+    def __init__(self, nodes=(), replicas=DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def add(self, node):
+        """Добавляет узел на кольцо."""
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = self._hash(f'{node}#{replica}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        """Убирает узел; его ключи расходятся по соседям."""
+        self.nodes.discard(node)
+        kept = [
+            (point, owner)
+            for point, owner in zip(self._points, self._owners)
+            if owner != node
+        ]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key):
+        """Узел, которому принадлежит ключ."""
+        if not self._points:
+            raise LookupError('На кольце нет узлов.')
+        index = bisect.bisect(self._points, self._hash(key))
+        return self._owners[index % len(self._points)]
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def select_shard(registry, ring, node):
+    """Оставляет в реестре только тенантов узла `node`."""
+    for tenant in registry:
+        if ring.node_for(tenant.token) != node:
+            registry.remove(tenant.token)
+    return registry
+
+
+def worker_log_file(filename, slot):
+    """Файл лога процесса `slot`.
+
+    `RotatingFileHandler` не рассчитан на несколько процессов: ротация
+    общего файла теряет и перемешивает строки.
+    """
+    root, extension = os.path.splitext(filename)
+    return f'{root}.worker-{slot}{extension}'
+
+
+def run_worker(path, slot, count):
+    """Процесс-опросчик: тенанты слота `slot` из `count`."""
+    import engine
+    homework.LOG_FILE = worker_log_file(homework.LOG_FILE, slot)
+    homework.configure_logging()
+    if homework.METRICS_PORT:
+        homework.METRICS_PORT += slot + 1
+    homework.WEBHOOK_PORT = 0
+    homework.configure_runtime()
+    ring = HashRing(range(count))
+    engine.run_tenants(
+        path, shard=lambda registry: select_shard(registry, ring, slot),
+        share=1 / count,
+    )
+
+
+class Supervisor:
+    """Держит `count` процессов `target(*args, slot, count)` живыми."""
+
+    def __init__(self, target, count, args=(), restart_delay=RESTART_DELAY,
+                 max_restart_delay=MAX_RESTART_DELAY):
+        self.target = target
+        self.count = count
+        self.args = args
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.processes = {}
+        self.restarts = 0
+        self._context = multiprocessing.get_context('spawn')
+        self._started = {}
+        self._delays = {}
+        self._pending = {}
+
+    def _start(self, slot):
+        process = self._context.Process(
+            target=self.target, args=(*self.args, slot, self.count),
+            name=f'worker-{slot}',
+        )
+        process.start()
+        self.processes[slot] = process
+        self._started[slot] = time.monotonic()
+        logger.info(f'Запущен {process.name}, pid {process.pid}')
+
+    def start(self):
+        """Запускает все процессы."""
+        for slot in range(self.count):
+            self._start(slot)
+        return self
+
+    def _schedule_restart(self, slot, process):
+        uptime = time.monotonic() - self._started[slot]
+        if uptime > self.max_restart_delay:
+            delay = self.restart_delay
+        else:
+            delay = min(
+                self._delays.get(slot, self.restart_delay / 2) * 2,
+                self.max_restart_delay,
+            )
+        self._delays[slot] = delay
+        self._pending[slot] = time.monotonic() + delay
+        logger.error(
+            f'{process.name} завершился с кодом {process.exitcode}, '
+            f'перезапуск через {delay:.1f} с'
+        )
+
+    def check(self, timeout=1.0):
+        """Ждёт до `timeout` секунд; упавшие процессы перезапускает."""
+        now = time.monotonic()
+        for slot, due in list(self._pending.items()):
+            if due <= now:
+                del self._pending[slot]
+                self.restarts += 1
+                self._start(slot)
+        if self._pending:
+            timeout = max(0.0, min(
+                timeout, min(self._pending.values()) - now
+            ))
+        sentinels = {
+            process.sentinel: slot for slot, process in self.processes.items()
+        }
+        for sentinel in wait(list(sentinels), timeout):
+            slot = sentinels[sentinel]
+            process = self.processes.pop(slot)
+            process.join()
+            self._schedule_restart(slot, process)
+
+    def stop(self, timeout):
+        """SIGTERM всем процессам; не успевшие за `timeout` — SIGKILL."""
+        self._pending.clear()
+        for process in self.processes.values():
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error(f'{process.name} не остановился, SIGKILL')
+                process.kill()
+                process.join()
+        self.processes.clear()
+
+    def run(self, shutdown=None):
+        """Запускает процессы и следит за ними до сигнала остановки."""
+        shutdown = shutdown or GracefulShutdown()
+        self.start()
+        try:
+            while True:
+                with shutdown.interruptible():
+                    self.check()
+        finally:
+            self.stop(homework.SHUTDOWN_TIMEOUT + 2)
+
+
+def run(path, count):
+    """Режим `WORKER_PROCESSES`: супервизор и `count` опросчиков."""
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical('Отсутствует переменная окружения! TELEGRAM_TOKEN')
+        raise SystemExit('Проверь токены!')
+    if homework.WEBHOOK_PORT:
+        logger.warning('Вебхук не работает с WORKER_PROCESSES, отключён')
+    if homework.API_RATE and not homework.API_RATE_PATH:
+        logger.warning(
+            'API_RATE без API_RATE_PATH действует в каждом процессе '
+            'отдельно: общий лимит больше в WORKER_PROCESSES раз'
+        )
+    import engine
+    registry = engine.load_registry(path)
+    ring = HashRing(range(count))
+    sizes = [0] * count
+    for tenant in registry:
+        sizes[ring.node_for(tenant.token)] += 1
+    logger.info(
+        f'Супервизор {os.getpid()}: {len(registry)} тенантов '
+        f'по {count} процессам: {sizes}'
+    )
+    shutdown = GracefulShutdown().install()
+    try:
+        Supervisor(run_worker, count, args=(path,)).run(shutdown)
+    finally:
+        shutdown.restore()
+        logger.info('Супервизор остановлен')
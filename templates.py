@@ -0,0 +1,171 @@
+"""Тексты уведомлений: шаблоны по языкам и разметка Telegram.
+
+Шаблон компилируется один раз на язык, статус и вердикт: постоянный
+текст и вердикт экранируются заранее, а шаблон разрезается по полю
+`{name}` на куски. Отрисовка сообщения — поиск в словаре и
+`name.join(куски)`; экранированные названия работ тоже запоминаются.
+
+По умолчанию (`ru`, без разметки) текст совпадает с прежним
+`parse_status` символ в символ.
+"""
+import string
+
+DEFAULT_LOCALE = 'ru'
+NAME_CACHE_SIZE = 4096
+MESSAGE_FIELDS = ('name', 'verdict', 'status')
+COMMENT_FIELDS = ('comment', 'verdict', 'status')
+
+LOCALES = {
+    'ru': {
+        'message': 'Изменился статус проверки работы "{name}". {verdict}',
+        'comment': '\nКомментарий ревьюера: {comment}',
+        # Пустой словарь — вердикты из `homework.HOMEWORK_VERDICTS`.
+        'verdicts': {},
+    },
+    'en': {
+        'message': 'Review status of "{name}" has changed. {verdict}',
+        'comment': '\nReviewer comment: {comment}',
+        'verdicts': {
+            'approved': 'Reviewed: the reviewer liked everything. Hooray!',
+            'reviewing': 'The reviewer has started reviewing the work.',
+            'rejected': 'Reviewed: the reviewer has some remarks.',
+        },
+    },
+}
+
+# Замены по порядку: обратная косая черта — первой.
+ESCAPES = {
+    None: (),
+    'HTML': (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')),
+    'Markdown': tuple((char, '\\' + char) for char in '_*`['),
+    'MarkdownV2': tuple(
+        (char, '\\' + char) for char in '\\_*[]()~`>#+-=|{}.!'
+    ),
+}
+EMPHASIS = {
+    None: ('', ''),
+    'HTML': ('<b>', '</b>'),
+    'Markdown': ('*', '*'),
+    'MarkdownV2': ('*', '*'),
+}
+
+locale = DEFAULT_LOCALE
+parse_mode = None
+comments = False
+override = None
+_compiled = {}
+_names = {}
+_formatter = string.Formatter()
+
+
+def escape(text, mode=None):
+    """Экранирует текст для режима разметки (по умолчанию — текущего)."""
+    for char, replacement in ESCAPES[mode or parse_mode]:
+        if char in text:
+            text = text.replace(char, replacement)
+    return text
+
+
+def compile_template(template, values, mode=None, field='name',
+                     allowed=MESSAGE_FIELDS):
+    """Куски шаблона между вхождениями поля `field`.
+
+    Постоянный текст и поля из `values` подставляются и экранируются
+    для `mode`; `name` выделяется жирным. Поле не из `allowed` —
+    `ValueError`.
+    """
+    before, after = EMPHASIS[mode] if field == 'name' else ('', '')
+    parts, current = [], []
+    for literal, name, spec, conversion in _formatter.parse(template):
+        current.append(escape(literal, mode) if mode else literal)
+        if name is None:
+            continue
+        if name not in allowed or spec or conversion:
+            raise ValueError(f'Неизвестное поле шаблона: {{{name}}}')
+        if name == field:
+            current.append(before)
+            parts.append(''.join(current))
+            current = [after]
+        else:
+            value = values[name]
+            current.append(escape(value, mode) if mode else value)
+    parts.append(''.join(current))
+    return tuple(parts)
+
+
+def _compile(key):
+    code, status, verdict = key
+    texts = LOCALES.get(code)
+    if texts is None:
+        raise ValueError(f'Неизвестный язык сообщений: {code}')
+    values = {
+        'status': status,
+        'verdict': texts['verdicts'].get(status, verdict),
+    }
+    message = override if override and code == locale else texts['message']
+    compiled = compile_template(message, values, parse_mode)
+    if comments:
+        compiled = (compiled, compile_template(
+            texts['comment'], values, parse_mode, 'comment', COMMENT_FIELDS
+        ))
+    _compiled[key] = compiled
+    return compiled
+
+
+def _escape_name(name):
+    escaped = _names.get(name)
+    if escaped is None:
+        if len(_names) >= NAME_CACHE_SIZE:
+            _names.clear()
+        escaped = _names[name] = escape(name)
+    return escaped
+
+
+def render(record, code=None):
+    """Текст уведомления о `Homework` на языке `code`.
+
+    Подходит и кортеж полей из `models.parse_homework`.
+    """
+    _, name, status, verdict, _, note = record
+    key = (code or locale, status, verdict)
+    compiled = _compiled.get(key) or _compile(key)
+    if parse_mode:
+        name = _escape_name(name)
+    if not comments:
+        return name.join(compiled)
+    message, comment = compiled
+    if not note:
+        return name.join(message)
+    return name.join(message) + escape(note).join(comment)
+
+
+def register(code, message, verdicts=None, comment=''):
+    """Добавляет язык или заменяет шаблоны существующего."""
+    compile_template(message, dict.fromkeys(MESSAGE_FIELDS, ''))
+    compile_template(comment, dict.fromkeys(COMMENT_FIELDS, ''),
+                     field='comment', allowed=COMMENT_FIELDS)
+    LOCALES[code] = {
+        'message': message, 'comment': comment, 'verdicts': verdicts or {},
+    }
+    _compiled.clear()
+
+
+def configure(code=DEFAULT_LOCALE, mode=None, with_comments=False,
+              template=None):
+    """Язык по умолчанию, режим разметки и комментарии ревьюера.
+
+    `template` заменяет шаблон сообщения языка по умолчанию.
+    """
+    global locale, parse_mode, comments, override
+    code = code or DEFAULT_LOCALE
+    mode = mode or None
+    if code not in LOCALES:
+        raise ValueError(f'Неизвестный язык сообщений: {code}')
+    if mode not in ESCAPES:
+        raise ValueError(f'Неизвестный режим разметки: {mode}')
+    if template:
+        compile_template(template, dict.fromkeys(MESSAGE_FIELDS, ''))
+    locale, parse_mode, comments = code, mode, bool(with_comments)
+    override = template or None
+    _compiled.clear()
+    _names.clear()
@@ -0,0 +1,89 @@
+"""Реестр тенантов: какой токен Практикума в какой чат Telegram пишет."""
+import time
+
+import templates
+from exceptions import TokenError
+
+
+class Tenant:
+    """Один студент: токен API, чат и позиция опроса."""
+
+    __slots__ = ('token', 'chat_id', 'timestamp', 'errors', 'locale')
+
+    def __init__(self, token, chat_id, timestamp=None, locale=None):
+        self.token = token
+        self.chat_id = chat_id
+        self.locale = locale
+        self.timestamp = (
+            int(time.time()) if timestamp is None else int(timestamp)
+        )
+        self.errors = 0
+
+    def __repr__(self):
+        return f'Tenant(chat_id={self.chat_id!r})'
+
+
+class TenantRegistry:
+    """Соответствие токен -> тенант с порядком добавления."""
+
+    def __init__(self):
+        self._tenants = {}
+
+    def add(self, token, chat_id, timestamp=None, locale=None):
+        """Регистрирует токен; повторная регистрация меняет чат и язык."""
+        if not token or not chat_id:
+            raise TokenError('У тенанта должны быть токен и id чата.')
+        tenant = self._tenants.get(token)
+        if tenant is None:
+            tenant = Tenant(token, chat_id, timestamp, locale)
+            self._tenants[token] = tenant
+        else:
+            tenant.chat_id = chat_id
+            tenant.locale = locale
+        return tenant
+
+    def remove(self, token):
+        """Удаляет тенанта, если он был зарегистрирован."""
+        return self._tenants.pop(token, None)
+
+    def get(self, token):
+        """Возвращает тенанта по токену или None."""
+        return self._tenants.get(token)
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __iter__(self):
+        return iter(list(self._tenants.values()))
+
+    def __contains__(self, token):
+        return token in self._tenants
+
+    @classmethod
+    def from_lines(cls, lines, timestamp=None):
+        """Собирает реестр из строк вида `<токен> <id чата> [язык]`.
+
+        Пустые строки и строки, начинающиеся с `#`, пропускаются.
+        """
+        registry = cls()
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) not in (2, 3):
+                raise TokenError(
+                    f'Строка {number}: ожидается "<токен> <id чата> [язык]".'
+                )
+            if len(parts) == 3 and parts[2] not in templates.LOCALES:
+                raise TokenError(
+                    f'Строка {number}: неизвестный язык {parts[2]}.'
+                )
+            registry.add(parts[0], parts[1], timestamp, *parts[2:])
+        return registry
+
+    @classmethod
+    def from_file(cls, path, timestamp=None):
+        """Читает реестр из файла, см. `from_lines`."""
+        with open(path, encoding='utf-8') as tenants_file:
+            return cls.from_lines(tenants_file, timestamp)
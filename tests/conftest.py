@@ -1,5 +1,8 @@
-import sys
+import logging
 import os
+import sys
+
+import pytest
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
@@ -24,3 +27,21 @@ pytest_plugins = [
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+@pytest.fixture(autouse=True)
+def isolate_logging(tmp_path, monkeypatch):
+    """Файл лога `main()` — во временном каталоге, обработчики — прежние."""
+    import homework
+    from log_config import NOISY_LOGGERS, shutdown_logging
+
+    monkeypatch.setattr(homework, 'LOG_FILE', str(tmp_path / 'logger.log'))
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    levels = {name: logging.getLogger(name).level for name in NOISY_LOGGERS}
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    for name, noisy_level in levels.items():
+        logging.getLogger(name).setLevel(noisy_level)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+import requests
+import telegram
+
+import async_bot
+import homework
+import metrics
+import practicum
+import utils
+from benchmarks.stub_server import PracticumStub
+from test_metrics import sample
+
+
+class TestAsyncBot:
+
+    def test_get_api_answer_without_session(self, monkeypatch,
+                                            random_timestamp):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=random_timestamp
+            )
+        )
+        result = asyncio.run(async_bot.get_api_answer(0))
+        assert result == {'homeworks': [], 'current_date': random_timestamp}
+
+    def test_get_api_answer_with_aiohttp(self, monkeypatch):
+        pytest.importorskip('aiohttp')
+
+        async def poll():
+            session = async_bot.create_session()
+            try:
+                return await asyncio.gather(*(
+                    async_bot.get_api_answer(0, session) for _ in range(10)
+                ))
+            finally:
+                await session.close()
+
+        with PracticumStub() as stub:
+            monkeypatch.setattr(homework, 'ENDPOINT', stub.endpoint)
+            results = asyncio.run(poll())
+            assert stub.requests == 10
+        assert all(result['homeworks'] == [] for result in results)
+
+    def test_aiohttp_records_metrics_and_uses_cache(self, monkeypatch):
+        pytest.importorskip('aiohttp')
+
+        async def poll(times):
+            session = async_bot.create_session()
+            try:
+                return [
+                    await async_bot.get_api_answer(0, session)
+                    for _ in range(times)
+                ]
+            finally:
+                await session.close()
+
+        before = sample(metrics.API_RESPONSES, labels='{code="304"}')
+        latency = sample(metrics.API_LATENCY, '_count')
+        cache = practicum.configure_cache()
+        try:
+            with PracticumStub(etag=True) as stub:
+                monkeypatch.setattr(homework, 'ENDPOINT', stub.endpoint)
+                first, second = asyncio.run(poll(2))
+        finally:
+            practicum.reset()
+        assert second['homeworks'] == first['homeworks']
+        assert cache.stats()['not_modified'] == 1
+        assert sample(
+            metrics.API_RESPONSES, labels='{code="304"}'
+        ) == before + 1
+        assert sample(metrics.API_LATENCY, '_count') == latency + 2
+
+    def test_send_message(self, monkeypatch):
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+        bot = utils.MockTelegramBot()
+        asyncio.run(async_bot.send_message(bot, 'Test_message_check'))
+        assert (bot.chat_id, bot.text) == ('12345', 'Test_message_check')
+
+    def test_main_sends_through_outbox(self, monkeypatch, tmp_path,
+                                       data_with_new_hw_status):
+        bots = []
+
+        class RecordingBot(utils.MockTelegramBot):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                bots.append(self)
+
+        async def answer(*args):
+            return data_with_new_hw_status
+
+        async def stop(stopping, delay):
+            stopping.set()
+
+        for name, value in (('PRACTICUM_TOKEN', 'token'),
+                            ('TELEGRAM_TOKEN', 'token'),
+                            ('TELEGRAM_CHAT_ID', '42'),
+                            ('TELEGRAM_OUTBOX', True),
+                            ('CHECKPOINT_PATH', str(tmp_path / 'state.json'))):
+            monkeypatch.setattr(homework, name, value)
+        monkeypatch.setattr(telegram, 'Bot', RecordingBot)
+        monkeypatch.setattr(async_bot, 'create_session', lambda: None)
+        monkeypatch.setattr(async_bot, 'get_api_answer', answer)
+        monkeypatch.setattr(async_bot, 'pause', stop)
+        confirmed = homework.confirmed
+        queued = []
+
+        def spy(bot):
+            queued.append(getattr(bot, 'queued', False))
+            return confirmed(bot)
+
+        monkeypatch.setattr(homework, 'confirmed', spy)
+        asyncio.run(async_bot.main())
+        assert queued == [True]
+        assert bots[0].chat_id == '42'
+        state = json.loads((tmp_path / 'state.json').read_text())
+        assert state['timestamp'] == data_with_new_hw_status['current_date']
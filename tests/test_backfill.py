@@ -0,0 +1,139 @@
+import json
+import tracemalloc
+
+import pytest
+import requests
+
+import homework
+from backfill import HomeworkStream, backfill
+from checkpoint import FileCheckpointStore
+from exceptions import HttpError, JsonError
+from utils import make_homework
+
+
+def split(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+class StreamResponse:
+
+    status_code = 200
+
+    def __init__(self, body, chunk=7):
+        self.body = body
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return split(self.body, self.chunk)
+
+    def close(self):
+        self.closed = True
+
+
+class TestHomeworkStream:
+
+    @pytest.mark.parametrize('size', [1, 2, 3, 5, 64, 4096])
+    def test_any_chunk_boundaries(self, size):
+        payload = {
+            'current_date': 1700000000,
+            'homeworks': [make_homework(number) for number in range(5)],
+        }
+        body = json.dumps(payload, ensure_ascii=False, indent=1).encode()
+        stream = HomeworkStream(split(body, size))
+        assert list(stream) == payload['homeworks']
+        assert stream.current_date == 1700000000
+
+    def test_current_date_after_array_and_empty_list(self):
+        stream = HomeworkStream([b'{"homeworks": [ ], "current_date": 5}'])
+        assert list(stream) == []
+        assert stream.current_date == 5
+
+    @pytest.mark.parametrize('body', [
+        b'{"homeworks": [{"id": 1}, {"id": ',
+        b'{"homeworks": [{"id": 1} {"id": 2}',
+        b'{"detail": "not found"}',
+        b'{"homeworks": ["\xff"]}',
+    ])
+    def test_malformed(self, body):
+        with pytest.raises(JsonError):
+            list(HomeworkStream(split(body, 4)))
+
+    def test_memory_does_not_grow_with_history(self):
+        count = 20000
+
+        def chunks():
+            yield b'{"homeworks": ['
+            for number in range(count):
+                prefix = b',' if number else b''
+                yield prefix + json.dumps(make_homework(number)).encode()
+            yield b'], "current_date": 1}'
+
+        tracemalloc.start()
+        seen = sum(1 for _ in HomeworkStream(chunks()))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert seen == count
+        assert peak < 256 * 1024
+
+
+class TestBackfill:
+
+    def test_records_statuses_into_checkpoint(self, monkeypatch, tmp_path):
+        history = [
+            make_homework(1, 'approved', '2023-01-01T00:00:00Z'),
+            make_homework(2, 'rejected', '2023-02-01T00:00:00Z'),
+            {'homework_name': 'broken', 'status': 'unknown'},
+        ]
+        body = json.dumps({'homeworks': history, 'current_date': 100})
+        response = StreamResponse(body.encode())
+        calls = {}
+
+        def mock_get(*args, **kwargs):
+            calls.update(kwargs)
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        store = FileCheckpointStore(str(tmp_path / 'state.json'), fsync=False)
+        messages = []
+        stats = backfill(0, store, lambda record, text: messages.append(text))
+        assert calls['params'] == {'from_date': 0} and calls['stream']
+        assert response.closed
+        assert stats == {'records': 3, 'recorded': 2, 'errors': 1}
+        assert messages[1] == homework.parse_status(history[1])
+        state = store.load()
+        assert [row[1:3] for row in state['seen']] == [
+            ['1', 'approved'], ['2', 'rejected'],
+        ]
+        assert state['timestamp'] == 100
+
+        tracker = homework.StatusTracker.from_store(store)
+        response = {'homeworks': history[:2], 'current_date': 200}
+        assert tracker.on_response(response) == []
+
+    def test_keeps_newer_changes_for_poll_loop(self, monkeypatch, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / 'state.json'), fsync=False)
+        store.save({'timestamp': 1672531200})
+        history = [
+            make_homework(1, 'approved', '2022-12-01T00:00:00Z'),
+            make_homework(2, 'approved', '2023-06-01T00:00:00Z'),
+        ]
+        body = json.dumps({'homeworks': history, 'current_date': 1})
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: StreamResponse(body.encode()),
+        )
+        backfill(0, store)
+        state = store.load()
+        assert [row[1:3] for row in state['seen']] == [['1', 'approved']]
+        assert state['timestamp'] == 1672531200
+
+    def test_http_error(self, monkeypatch, tmp_path):
+        response = StreamResponse(b'{}')
+        response.status_code = 401
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: response
+        )
+        with pytest.raises(HttpError):
+            backfill(0, FileCheckpointStore(str(tmp_path / 'state.json')))
+        assert response.closed
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+import requests
+
+import homework
+import metrics
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from engine import PollingEngine
+from exceptions import ApiError, CircuitOpenError, HttpError, JsonError
+from tenants import TenantRegistry
+from utils import FakeClock
+
+
+def fail(error):
+    def func():
+        raise error
+    return func
+
+
+def state_value(name='practicum'):
+    return metrics.BREAKER_STATE.labels(name).value
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker(
+            'test', failure_threshold=3, recovery_timeout=10, clock=FakeClock()
+        )
+        for _ in range(3):
+            with pytest.raises(ApiError):
+                breaker.call(fail(ApiError('нет связи')))
+        assert breaker.state == OPEN
+        assert state_value('test') == 1
+        calls = []
+        with pytest.raises(CircuitOpenError):
+            breaker.call(calls.append, 1)
+        assert calls == []
+
+    def test_half_open_probe_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'test', failure_threshold=1, recovery_timeout=10, clock=clock
+        )
+        with pytest.raises(HttpError):
+            breaker.call(fail(HttpError('Код ответа != 200.', 503)))
+        clock.now = 10
+        with pytest.raises(ApiError):
+            breaker.call(fail(ApiError('нет связи')))
+        assert breaker.state == OPEN and breaker.opened_at == 10
+        clock.now = 20
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CLOSED and breaker.failures == 0
+        assert state_value('test') == 0
+
+    def test_half_open_allows_limited_probes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'test', failure_threshold=1, recovery_timeout=1, clock=clock
+        )
+        with pytest.raises(ApiError):
+            breaker.call(fail(ApiError()))
+        clock.now = 1
+        breaker.before()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before()
+
+    @pytest.mark.parametrize('error', [
+        HttpError('Код ответа != 200.', 401),
+        JsonError('Ошибка JSON'),
+    ])
+    def test_client_errors_do_not_open(self, error):
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        with pytest.raises(type(error)):
+            breaker.call(fail(error))
+        assert breaker.state == CLOSED
+
+
+def test_request_api_passes_timeout(monkeypatch):
+    seen = {}
+
+    def mock_get(*args, **kwargs):
+        seen.update(kwargs)
+        raise requests.ConnectTimeout('timeout')
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    with pytest.raises(ApiError):
+        homework.get_api_answer(0)
+    assert seen['timeout'] == homework.API_TIMEOUT
+
+
+def test_engine_stops_polling_dead_upstream(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def mock_get(*args, **kwargs):
+        with lock:
+            calls.append(1)
+        raise requests.ConnectionError('connection refused')
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    registry = TenantRegistry()
+    for number in range(100):
+        registry.add(f'token-{number}', str(number), 0)
+    breaker = CircuitBreaker('engine', failure_threshold=3)
+    engine = PollingEngine(registry, max_workers=4, breaker=breaker)
+    try:
+        stats = engine.poll_once()
+    finally:
+        engine.close()
+    assert stats.failed == 100
+    assert breaker.state == OPEN
+    assert len(calls) < 10
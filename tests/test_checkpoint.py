@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import homework
+from checkpoint import (FileCheckpointStore, NullCheckpointStore,
+                        SqliteCheckpointStore, open_store)
+
+
+@pytest.fixture(params=['state.json', 'state.db'])
+def store(request, tmp_path):
+    store = open_store(str(tmp_path / request.param))
+    yield store
+    store.close()
+
+
+class TestCheckpoint:
+
+    def test_open_store_by_suffix(self, tmp_path):
+        assert isinstance(open_store(None), NullCheckpointStore)
+        assert isinstance(
+            open_store(str(tmp_path / 'a.json')), FileCheckpointStore
+        )
+        sqlite_store = open_store(str(tmp_path / 'a.sqlite'))
+        assert isinstance(sqlite_store, SqliteCheckpointStore)
+        sqlite_store.close()
+
+    def test_roundtrip(self, store):
+        assert store.load() == {}
+        store.save({'timestamp': 1, 'old_message': 'Первое'})
+        store.save({'timestamp': 2, 'old_message': 'Второе'})
+        assert store.load() == {'timestamp': 2, 'old_message': 'Второе'}
+
+    def test_file_store_leaves_no_temp_files(self, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / 'state.json'))
+        for timestamp in range(5):
+            store.save({'timestamp': timestamp})
+        assert os.listdir(tmp_path) == ['state.json']
+
+    def test_corrupted_file_is_ignored(self, tmp_path):
+        path = tmp_path / 'state.json'
+        path.write_text('{"timestamp": ', encoding='utf-8')
+        assert FileCheckpointStore(str(path)).load() == {}
+
+    def test_tracker_resumes_from_checkpoint(self, store,
+                                             data_with_new_hw_status):
+        tracker = homework.StatusTracker.from_store(store)
+        messages = tracker.on_response(data_with_new_hw_status)
+        tracker.delivered()
+
+        restarted = homework.StatusTracker.from_store(store)
+        assert restarted.timestamp == data_with_new_hw_status['current_date']
+        assert restarted.on_response(data_with_new_hw_status) == []
+        assert restarted.old_message == messages[0]
@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+import decoders
+import homework
+from exceptions import ApiError, JsonError
+
+PAYLOAD = '{"homeworks": [{"homework_name": "работа"}], "current_date": 1}'
+
+
+@pytest.fixture(autouse=True)
+def restore_decoder(monkeypatch):
+    monkeypatch.setattr(decoders, 'loads', decoders.loads)
+    monkeypatch.setattr(decoders, 'name', decoders.name)
+
+
+def make_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+@pytest.mark.parametrize('backend', decoders.available())
+def test_backends_decode_raw_bytes(backend):
+    assert decoders.configure(backend) == backend
+    data = homework.decode_response(make_response(PAYLOAD.encode()))
+    assert data['homeworks'][0]['homework_name'] == 'работа'
+
+
+@pytest.mark.parametrize('backend', decoders.available())
+def test_invalid_json_becomes_json_error(monkeypatch, backend):
+    decoders.configure(backend)
+    monkeypatch.setattr(
+        requests, 'get', lambda *args, **kwargs: make_response(b'{"home')
+    )
+    with pytest.raises(JsonError):
+        homework.get_api_answer(0)
+
+
+def test_invalid_endpoint_is_not_json_error(monkeypatch):
+    monkeypatch.setattr(homework, 'ENDPOINT', 'practicum.yandex.ru/api')
+    with pytest.raises(ApiError) as error:
+        homework.get_api_answer(0)
+    assert isinstance(error.value.__cause__, requests.exceptions.MissingSchema)
+
+
+def test_auto_prefers_installed_fast_backend():
+    assert decoders.configure('auto') == decoders.available()[0]
+
+
+def test_missing_backend_falls_back(monkeypatch):
+    def missing():
+        raise ImportError
+
+    monkeypatch.setitem(decoders.BACKENDS, 'ujson', missing)
+    assert decoders.configure('ujson') == 'json'
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        decoders.configure('yaml')
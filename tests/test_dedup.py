@@ -0,0 +1,101 @@
+import homework
+from checkpoint import open_store
+from dedup import DedupStore
+from utils import FakeClock, make_homework
+
+
+class TestDedupStore:
+
+    def test_same_change_is_reported_once(self):
+        store = DedupStore()
+        assert store.add('1', '7', 'approved', '2024-01-01T10:00:00Z')
+        assert not store.add('1', '7', 'approved', '2024-01-01T10:00:00Z')
+        assert store.add('2', '7', 'approved', '2024-01-01T10:00:00Z')
+        assert store.add('1', '7', 'approved', '2024-01-02T10:00:00Z')
+
+    def test_lru_eviction(self):
+        store = DedupStore(max_size=2)
+        store.add('1', 'a', 'approved', 'd')
+        store.add('1', 'b', 'approved', 'd')
+        assert not store.add('1', 'a', 'approved', 'd')
+        store.add('1', 'c', 'approved', 'd')
+        assert len(store) == 2 and store.evicted == 1
+        assert not store.add('1', 'a', 'approved', 'd')
+        assert store.add('1', 'b', 'approved', 'd')
+
+    def test_ttl_expiry(self):
+        clock = FakeClock(1000.0)
+        store = DedupStore(ttl=60, clock=clock)
+        store.add('1', 'a', 'approved', 'd')
+        clock.now += 30
+        store.add('1', 'b', 'approved', 'd')
+        clock.now += 40
+        assert store.add('1', 'a', 'approved', 'd')
+        assert store.expired == 1
+        assert not store.add('1', 'b', 'approved', 'd')
+
+    def test_dump_and_load(self):
+        store = DedupStore()
+        store.add('1', 'a', 'rejected', 'd')
+        restored = DedupStore()
+        restored.load(store.dump())
+        assert len(restored) == 1
+        assert not restored.add('1', 'a', 'rejected', 'd')
+
+    def test_memory_report(self):
+        store = DedupStore()
+        for number in range(1000):
+            store.add('1', str(number), 'approved', f'date-{number}')
+        stats = store.stats()
+        assert stats['entries'] == 1000
+        assert 100 < stats['bytes_per_entry'] < 1000
+
+
+class TestTrackerDeduplication:
+
+    def test_status_flip_is_reported(self):
+        tracker = homework.StatusTracker(0)
+        dates = ('2024-01-01T10:00:00Z', '2024-01-02T10:00:00Z',
+                 '2024-01-03T10:00:00Z')
+        for status, date in zip(('reviewing', 'rejected', 'reviewing'),
+                                dates):
+            response = {
+                'homeworks': [make_homework(1, status, date)],
+                'current_date': 1,
+            }
+            assert len(tracker.on_response(response)) == 1
+            tracker.delivered()
+        assert tracker.on_response(response) == []
+
+    def test_empty_store_is_kept(self):
+        store = DedupStore(max_size=10)
+        assert homework.StatusTracker(0, dedup=store).dedup is store
+
+    def test_error_message_does_not_resend_homework(self):
+        tracker = homework.StatusTracker(0)
+        response = {
+            'homeworks': [make_homework(1, 'approved', '2024-01-01T10:00:00Z')],
+            'current_date': 1,
+        }
+        assert tracker.on_response(response)
+        tracker.delivered()
+        assert tracker.on_error(ValueError('сбой'))
+        assert tracker.on_response(response) == []
+
+    def test_failed_send_is_repeated(self, tmp_path):
+        store = open_store(str(tmp_path / 'state.json'))
+        tracker = homework.StatusTracker(50, store=store)
+        response = {
+            'homeworks': [
+                make_homework(1, 'approved', '2024-01-01T10:00:00Z'),
+            ],
+            'current_date': 100,
+        }
+        assert tracker.on_response(response)
+        tracker.checkpoint()
+        assert tracker.timestamp == 50
+
+        restarted = homework.StatusTracker.from_store(store)
+        assert restarted.timestamp == 50
+        assert restarted.on_response(response)
+        assert tracker.on_response(response)
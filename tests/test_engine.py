@@ -0,0 +1,177 @@
+import threading
+
+import pytest
+import requests
+import telegram
+
+import metrics
+import utils
+from dedup import DedupStore
+from engine import PollingEngine, make_update_handler
+from exceptions import TokenError
+from history import NullHistoryStore
+from shutdown import GracefulShutdown
+from tenants import TenantRegistry
+from test_metrics import sample
+from utils import make_homework
+from webhook import StatusCache
+
+
+class TestTenantRegistry:
+
+    def test_from_lines(self):
+        registry = TenantRegistry.from_lines([
+            '# токен чат',
+            'token-a 111',
+            '',
+            'token-b 222',
+            'token-a 333',
+        ], timestamp=0)
+        assert len(registry) == 2
+        assert registry.get('token-a').chat_id == '333'
+        assert registry.get('token-b').timestamp == 0
+
+    def test_from_lines_invalid(self):
+        with pytest.raises(TokenError):
+            TenantRegistry.from_lines(['token-without-chat'])
+
+
+class TestPollingEngine:
+
+    def test_poll_once_polls_every_tenant(self, monkeypatch,
+                                          random_timestamp):
+        seen = []
+        lock = threading.Lock()
+
+        def mock_get(*args, **kwargs):
+            with lock:
+                seen.append(kwargs['headers']['Authorization'])
+            return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        registry = TenantRegistry()
+        for number in range(50):
+            registry.add(f'token-{number}', str(number), 0)
+        engine = PollingEngine(registry, max_workers=4)
+        try:
+            stats = engine.poll_once()
+        finally:
+            engine.close()
+        assert stats.polled == 50 and stats.failed == 0
+        assert sorted(seen) == sorted(
+            f'OAuth token-{number}' for number in range(50)
+        )
+        assert all(
+            tenant.timestamp == random_timestamp for tenant in registry
+        )
+
+    def test_poll_once_reports_updates_and_errors(self, monkeypatch,
+                                                  random_timestamp,
+                                                  data_with_new_hw_status):
+        def mock_get(*args, **kwargs):
+            if kwargs['headers']['Authorization'] == 'OAuth broken':
+                raise requests.RequestException('Something wrong')
+            return utils.MockResponseGET(data=data_with_new_hw_status)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        registry = TenantRegistry()
+        registry.add('good', '1', 0)
+        registry.add('broken', '2', 0)
+        updates, errors = [], []
+        engine = PollingEngine(
+            registry, max_workers=2,
+            on_update=lambda tenant, hws: updates.append(tenant.chat_id),
+            on_error=lambda tenant, error: errors.append(tenant.chat_id),
+        )
+        try:
+            stats = engine.poll_once()
+        finally:
+            engine.close()
+        assert (stats.polled, stats.updated, stats.failed) == (2, 1, 1)
+        assert updates == ['1'] and errors == ['2']
+        assert registry.get('broken').errors == 1
+
+    def test_poll_once_stops_submitting_after_shutdown(self, monkeypatch,
+                                                       random_timestamp):
+        shutdown = GracefulShutdown()
+
+        def mock_get(*args, **kwargs):
+            shutdown.requested = True
+            return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        registry = TenantRegistry()
+        for number in range(50):
+            registry.add(f'token-{number}', str(number), 0)
+        engine = PollingEngine(registry, max_workers=1)
+        try:
+            stats = engine.poll_once(shutdown)
+        finally:
+            engine.close()
+        assert 1 <= stats.polled <= 3
+
+
+class RecordingBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def test_update_handler_skips_bad_record_only(caplog):
+    bot, dedup = RecordingBot(), DedupStore()
+    on_update = make_update_handler(
+        bot, StatusCache(), dedup, NullHistoryStore()
+    )
+    tenant = TenantRegistry().add('token', '42', 555)
+    delays = sample(metrics.NOTIFICATION_DELAY, '_count')
+    homeworks = [
+        make_homework(1, 'approved', homework_name='a'),
+        make_homework(2, 'unknown', homework_name='b'),
+        make_homework(3, 'rejected', homework_name='c'),
+    ]
+    on_update(tenant, homeworks)
+    text = '\n'.join(message for _, message in bot.sent)
+    assert all(chat_id == '42' for chat_id, _ in bot.sent)
+    assert '"a"' in text and '"c"' in text and '"b"' not in text
+    assert dedup.stats()['entries'] == 2
+    assert sample(metrics.NOTIFICATION_DELAY, '_count') == delays + 2
+    assert 'Ошибка разбора работы' in caplog.text
+
+
+class FailingBot:
+
+    def send_message(self, chat_id, text, **kwargs):
+        raise telegram.error.NetworkError('нет сети')
+
+
+def test_failed_delivery_keeps_tenant_timestamp(monkeypatch,
+                                                data_with_new_hw_status):
+    monkeypatch.setattr(
+        requests, 'get',
+        lambda *args, **kwargs: utils.MockResponseGET(
+            data=data_with_new_hw_status
+        ),
+    )
+    dedup = DedupStore()
+    registry = TenantRegistry()
+    tenant = registry.add('token', '42', 555)
+    engine = PollingEngine(
+        registry, max_workers=1,
+        on_update=make_update_handler(
+            FailingBot(), StatusCache(), dedup, NullHistoryStore()
+        ),
+    )
+    try:
+        engine.poll_once()
+        assert tenant.timestamp == 555 and len(dedup) == 0
+        engine.on_update = make_update_handler(
+            RecordingBot(), StatusCache(), dedup, NullHistoryStore()
+        )
+        engine.poll_once()
+    finally:
+        engine.close()
+    assert tenant.timestamp == data_with_new_hw_status['current_date']
+    assert len(dedup) == 1
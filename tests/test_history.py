@@ -0,0 +1,96 @@
+import sqlite3
+import time
+
+import homework
+from history import HistoryStore
+from models import Homework
+
+HOUR = 3600
+
+
+def make_record(status, hour, name='hw1'):
+    return Homework(
+        None, name, status, '', f'2024-01-01T{hour:02d}:00:00Z'
+    )
+
+
+def stored_rows(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            'SELECT COUNT(*) FROM transitions'
+        ).fetchone()[0]
+
+
+class TestHistoryStore:
+
+    def test_writes_in_batches(self, tmp_path):
+        path = str(tmp_path / 'history.db')
+        store = HistoryStore(path, batch_size=2, flush_interval=60)
+        store.record('1', make_record('reviewing', 10))
+        assert stored_rows(path) == 0
+        store.record('1', make_record('approved', 12))
+        assert stored_rows(path) == 2
+        store.record('1', make_record('approved', 12))
+        store.close()
+        assert stored_rows(path) == 2
+
+    def test_buffer_is_flushed_without_new_records(self, tmp_path):
+        path = str(tmp_path / 'history.db')
+        store = HistoryStore(path, flush_interval=0.05)
+        try:
+            store.record('1', make_record('reviewing', 10))
+            deadline = time.monotonic() + 5
+            while not stored_rows(path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert stored_rows(path) == 1
+        finally:
+            store.close()
+
+    def test_latest_keeps_newest_status(self, tmp_path):
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        store.record('1', make_record('approved', 12))
+        store.record('1', make_record('reviewing', 10))
+        store.record('1', make_record('reviewing', 9, name='hw2'))
+        store.record('2', make_record('rejected', 11))
+        assert store.latest('1') == [
+            ('hw1', 'approved', 1704110400),
+            ('hw2', 'reviewing', 1704099600),
+        ]
+        assert [status for status, _ in store.transitions('1', 'hw1')] == [
+            'reviewing', 'approved',
+        ]
+        store.close()
+
+    def test_review_times(self, tmp_path):
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        for chat, hours in (('1', (8, 10, 12)), ('2', (9, 10, 13))):
+            first, second, approved = hours
+            store.record(chat, make_record('reviewing', first))
+            store.record(chat, make_record('reviewing', second))
+            store.record(chat, make_record('approved', approved))
+        store.record('3', make_record('reviewing', 9))
+        assert store.review_times('1') == [('hw1', 2 * HOUR)]
+        assert store.review_time_stats('hw1') == {
+            'count': 2, 'average': 2.5 * HOUR,
+        }
+        assert len(store) == 7
+        store.close()
+
+
+class TestTrackerHistory:
+
+    def test_new_changes_are_recorded(self, tmp_path):
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        tracker = homework.StatusTracker(0, history=store)
+        response = {
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+                'date_updated': '2024-01-01T12:00:00Z',
+            }],
+            'current_date': 1,
+        }
+        tracker.on_response(response)
+        tracker.on_response(response)
+        tracker.checkpoint()
+        tracker.close()
+        assert stored_rows(str(tmp_path / 'history.db')) == 1
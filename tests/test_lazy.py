@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+from lazy import is_loaded, lazy_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_HOMEWORK = '''
+import logging, os, sys
+import homework
+from lazy import is_loaded
+print(sorted(name for name in ('telegram', 'requests', 'http.server')
+             if name in sys.modules and is_loaded(name)))
+print(os.path.exists('logger.log'), logging.getLogger().handlers)
+'''
+
+
+def run(code, tmp_path):
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+    env.pop('LOG_FILE', None)
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=tmp_path, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout.splitlines()
+
+
+class TestLazyImport:
+
+    def test_module_is_loaded_on_first_attribute(self, tmp_path):
+        code = (
+            'import sys\n'
+            'from lazy import is_loaded, lazy_import\n'
+            'colorsys = lazy_import("colorsys")\n'
+            'print(is_loaded("colorsys"))\n'
+            'colorsys.rgb_to_hsv\n'
+            'import colorsys as imported\n'
+            'print(is_loaded("colorsys"), imported is colorsys)\n'
+        )
+        assert run(code, tmp_path) == ['False', 'True True']
+
+    def test_already_imported_module_is_returned(self):
+        assert lazy_import('os') is os
+        assert is_loaded('os')
+
+    def test_importing_homework_has_no_side_effects(self, tmp_path):
+        loaded, logging_state = run(IMPORT_HOMEWORK, tmp_path)
+        assert loaded == '[]'
+        assert logging_state == 'False []'
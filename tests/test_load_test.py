@@ -0,0 +1,77 @@
+import inspect
+
+import pytest
+import telegram
+
+import homework
+from benchmarks import load_test
+from benchmarks.stub_server import PracticumStub, TelegramStub
+from exceptions import HttpError, JsonError
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    def use(stub):
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.endpoint)
+    return use
+
+
+class TestFaultInjection:
+
+    @pytest.mark.parametrize('rates, error, status', [
+        ({'error_rate': 1.0}, HttpError, 500),
+        ({'throttle_rate': 1.0}, HttpError, 429),
+        ({'malformed_rate': 1.0}, JsonError, None),
+    ])
+    def test_practicum_faults(self, endpoint, rates, error, status):
+        with PracticumStub(seed=1, **rates) as stub:
+            endpoint(stub)
+            with pytest.raises(error) as raised:
+                homework.get_api_answer(0)
+        if status is not None:
+            assert raised.value.status_code == status
+        assert sum(stub.outcomes.values()) == 1
+
+    def test_changes_are_counted(self, endpoint):
+        with PracticumStub(change_rate=1.0, seed=1) as stub:
+            endpoint(stub)
+            statuses = [
+                homework.get_api_answer(0)['homeworks'][0]['status']
+                for _ in range(3)
+            ]
+        assert statuses == ['reviewing', 'approved', 'reviewing']
+        assert stub.changes == 3
+
+    def test_telegram_throttle(self):
+        with TelegramStub(throttle_rate=1.0, seed=1) as stub:
+            bot = telegram.Bot('123:test', base_url=stub.bot_url)
+            assert not homework.deliver_message(bot, 1, 'текст')
+        assert stub.messages == []
+
+
+class TestLoadTest:
+
+    def test_main_without_mismatches(self, monkeypatch):
+        # test_bot оборачивает main() таймаутом на SIGALRM, а здесь
+        # main() работает не в главном потоке.
+        monkeypatch.setattr(homework, 'main', inspect.unwrap(homework.main))
+        report = load_test.run(load_test.parse_args([
+            '--duration', '0.5', '--settle', '5',
+        ]))
+        assert report['requests'] > 0
+        assert load_test.check(report) == []
+
+    def test_engine_without_mismatches(self):
+        report = load_test.run(load_test.parse_args([
+            '--duration', '0.5', '--tenants', '20', '--workers', '4',
+            '--settle', '5',
+        ]))
+        assert report['changes'] > 0
+        assert load_test.check(report) == []
+
+    def test_check_reports_lost_notifications(self):
+        report = {
+            'served': {'ok': 2}, 'observed': {'ok': 2},
+            'changes': 3, 'delivered': 2,
+        }
+        assert len(load_test.check(report)) == 1
@@ -0,0 +1,58 @@
+import io
+import json
+import logging
+
+from log_config import SamplingFilter, setup_logging, shutdown_logging
+
+
+def make_record(message, level=logging.DEBUG):
+    return logging.LogRecord('homework', level, __file__, 1, message,
+                             None, None)
+
+
+class TestLogConfig:
+
+    def test_sampling_filter_keeps_one_of_every(self):
+        sampler = SamplingFilter(every=10)
+        passed = [
+            sampler.filter(make_record('Нет изменений в статусе работы'))
+            for _ in range(25)
+        ]
+        assert sum(passed) == 3
+        assert sampler.filter(make_record('Сообщение успешно отправлено!'))
+        assert sampler.filter(make_record(
+            'Нет изменений в статусе работы', logging.ERROR
+        ))
+
+    def test_queue_mode_writes_json_lines(self, tmp_path):
+        filename = tmp_path / 'logger.log'
+        setup_logging('queue', str(filename), sample_every=100,
+                      stream=io.StringIO())
+        logger = logging.getLogger('homework')
+        for _ in range(150):
+            logger.debug('Нет изменений в статусе работы')
+        logger.error('Сбой в работе программы: %s', 'тест')
+        shutdown_logging()
+        lines = [
+            json.loads(line)
+            for line in filename.read_text(encoding='utf-8').splitlines()
+        ]
+        assert [line['message'] for line in lines] == [
+            'Нет изменений в статусе работы',
+            'Нет изменений в статусе работы',
+            'Сбой в работе программы: тест',
+        ]
+        assert lines[1]['sampled'] == 100
+        assert lines[2]['level'] == 'ERROR'
+
+    def test_queue_mode_rotates_by_size(self, tmp_path):
+        filename = tmp_path / 'logger.log'
+        setup_logging('queue', str(filename), max_bytes=500, backup_count=2,
+                      stream=io.StringIO())
+        logger = logging.getLogger('homework')
+        for number in range(50):
+            logger.info('Запись номер %d', number)
+        shutdown_logging()
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert files == ['logger.log', 'logger.log.1', 'logger.log.2']
+        assert filename.stat().st_size <= 500
@@ -0,0 +1,85 @@
+import urllib.request
+
+import requests
+
+import homework
+import metrics
+import utils
+from exceptions import HomeworkStatusError
+
+
+def sample(metric, suffix='_total', labels=''):
+    prefix = f'{metric.name}{suffix}{labels} '
+    for line in metric.collect():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+class TestMetrics:
+
+    def test_histogram_exposition(self):
+        registry = metrics.Registry()
+        histogram = metrics.Histogram('test_seconds', 'Тест.',
+                                      buckets=(1, 5), registry=registry)
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        text = registry.render()
+        assert '# TYPE test_seconds histogram' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="5"} 3' in text
+        assert 'test_seconds_bucket{le="+Inf"} 4' in text
+        assert 'test_seconds_sum 14.5' in text
+        assert 'test_seconds_count 4' in text
+
+    def test_counter_labels_are_escaped(self):
+        registry = metrics.Registry()
+        counter = metrics.Counter('test', 'Тест.', ['error'],
+                                  registry=registry)
+        counter.labels('a"b').inc(2)
+        assert 'test_total{error="a\\"b"} 2' in registry.render()
+
+    def test_api_responses_are_counted(self, monkeypatch, random_timestamp):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=random_timestamp
+            )
+        )
+        before = sample(metrics.API_RESPONSES, labels='{code="200"}')
+        homework.get_api_answer(0)
+        assert sample(
+            metrics.API_RESPONSES, labels='{code="200"}'
+        ) == before + 1
+
+    def test_errors_and_notification_delay(self):
+        labels = '{error="HomeworkStatusError"}'
+        errors_before = sample(metrics.ERRORS, labels=labels)
+        delays_before = sample(metrics.NOTIFICATION_DELAY, '_count')
+        tracker = homework.StatusTracker(0)
+        tracker.on_error(HomeworkStatusError('Отсутстует ключ'))
+        tracker.on_response({
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+                'date_updated': '2020-02-13T14:40:57Z',
+            }],
+            'current_date': 1,
+        })
+        tracker.delivered()
+        assert sample(metrics.ERRORS, labels=labels) == errors_before + 1
+        assert sample(
+            metrics.NOTIFICATION_DELAY, '_count'
+        ) == delays_before + 1
+
+    def test_http_exporter(self):
+        server = metrics.start_http_server(0, addr='127.0.0.1')
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics'
+            ) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert '# TYPE homework_api_request_seconds histogram' in body
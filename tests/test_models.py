@@ -0,0 +1,68 @@
+import pytest
+
+import homework
+from exceptions import CurrentDateError, HomeworkStatusError
+from models import Homework, parse_homework, validate_response
+
+
+class TestValidateResponse:
+
+    def test_valid(self):
+        homeworks, current_date = validate_response(
+            {'homeworks': [], 'current_date': 10}
+        )
+        assert homeworks == [] and current_date == 10
+
+    @pytest.mark.parametrize('data, error', [
+        ([], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': []}, CurrentDateError),
+        ({'homeworks': {}, 'current_date': 1}, TypeError),
+        ({'homeworks': [], 'current_date': '1'}, CurrentDateError),
+    ])
+    def test_invalid(self, data, error):
+        with pytest.raises(error):
+            validate_response(data)
+
+
+class TestHomework:
+
+    def test_from_dict(self):
+        record = Homework.from_dict({
+            'id': 7,
+            'homework_name': 'hw.zip',
+            'status': 'approved',
+            'date_updated': '1970-01-01T00:01:00Z',
+        }, homework.HOMEWORK_VERDICTS)
+        assert record.key == '7'
+        assert record.updated == 60
+        assert homework.parse_status(record) == homework.parse_status(
+            dict(homework_name='hw.zip', status='approved')
+        )
+        assert not hasattr(record, '__dict__')
+
+    def test_fields_match_model(self):
+        data = {
+            'id': 7, 'homework_name': 'hw.zip', 'status': 'rejected',
+            'reviewer_comment': 'Поправь тесты',
+        }
+        fields = parse_homework(data, homework.HOMEWORK_VERDICTS)
+        record = Homework.from_dict(data, homework.HOMEWORK_VERDICTS)
+        assert type(fields) is tuple and fields == record
+        assert homework.parse_status(fields) == homework.parse_status(record)
+
+    def test_key_falls_back_to_name(self):
+        record = Homework.from_dict(
+            {'homework_name': 'hw.zip', 'status': 'reviewing'},
+            homework.HOMEWORK_VERDICTS,
+        )
+        assert record.key == 'hw.zip' and record.updated is None
+
+    @pytest.mark.parametrize('data, error', [
+        ({'status': 'approved'}, KeyError),
+        ({'homework_name': 'hw'}, HomeworkStatusError),
+        ({'homework_name': 'hw', 'status': 'unknown'}, ValueError),
+    ])
+    def test_invalid(self, data, error):
+        with pytest.raises(error):
+            Homework.from_dict(data, homework.HOMEWORK_VERDICTS)
@@ -0,0 +1,91 @@
+import threading
+
+import telegram
+
+from outbox import Outbox, TokenBucket
+from utils import FakeClock
+
+
+class RecordingBot:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.release.wait()
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+
+
+class TestTokenBucket:
+
+    def test_bucket_refills_with_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=1, clock=clock)
+        assert bucket.consume()
+        assert not bucket.consume()
+        assert bucket.delay() == 0.5
+        clock.now = 0.5
+        assert bucket.consume()
+
+
+class TestOutbox:
+
+    def test_messages_for_one_chat_are_merged(self):
+        bot = RecordingBot()
+        bot.release.clear()
+        outbox = Outbox(bot, per_chat_rate=100, global_rate=100).start()
+        outbox.send_message(1, 'первое')
+        outbox.send_message(1, 'второе')
+        outbox.send_message(1, 'третье')
+        outbox.send_message(2, 'другой чат')
+        bot.release.set()
+        assert outbox.close(timeout=5)
+        texts = [text for chat_id, text in bot.sent if chat_id == 1]
+        assert '\n\n'.join(texts) == 'первое\n\nвторое\n\nтретье'
+        stats = outbox.stats()
+        assert stats['delivered'] == 4 and stats['queued'] == 0
+        assert stats['merged'] == 4 - stats['sent']
+
+    def test_retry_after_is_honoured(self):
+        bot = RecordingBot([telegram.error.RetryAfter(0.05)])
+        outbox = Outbox(bot, per_chat_rate=100, global_rate=100).start()
+        outbox.send_message(1, 'текст')
+        assert outbox.close(timeout=5)
+        assert bot.sent == [(1, 'текст')]
+        assert outbox.stats()['retried'] == 1
+
+    def test_permanent_error_drops_message(self):
+        bot = RecordingBot([telegram.error.BadRequest('Chat not found')])
+        outbox = Outbox(bot, per_chat_rate=100, global_rate=100).start()
+        outbox.send_message(1, 'текст')
+        assert outbox.close(timeout=5)
+        assert bot.sent == []
+        assert outbox.stats()['failed'] == 1
+
+    def test_long_text_is_split(self):
+        bot = RecordingBot()
+        outbox = Outbox(bot, per_chat_rate=100, global_rate=100,
+                        limit=10).start()
+        outbox.send_message(1, 'x' * 25)
+        assert outbox.close(timeout=5)
+        assert ''.join(text for _, text in bot.sent).replace(
+            '\n\n', ''
+        ) == 'x' * 25
+        assert all(len(text) <= 10 for _, text in bot.sent)
+
+    def test_confirm_reports_dropped_and_pending_messages(self):
+        bot = RecordingBot([telegram.error.BadRequest('Chat not found')])
+        outbox = Outbox(bot, per_chat_rate=100, global_rate=100).start()
+        outbox.send_message(1, 'потеряно')
+        assert not outbox.confirm(timeout=5)
+        outbox.send_message(1, 'доставлено')
+        assert outbox.confirm(timeout=5)
+        bot.release.clear()
+        outbox.send_message(1, 'в очереди')
+        assert not outbox.confirm(timeout=0.05)
+        bot.release.set()
+        assert outbox.close(timeout=5)
@@ -0,0 +1,83 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+import homework
+import practicum
+from async_bot import Reply
+from benchmarks.stub_server import PracticumStub
+from exceptions import HttpError
+
+
+@pytest.fixture
+def stub(monkeypatch, request):
+    with PracticumStub(etag=getattr(request, 'param', False)) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+        yield server
+    practicum.reset()
+
+
+class TestPracticumSession:
+
+    def test_get_api_answer_reuses_connections(self, stub):
+        session = practicum.configure(pool_size=2)
+        for _ in range(20):
+            result = homework.get_api_answer(0)
+            assert result['homeworks'] == []
+        stats = session.stats()
+        assert stats['requests'] == 20
+        assert stats['connections'] == 1
+        assert stats['reused'] == 19
+
+    def test_reset_falls_back_to_requests_get(self, stub):
+        practicum.configure()
+        practicum.reset()
+        assert practicum.shared_session() is None
+        assert homework.get_api_answer(0)['homeworks'] == []
+        assert stub.requests == 1
+
+
+class TestResponseCache:
+
+    def test_fingerprint_ignores_current_date(self):
+        first = practicum.fingerprint(b'{"homeworks": [], "current_date": 1}')
+        second = practicum.fingerprint(b'{"homeworks": [], "current_date": 2}')
+        assert first[0] == second[0]
+        assert (first[1], second[1]) == (1, 2)
+
+    def test_identical_bodies_skip_decoding(self, stub, monkeypatch):
+        cache = practicum.configure_cache()
+        decoded = []
+        original = homework.decode_response
+
+        def counting_decode(response):
+            decoded.append(response)
+            return original(response)
+
+        monkeypatch.setattr(homework, 'decode_response', counting_decode)
+        results = [homework.get_api_answer(0) for _ in range(5)]
+        assert len(decoded) == 1
+        assert all(result['homeworks'] == [] for result in results)
+        assert all(isinstance(result['current_date'], int)
+                   for result in results)
+        stats = cache.stats()
+        assert stats['hash_hits'] == 4 and stats['hit_ratio'] == 0.8
+
+    @pytest.mark.parametrize('stub', [True], indirect=True)
+    def test_etag_turns_into_not_modified(self, stub, monkeypatch):
+        cache = practicum.configure_cache()
+        first = homework.get_api_answer(0)
+        later = first['current_date'] + 600
+        monkeypatch.setattr(time, 'time', lambda: later)
+        second = homework.get_api_answer(0)
+        assert first['homeworks'] == second['homeworks']
+        assert second['current_date'] == later
+        assert cache.stats()['not_modified'] == 1
+
+    def test_not_modified_without_entry_is_error(self):
+        cache = practicum.ResponseCache()
+        response = Reply(HTTPStatus.NOT_MODIFIED, b'', {})
+        with pytest.raises(HttpError):
+            cache.fetch('token', response, homework.decode_response)
+        assert cache.stats()['entries'] == 0
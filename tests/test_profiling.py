@@ -0,0 +1,74 @@
+import logging
+import os
+import signal
+import time
+
+import pytest
+
+import metrics
+import profiling
+from test_metrics import sample
+
+
+def busy_loop(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(100))
+
+
+@pytest.fixture
+def spans():
+    profiling.enable_spans()
+    yield
+    profiling.enable_spans(False)
+
+
+class TestSpans:
+
+    def test_disabled_span_is_shared_noop(self):
+        assert profiling.span('api') is profiling.span('send')
+
+    def test_enabled_span_is_measured(self, spans, caplog):
+        before = sample(metrics.PHASE_SECONDS, '_count', '{phase="check"}')
+        with profiling.span('check'):
+            time.sleep(0.01)
+        after = sample(metrics.PHASE_SECONDS, '_count', '{phase="check"}')
+        assert after == before + 1
+        with caplog.at_level(logging.DEBUG, logger='profiling'):
+            profiling.report()
+        assert 'check' in caplog.text
+        caplog.clear()
+        with caplog.at_level(logging.DEBUG, logger='profiling'):
+            profiling.report()
+        assert not caplog.text
+
+
+class TestStackSampler:
+
+    def test_writes_collapsed_stacks(self, tmp_path):
+        path = tmp_path / 'profile.folded'
+        sampler = profiling.StackSampler(str(path), interval=0.005).start()
+        busy_loop(0.2)
+        sampler.stop()
+        lines = path.read_text().splitlines()
+        assert sampler.samples > 0
+        stack, count = lines[0].rsplit(' ', 1)
+        assert int(count) > 0
+        assert any(
+            line.startswith('MainThread;') and 'busy_loop' in line
+            for line in lines
+        )
+
+    def test_signal_toggles_profiler(self, tmp_path):
+        path = str(tmp_path / 'profile-{pid}.folded')
+        previous = signal.getsignal(profiling.TOGGLE_SIGNAL)
+        profiling.configure(path=path, interval=0.005)
+        try:
+            os.kill(os.getpid(), profiling.TOGGLE_SIGNAL)
+            busy_loop(0.1)
+            os.kill(os.getpid(), profiling.TOGGLE_SIGNAL)
+        finally:
+            signal.signal(profiling.TOGGLE_SIGNAL, previous)
+            profiling.stop_profiler()
+        written = tmp_path / f'profile-{os.getpid()}.folded'
+        assert 'busy_loop' in written.read_text()
@@ -0,0 +1,80 @@
+import pytest
+import requests
+
+import homework
+import ratelimit
+from breaker import is_failure
+from exceptions import TooManyRequestsError
+from ratelimit import MemoryState, RateLimiter, SqliteState, parse_retry_after
+from utils import FakeClock
+
+
+class ThrottledResponse:
+    status_code = 429
+    headers = {'Retry-After': '30'}
+
+
+@pytest.fixture
+def shared_limiter():
+    clock = FakeClock(1000.0)
+    limiter = ratelimit.configure(10)
+    limiter.state.clock = clock
+    yield limiter
+    ratelimit.reset()
+
+
+class TestRateLimiter:
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120') == 120
+        assert parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470
+        ) == 10
+        assert parse_retry_after('скоро') is None
+        assert parse_retry_after(None) is None
+
+    def test_requests_are_spread_evenly(self):
+        limiter = RateLimiter(10, state=MemoryState(FakeClock(1000.0)))
+        waits = [limiter.reserve() for _ in range(4)]
+        assert waits == pytest.approx([0, 0.1, 0.2, 0.3])
+
+    def test_burst_after_idle(self):
+        clock = FakeClock(1000.0)
+        limiter = RateLimiter(10, burst=3, state=MemoryState(clock))
+        waits = [limiter.reserve() for _ in range(4)]
+        assert waits == pytest.approx([0, 0, 0, 0.1])
+        clock.now += 10
+        assert limiter.reserve() == 0
+
+    def test_block_pauses_requests(self):
+        clock = FakeClock(1000.0)
+        limiter = RateLimiter(10, burst=5, state=MemoryState(clock))
+        limiter.block(30)
+        assert limiter.reserve() == pytest.approx(30)
+
+    def test_sqlite_state_is_shared(self, tmp_path):
+        clock = FakeClock(1000.0)
+        path = str(tmp_path / 'ratelimit.db')
+        first = RateLimiter(10, state=SqliteState(path, clock=clock))
+        second = RateLimiter(10, state=SqliteState(path, clock=clock))
+        waits = [limiter.reserve() for limiter in (first, second, first)]
+        assert waits == pytest.approx([0, 0.1, 0.2])
+        second.block(60)
+        assert first.reserve() == pytest.approx(60)
+        first.close()
+        second.close()
+
+
+class TestThrottledResponse:
+
+    def test_429_has_own_error_and_blocks_limiter(self, monkeypatch,
+                                                  shared_limiter):
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: ThrottledResponse()
+        )
+        with pytest.raises(TooManyRequestsError) as error:
+            homework.get_api_answer(0)
+        assert error.value.status_code == 429
+        assert error.value.retry_after == 30
+        assert is_failure(error.value)
+        assert shared_limiter.reserve() == pytest.approx(30, abs=0.2)
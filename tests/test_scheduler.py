@@ -0,0 +1,83 @@
+import pytest
+
+from exceptions import (ApiError, CurrentDateError, HttpError,
+                        TooManyRequestsError)
+from scheduler import AdaptiveSchedule, FixedSchedule, make_schedule
+from utils import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def schedule(clock):
+    return AdaptiveSchedule(600, jitter=0, clock=clock)
+
+
+class TestSchedule:
+
+    def test_fixed_schedule_ignores_activity(self):
+        schedule = make_schedule(600)
+        assert isinstance(schedule, FixedSchedule)
+        schedule.observe([{'status': 'reviewing'}])
+        schedule.observe_error(ApiError('Ошибка подключения к API'))
+        assert schedule.next_delay() == 600
+
+    @pytest.mark.parametrize('adaptive', [False, True])
+    def test_retry_after_is_honoured(self, adaptive):
+        schedule = make_schedule(600, adaptive)
+        schedule.observe_error(TooManyRequestsError(retry_after=900))
+        assert schedule.next_delay() >= 900
+        schedule.observe([])
+        assert schedule.next_delay() == 600
+
+    def test_reviewing_polls_faster_within_window(self, schedule, clock):
+        schedule.observe([{'status': 'reviewing'}])
+        assert schedule.next_delay() == schedule.review_period
+        clock.now = schedule.review_window + 1
+        assert schedule.next_delay() == 600
+
+    def test_verdict_ends_review_window(self, schedule):
+        schedule.observe([{'status': 'reviewing'}])
+        schedule.observe([{'status': 'approved'}])
+        assert schedule.next_delay() == 600
+
+    def test_errors_back_off_exponentially(self, schedule):
+        delays = []
+        for _ in range(8):
+            schedule.observe_error(HttpError('Код ответа != 200.'))
+            delays.append(schedule.next_delay())
+        assert delays[:3] == [600, 1200, 2400]
+        assert delays[-1] == schedule.max_period
+        schedule.observe([])
+        assert schedule.next_delay() == 600
+
+    def test_back_off_is_multiple_of_period(self, clock):
+        schedule = AdaptiveSchedule(10, jitter=0, clock=clock)
+        delays = []
+        for _ in range(3):
+            schedule.observe_error(ApiError('Ошибка подключения к API'))
+            delays.append(schedule.next_delay())
+        assert delays == [10, 20, 40]
+
+    def test_other_errors_do_not_back_off(self, schedule):
+        schedule.observe_error(CurrentDateError('Нет current_date'))
+        assert schedule.next_delay() == 600
+
+    def test_quiet_stretch_slows_down(self, schedule):
+        for _ in range(schedule.quiet_after):
+            schedule.observe([])
+        assert schedule.next_delay() == 600
+        for _ in range(10):
+            schedule.observe([])
+        assert schedule.next_delay() == schedule.quiet_period
+        schedule.observe([{'status': 'rejected'}])
+        assert schedule.next_delay() == 600
+
+    def test_jitter_stays_within_bounds(self, clock):
+        schedule = AdaptiveSchedule(600, jitter=0.1, clock=clock)
+        schedule.observe_error(ApiError('Ошибка подключения к API'))
+        for _ in range(100):
+            assert 540 <= schedule.next_delay() <= 660
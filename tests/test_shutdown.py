@@ -0,0 +1,146 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.stub_server import PracticumStub, TelegramStub
+from exceptions import ShutdownRequest
+from shutdown import GracefulShutdown
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_BOT = '''
+import functools, sys
+import telegram
+import homework
+homework.ENDPOINT = sys.argv[1]
+telegram.Bot = functools.partial(telegram.Bot, base_url=sys.argv[2])
+homework.main()
+'''
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'не дождались'
+        time.sleep(0.02)
+
+
+def start_bot(practicum, telegram, tmp_path, **env):
+    env = {
+        **os.environ,
+        'PRACTICUM_TOKEN': 'token',
+        'TELEGRAM_TOKEN': '123:token',
+        'TELEGRAM_CHAT_ID': '1',
+        'CHECKPOINT_PATH': str(tmp_path / 'state.json'),
+        'LOG_FILE': str(tmp_path / 'bot.log'),
+        **env,
+    }
+    return subprocess.Popen(
+        [sys.executable, '-c', RUN_BOT, practicum.endpoint, telegram.bot_url],
+        cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+
+
+def stop_bot(process, signum=signal.SIGTERM):
+    process.send_signal(signum)
+    started = time.monotonic()
+    try:
+        _, stderr = process.communicate(timeout=10)
+    finally:
+        process.kill()
+    return process.returncode, time.monotonic() - started, stderr.decode()
+
+
+class TestGracefulShutdown:
+
+    def test_signal_interrupts_only_interruptible_section(self):
+        shutdown = GracefulShutdown(signals=(signal.SIGUSR1,)).install()
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert shutdown.requested
+            with pytest.raises(ShutdownRequest):
+                with shutdown.interruptible():
+                    pass
+        finally:
+            shutdown.restore()
+        assert signal.getsignal(signal.SIGUSR1) == signal.SIG_DFL
+
+    def test_duplicate_signal_is_ignored(self):
+        shutdown = GracefulShutdown(signals=(signal.SIGUSR1,)).install()
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert shutdown.requested
+        finally:
+            shutdown.restore()
+
+    def test_signal_during_check_interrupts(self):
+        class SignalOnCheck(GracefulShutdown):
+            checked = False
+
+            @property
+            def requested(self):
+                value = self._flag
+                if not self.checked:
+                    self.checked = True
+                    os.kill(os.getpid(), signal.SIGUSR1)
+                return value
+
+            @requested.setter
+            def requested(self, value):
+                self._flag = value
+
+        shutdown = SignalOnCheck(signals=(signal.SIGUSR1,)).install()
+        try:
+            with pytest.raises(ShutdownRequest):
+                with shutdown.interruptible():
+                    pass
+        finally:
+            shutdown.restore()
+
+
+class TestMain:
+
+    @pytest.mark.parametrize('signum', [signal.SIGTERM, signal.SIGINT])
+    def test_signal_interrupts_sleep(self, tmp_path, signum):
+        with PracticumStub() as practicum, TelegramStub() as telegram:
+            process = start_bot(practicum, telegram, tmp_path)
+            wait_for(lambda: practicum.requests and telegram.messages)
+            time.sleep(0.2)
+            code, elapsed, stderr = stop_bot(process, signum)
+        assert code == 0, stderr
+        assert elapsed < 2
+        state = json.loads((tmp_path / 'state.json').read_text())
+        assert state['old_message'] == 'Нет изменений в статусе работы'
+
+    @pytest.mark.parametrize('outbox', ['', '1'])
+    def test_in_flight_message_is_delivered(self, tmp_path, outbox):
+        with PracticumStub(change_rate=1.0) as practicum, \
+                TelegramStub(latency=0.5) as telegram:
+            process = start_bot(
+                practicum, telegram, tmp_path, TELEGRAM_OUTBOX=outbox
+            )
+            wait_for(lambda: telegram.requests)
+            assert not telegram.messages
+            code, elapsed, stderr = stop_bot(process)
+            assert code == 0, stderr
+            assert elapsed < 2
+            assert len(telegram.messages) == 1
+        assert 'Изменился статус' in telegram.messages[0]['text']
+        state = json.loads((tmp_path / 'state.json').read_text())
+        assert len(state['seen']) == 1
+
+    def test_signal_interrupts_slow_api_request(self, tmp_path):
+        with PracticumStub(latency=5) as practicum, \
+                TelegramStub() as telegram:
+            process = start_bot(practicum, telegram, tmp_path)
+            wait_for(lambda: practicum.requests)
+            code, elapsed, stderr = stop_bot(process)
+        assert code == 0, stderr
+        assert elapsed < 2
+        assert not telegram.messages
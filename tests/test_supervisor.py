@@ -0,0 +1,94 @@
+import os
+import time
+
+import engine
+import homework
+from outbox import GLOBAL_RATE, PER_CHAT_RATE
+from supervisor import (HashRing, Supervisor, run_worker, select_shard,
+                        worker_log_file)
+from tenants import TenantRegistry
+
+KEYS = [f'token-{number}' for number in range(5000)]
+
+
+def crash_once(marker, slot, count):
+    marker = f'{marker}-{slot}'
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        raise SystemExit(3)
+    time.sleep(30)
+
+
+class TestHashRing:
+
+    def test_adding_node_moves_only_its_share(self):
+        ring = HashRing(range(4))
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.add(4)
+        moved = [key for key in KEYS if ring.node_for(key) != before[key]]
+        assert all(ring.node_for(key) == 4 for key in moved)
+        assert 0.1 < len(moved) / len(KEYS) < 0.3
+
+    def test_removing_node_keeps_other_keys(self):
+        ring = HashRing(range(4))
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.remove(2)
+        assert len(ring) == 3
+        for key in KEYS:
+            if before[key] != 2:
+                assert ring.node_for(key) == before[key]
+
+    def test_shards_cover_registry(self):
+        ring = HashRing(range(3))
+        shards = []
+        for node in range(3):
+            registry = TenantRegistry()
+            for key in KEYS[:300]:
+                registry.add(key, '1', 0)
+            select_shard(registry, ring, node)
+            shards.append({tenant.token for tenant in registry})
+        assert sum(map(len, shards)) == 300
+        assert set().union(*shards) == set(KEYS[:300])
+        assert all(60 < len(shard) < 140 for shard in shards)
+
+
+def test_workers_log_to_own_files():
+    assert worker_log_file('logger.log', 0) == 'logger.worker-0.log'
+    assert worker_log_file('/var/log/bot', 3) == '/var/log/bot.worker-3'
+
+
+def test_workers_share_telegram_limits(monkeypatch):
+    shares = []
+    for name in ('METRICS_PORT', 'WEBHOOK_PORT'):
+        monkeypatch.setattr(homework, name, 0)
+    monkeypatch.setattr(homework, 'configure_logging', lambda: None)
+    monkeypatch.setattr(homework, 'configure_runtime', lambda: None)
+    monkeypatch.setattr(
+        engine, 'run_tenants',
+        lambda path, shard, share: shares.append(share),
+    )
+    run_worker('tenants.txt', 1, 4)
+    outbox = engine.make_outbox(object(), shares[0])
+    assert outbox.global_bucket.rate == GLOBAL_RATE / 4
+    assert outbox.per_chat_rate == PER_CHAT_RATE / 4
+
+
+class TestSupervisor:
+
+    def test_crashed_worker_is_restarted(self, tmp_path):
+        supervisor = Supervisor(
+            crash_once, 2, args=(str(tmp_path / 'marker'),),
+            restart_delay=0.05,
+        ).start()
+        try:
+            deadline = time.monotonic() + 30
+            while supervisor.restarts < 2:
+                assert time.monotonic() < deadline, 'нет перезапуска'
+                supervisor.check(0.1)
+            assert all(
+                process.is_alive()
+                for process in supervisor.processes.values()
+            )
+        finally:
+            supervisor.stop(timeout=5)
+        assert not supervisor.processes
@@ -0,0 +1,91 @@
+import pytest
+
+import homework
+import templates
+from exceptions import TokenError
+from models import Homework
+from tenants import TenantRegistry
+
+
+@pytest.fixture(autouse=True)
+def restore_templates():
+    yield
+    templates.configure()
+
+
+def make_record(name='hw_1.zip', status='rejected', comment=''):
+    return Homework.from_dict({
+        'id': 1, 'homework_name': name, 'status': status,
+        'reviewer_comment': comment,
+    }, homework.HOMEWORK_VERDICTS)
+
+
+@pytest.mark.parametrize('status', list(homework.HOMEWORK_VERDICTS))
+def test_default_text_is_unchanged(status):
+    record = make_record('a_b <{x}>.zip', status, 'есть замечания')
+    assert homework.parse_status(record) == (
+        f'Изменился статус проверки работы "{record.name}". '
+        f'{homework.HOMEWORK_VERDICTS[status]}'
+    )
+
+
+@pytest.mark.parametrize('mode, expected', [
+    ('HTML', 'Изменился статус проверки работы "<b>a_b &lt;{x}&gt;</b>". '
+             'Работа проверена: у ревьюера есть замечания.'),
+    ('Markdown', 'Изменился статус проверки работы "*a\\_b <{x}>*". '
+                 'Работа проверена: у ревьюера есть замечания.'),
+    ('MarkdownV2', 'Изменился статус проверки работы "*a\\_b <\\{x\\}\\>*"'
+                   '\\. Работа проверена: у ревьюера есть замечания\\.'),
+])
+def test_parse_modes_escape_text(mode, expected):
+    templates.configure(mode=mode)
+    assert templates.render(make_record('a_b <{x}>')) == expected
+
+
+def test_locale_and_comment():
+    templates.configure(with_comments=True)
+    record = make_record(status='approved', comment='Отлично!')
+    assert templates.render(record, 'en') == (
+        'Review status of "hw_1.zip" has changed. '
+        'Reviewed: the reviewer liked everything. Hooray!\n'
+        'Reviewer comment: Отлично!'
+    )
+    assert templates.render(make_record()).endswith('замечания.')
+
+
+def test_custom_template_and_cache_reset():
+    record = make_record()
+    before = templates.render(record)
+    templates.configure(template='{status}: {name}')
+    assert templates.render(record) == 'rejected: hw_1.zip'
+    templates.configure()
+    assert templates.render(record) == before
+
+
+@pytest.mark.parametrize('options', [
+    {'code': 'de'}, {'mode': 'BBCode'}, {'template': '{name} {comment}'},
+])
+def test_invalid_configuration(options):
+    with pytest.raises(ValueError):
+        templates.configure(**options)
+
+
+def test_deliver_message_passes_parse_mode():
+    class Bot:
+        def send_message(self, chat_id, text, **kwargs):
+            self.kwargs = kwargs
+
+    bot = Bot()
+    homework.deliver_message(bot, 1, 'текст')
+    assert bot.kwargs == {}
+    templates.configure(mode='HTML')
+    homework.deliver_message(bot, 1, 'текст')
+    assert bot.kwargs == {'parse_mode': 'HTML'}
+
+
+def test_tenant_locale_column():
+    registry = TenantRegistry.from_lines(['token-a 1 en', 'token-b 2'])
+    assert registry.get('token-a').locale == 'en'
+    assert registry.get('token-b').locale is None
+    with pytest.raises(TokenError):
+        TenantRegistry.from_lines(['token-a 1 xx'])
@@ -0,0 +1,69 @@
+import homework
+from utils import make_homework
+
+
+class TestStatusTracker:
+
+    def test_all_homeworks_are_reported_in_order(self):
+        tracker = homework.StatusTracker(0)
+        response = {
+            'homeworks': [
+                make_homework(2, 'approved', '2024-01-02T10:00:00Z'),
+                make_homework(1, 'rejected', '2024-01-01T10:00:00Z'),
+            ],
+            'current_date': 100,
+        }
+        messages = tracker.on_response(response)
+        assert len(messages) == 1
+        first, second = messages[0].split('\n\n')
+        assert '"hw1"' in first and first.endswith(
+            homework.HOMEWORK_VERDICTS['rejected']
+        )
+        assert '"hw2"' in second and second.endswith(
+            homework.HOMEWORK_VERDICTS['approved']
+        )
+        assert tracker.timestamp == 0
+        tracker.delivered()
+        assert tracker.timestamp == 100
+
+    def test_changes_are_tracked_per_homework(self):
+        tracker = homework.StatusTracker(0)
+        tracker.on_response({
+            'homeworks': [
+                make_homework(1, 'reviewing', '2024-01-01T10:00:00Z'),
+                make_homework(2, 'reviewing', '2024-01-01T11:00:00Z'),
+            ],
+            'current_date': 100,
+        })
+        tracker.delivered()
+        messages = tracker.on_response({
+            'homeworks': [
+                make_homework(1, 'reviewing', '2024-01-01T10:00:00Z'),
+                make_homework(2, 'approved', '2024-01-02T10:00:00Z'),
+            ],
+            'current_date': 200,
+        })
+        assert len(messages) == 1
+        assert '"hw2"' in messages[0] and '"hw1"' not in messages[0]
+
+    def test_invalid_homework_does_not_drop_others(self):
+        tracker = homework.StatusTracker(0)
+        messages = tracker.on_response({
+            'homeworks': [
+                make_homework(1, 'unknown', '2024-01-01T10:00:00Z'),
+                make_homework(2, 'approved', '2024-01-02T10:00:00Z'),
+            ],
+            'current_date': 100,
+        })
+        assert len(messages) == 2
+        assert '"hw2"' in messages[0]
+        assert messages[1].startswith('Сбой в работе программы')
+
+    def test_batch_messages_respects_limit(self):
+        messages = ['a' * 40, 'b' * 40, 'c' * 40]
+        assert homework.batch_messages(messages, limit=90) == [
+            'a' * 40 + '\n\n' + 'b' * 40, 'c' * 40
+        ]
+        assert homework.batch_messages(['x' * 120], limit=50) == [
+            'x' * 50, 'x' * 50, 'x' * 20
+        ]
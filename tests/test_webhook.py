@@ -0,0 +1,156 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+import telegram
+
+import homework
+from benchmarks.stub_server import PracticumStub, TelegramStub
+from exceptions import TokenError
+from outbox import Outbox
+from utils import make_homework
+from webhook import MAX_BODY, NO_DATA, StatusCache, WebhookServer, answer
+
+CHAT_ID = 42
+SECRET_PATH = '/webhook/3f9a1c0d5e7b4a2c'
+
+
+def make_update(text, chat_id=CHAT_ID):
+    return {
+        'update_id': 1,
+        'message': {
+            'message_id': 1,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': text,
+        },
+    }
+
+
+@pytest.fixture
+def telegram_stub():
+    with TelegramStub() as server:
+        yield server
+
+
+@pytest.fixture
+def webhook(telegram_stub):
+    bot = telegram.Bot('123:abc', base_url=telegram_stub.bot_url)
+    cache = StatusCache()
+    server = WebhookServer(
+        bot, cache, host='127.0.0.1', port=0, path=SECRET_PATH
+    ).start()
+    yield server
+    server.stop()
+
+
+def post(server, payload, path=SECRET_PATH):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{server.port}{path}',
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status
+
+
+def wait_messages(stub, count):
+    deadline = time.monotonic() + 5
+    while len(stub.messages) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stub.messages
+
+
+class TestStatusCache:
+
+    def test_keeps_latest_status_and_history(self):
+        cache = StatusCache()
+        cache.update(CHAT_ID, [make_homework(status='reviewing')])
+        cache.update(CHAT_ID, [make_homework(status='reviewing')])
+        cache.update(CHAT_ID, [make_homework(status='approved')])
+        assert [item.status for item in cache.latest(CHAT_ID)] == [
+            'approved'
+        ]
+        assert [item.status for _, item in cache.history(CHAT_ID)] == [
+            'reviewing', 'approved'
+        ]
+
+    def test_chats_are_isolated(self):
+        cache = StatusCache()
+        cache.update(CHAT_ID, [make_homework(status='approved')])
+        assert answer(cache, 7, '/status') == NO_DATA
+
+    def test_tracker_observer_feeds_cache(self):
+        cache = StatusCache()
+        tracker = homework.StatusTracker(0)
+        tracker.observers.append(cache.observer(CHAT_ID))
+        tracker.on_response({
+            'homeworks': [make_homework(status='rejected')], 'current_date': 1,
+        })
+        assert 'замечания' in answer(cache, CHAT_ID, '/status@bot')
+
+
+class TestWebhookServer:
+
+    def test_status_replies_from_cache_without_api_calls(
+        self, webhook, telegram_stub
+    ):
+        webhook.cache.update(CHAT_ID, [make_homework(status='approved')])
+        with PracticumStub() as practicum_stub:
+            assert post(webhook, make_update('/status')) == 200
+            messages = wait_messages(telegram_stub, 1)
+        assert practicum_stub.requests == 0
+        assert int(messages[0]['chat_id']) == CHAT_ID
+        assert messages[0]['text'] == homework.parse_status(
+            make_homework(status='approved')
+        )
+
+    def test_history_lists_changes(self, webhook, telegram_stub):
+        webhook.cache.update(CHAT_ID, [make_homework(status='reviewing')])
+        webhook.cache.update(CHAT_ID, [make_homework(status='approved')])
+        post(webhook, make_update('/history'))
+        text = wait_messages(telegram_stub, 1)[0]['text']
+        assert text.index('взята на проверку') < text.index('Ура!')
+
+    def test_ignores_plain_text_and_unknown_path(
+        self, webhook, telegram_stub
+    ):
+        assert post(webhook, make_update('привет')) == 200
+        with pytest.raises(urllib.error.HTTPError):
+            post(webhook, make_update('/status'), path='/webhook')
+        time.sleep(0.1)
+        assert telegram_stub.messages == []
+
+    def test_registers_webhook_through_outbox(self, telegram_stub):
+        api_bot = telegram.Bot('123:abc', base_url=telegram_stub.bot_url)
+        bot = Outbox(api_bot).start()
+        cache = StatusCache()
+        cache.update(CHAT_ID, [make_homework(status='approved')])
+        server = WebhookServer(
+            bot, cache, host='127.0.0.1', port=0, path=SECRET_PATH,
+            api_bot=api_bot,
+        ).start(f'https://example.com{SECRET_PATH}')
+        try:
+            assert post(server, make_update('/status')) == 200
+            messages = wait_messages(telegram_stub, 1)
+        finally:
+            server.stop()
+            bot.close(1)
+        assert telegram_stub.requests == 2
+        assert int(messages[0]['chat_id']) == CHAT_ID
+
+    @pytest.mark.parametrize('path', [None, '/webhook', '/hook/short'])
+    def test_refuses_guessable_path(self, path):
+        with pytest.raises(TokenError):
+            WebhookServer(None, StatusCache(), port=0, path=path)
+
+    def test_rejects_oversized_body(self, webhook, telegram_stub):
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{webhook.port}{SECRET_PATH}', data=b'{}',
+            headers={'Content-Length': str(MAX_BODY + 1)},
+        )
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 413
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import Counter
+
+import requests
+
+import utils
+from engine import PollingEngine
+from shutdown import GracefulShutdown
+from tenants import TenantRegistry
+from utils import FakeClock
+from wheel import TimingWheel, phase
+
+
+def test_phase_is_stable_and_uniform():
+    slots = Counter(phase(f'token-{number}', 10) for number in range(10000))
+    assert phase('token-1', 10) == phase('token-1', 10)
+    assert len(slots) == 10
+    assert all(900 < count < 1100 for count in slots.values())
+
+
+class TestTimingWheel:
+
+    def test_each_key_fires_once_per_period_in_its_phase(self):
+        clock = FakeClock()
+        wheel = TimingWheel(10, slots=10, clock=clock)
+        for number in range(100):
+            wheel.add(f'token-{number}', number)
+        fired = {}
+        for second in range(30):
+            clock.now = second
+            for item in wheel.advance():
+                fired.setdefault(item, []).append(second)
+        assert len(fired) == 100
+        for item, seconds in fired.items():
+            assert seconds[0] == phase(f'token-{item}', 10)
+            assert seconds[1:] == [seconds[0] + 10, seconds[0] + 20]
+
+    def test_delay_keeps_phase(self):
+        clock = FakeClock()
+        wheel = TimingWheel(10, slots=10, clock=clock)
+        slot = phase('key', 10)
+        wheel.add('key', 'item', delay=25)
+        fired = []
+        for second in range(50):
+            clock.now = second
+            if wheel.advance():
+                fired.append(second)
+        assert fired == [
+            second for second in range(25, 50) if second % 10 == slot
+        ]
+
+    def test_remove_and_catch_up(self):
+        clock = FakeClock()
+        wheel = TimingWheel(10, slots=10, clock=clock)
+        wheel.add('a', 'a')
+        wheel.add('b', 'b')
+        assert wheel.remove('b') == 'b' and 'b' not in wheel
+        assert wheel.remove('b') is None
+        clock.now = 95
+        assert wheel.advance() == ['a']
+        assert 0 < wheel.until_next() <= 1
+
+
+def test_engine_run_spread(monkeypatch, random_timestamp):
+    polled = []
+
+    def mock_get(*args, **kwargs):
+        polled.append(time.monotonic())
+        return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    registry = TenantRegistry()
+    for number in range(40):
+        registry.add(f'token-{number}', str(number), 0)
+    engine = PollingEngine(registry, max_workers=4)
+    shutdown = GracefulShutdown()
+    timer = threading.Timer(0.45, setattr, (shutdown, 'requested', True))
+    timer.start()
+    started = time.monotonic()
+    try:
+        engine.run_spread(period=0.4, shutdown=shutdown, slots=8)
+    except SystemExit:
+        pass
+    finally:
+        engine.close()
+    assert len(polled) >= 40
+    first = [moment - started for moment in polled[:40]]
+    assert max(first) - min(first) > 0.2
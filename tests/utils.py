@@ -114,6 +114,28 @@ class MockTelegramBot:
         self.text = text
 
 
+class FakeClock:
+    """Часы для `clock=`: время двигает тест через `now`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_homework(homework_id=1, status='approved',
+                  date_updated='2023-01-01T00:00:00Z', **fields):
+    """Работа в формате ответа API; `fields` дополняют и заменяют поля."""
+    return {
+        'id': homework_id,
+        'homework_name': f'hw{homework_id}',
+        'status': status,
+        'date_updated': date_updated,
+        **fields,
+    }
+
+
 class BreakInfiniteLoop(Exception):
     pass
 
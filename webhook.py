@@ -0,0 +1,203 @@
+"""Приём обновлений Telegram через вебхук и ответы на команды.
+
+Команды `/status` и `/history` отвечают из `StatusCache`, который
+заполняется результатами `check_response` в цикле опроса, поэтому
+запрос пользователя не порождает обращений к API Практикума.
+
+Проверить, что обновление прислал Telegram, можно только по адресу:
+путь вебхука должен быть секретным, иначе любой, кто достучится до
+порта, подделает обновление от чужого `chat.id` и заставит бота писать
+в этот чат. Сервер не запускается с коротким или общеизвестным путём.
+"""
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import telegram
+
+import homework
+import templates
+from exceptions import TokenError
+from models import Homework
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = 20
+HELP = (
+    'Команды:\n'
+    '/status — последний известный статус каждой работы\n'
+    '/history — последние изменения статусов'
+)
+NO_DATA = 'Пока нет данных о работах.'
+MIN_SECRET_LENGTH = 16
+MAX_BODY = 2 ** 20
+
+
+class StatusCache:
+    """Последние статусы работ и история изменений по чатам.
+
+    Работы хранятся проверенными моделями `Homework`: некорректные
+    записи пропускаются, об их ошибках сообщает цикл опроса.
+    """
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.history_size = history_size
+        self._latest = {}
+        self._history = {}
+        self._lock = threading.Lock()
+
+    def update(self, chat_id, homeworks):
+        """Запоминает работы из ответа `check_response` для чата."""
+        chat_id = str(chat_id)
+        now = time.time()
+        with self._lock:
+            latest = self._latest.setdefault(chat_id, {})
+            history = self._history.setdefault(
+                chat_id, deque(maxlen=self.history_size)
+            )
+            for item in sorted(homeworks, key=homework.update_order):
+                try:
+                    record = Homework.from_dict(
+                        item, homework.HOMEWORK_VERDICTS
+                    )
+                except Exception:
+                    continue
+                previous = latest.get(record.key)
+                if previous is not None and previous.status == record.status:
+                    continue
+                latest[record.key] = record
+                history.append((now, record))
+
+    def observer(self, chat_id):
+        """Функция для `StatusTracker.observers` конкретного чата."""
+        return lambda homeworks: self.update(chat_id, homeworks)
+
+    def latest(self, chat_id):
+        """Последний известный вариант каждой работы чата."""
+        with self._lock:
+            return list(self._latest.get(str(chat_id), {}).values())
+
+    def history(self, chat_id):
+        """Изменения статусов чата от старых к новым."""
+        with self._lock:
+            return list(self._history.get(str(chat_id), ()))
+
+
+def answer(cache, chat_id, text):
+    """Текст ответа на команду или None, если это не команда бота."""
+    command = (text or '').strip().split(maxsplit=1)[0:1]
+    command = command[0].split('@')[0] if command else ''
+    if command == '/status':
+        items = cache.latest(chat_id)
+        if not items:
+            return templates.escape(NO_DATA)
+        return '\n\n'.join(homework.parse_status(item) for item in items)
+    if command == '/history':
+        entries = cache.history(chat_id)
+        if not entries:
+            return templates.escape(NO_DATA)
+        return '\n'.join(
+            templates.escape(
+                time.strftime('%d.%m %H:%M', time.localtime(seen)) + ' — '
+            ) + homework.parse_status(item)
+            for seen, item in entries
+        )
+    if command in ('/start', '/help'):
+        return templates.escape(HELP)
+    return None
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def _finish(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        server = self.server.webhook
+        if not hmac.compare_digest(self.path.encode(), server.path.encode()):
+            return self._finish(HTTPStatus.NOT_FOUND)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            return self._finish(HTTPStatus.BAD_REQUEST)
+        if not 0 <= length <= MAX_BODY:
+            return self._finish(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self._finish(HTTPStatus.BAD_REQUEST)
+        self._finish(HTTPStatus.OK)
+        server.handle_update(payload)
+
+
+def check_path(path):
+    """Путь вебхука должен содержать секрет; иначе `TokenError`."""
+    secret = (path or '').strip('/').split('/')[-1]
+    if len(secret) < MIN_SECRET_LENGTH:
+        raise TokenError(
+            'WEBHOOK_PATH должен быть секретным: последний сегмент не '
+            f'короче {MIN_SECRET_LENGTH} символов, например '
+            '/webhook/<случайная строка>.'
+        )
+
+
+class WebhookServer:
+    """HTTP-приёмник обновлений Telegram в фоновом потоке.
+
+    Ответы уходят через `bot` — возможно, очередь `Outbox`; вебхук
+    регистрируется и обновления разбираются через `telegram.Bot`
+    `api_bot`, по умолчанию тот же `bot`.
+    """
+
+    def __init__(self, bot, cache, host='0.0.0.0', port=8443,
+                 path=None, api_bot=None):
+        check_path(path)
+        self.bot = bot
+        self.api_bot = bot if api_bot is None else api_bot
+        self.cache = cache
+        self.path = path
+        self._server = ThreadingHTTPServer((host, port), _WebhookHandler)
+        self._server.daemon_threads = True
+        self._server.webhook = self
+
+    @property
+    def port(self):
+        """Порт, на котором слушает сервер."""
+        return self._server.server_address[1]
+
+    def handle_update(self, payload):
+        """Отвечает на команду из обновления Telegram."""
+        update = telegram.Update.de_json(payload, self.api_bot)
+        message = update.effective_message if update else None
+        if message is None or message.text is None:
+            return
+        reply = answer(self.cache, message.chat_id, message.text)
+        if reply is None:
+            return
+        for text in homework.batch_messages([reply]):
+            homework.deliver_message(self.bot, message.chat_id, text)
+
+    def start(self, url=None):
+        """Запускает сервер; с `url` регистрирует вебхук в Telegram."""
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.1,), daemon=True
+        ).start()
+        if url:
+            self.api_bot.set_webhook(url=url)
+            logger.info(f'Вебхук зарегистрирован: {url}')
+        return self
+
+    def stop(self):
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()